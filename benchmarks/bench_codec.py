@@ -0,0 +1,37 @@
+"""
+Compares the stdlib json module against src.codec on the example match file.
+
+Run from the repo root:
+    python -m benchmarks.bench_codec
+"""
+import json
+import timeit
+from src import codec
+
+EXAMPLE_FILE = "example_data/example_match_data.json"
+RUNS = 200
+
+
+def _time(func) -> float:
+    return min(timeit.repeat(func, number=RUNS, repeat=5)) / RUNS * 1000
+
+
+def main():
+    with open(EXAMPLE_FILE, "rb") as f:
+        raw = f.read()
+    data = json.loads(raw)
+
+    results = {
+        "decode": (_time(lambda: json.loads(raw)), _time(lambda: codec.loads(raw))),
+        "encode": (_time(lambda: json.dumps(data, ensure_ascii=False)), _time(lambda: codec.dumps(data))),
+        "encode pretty": (_time(lambda: json.dumps(data, indent=2, ensure_ascii=False)), _time(lambda: codec.dumps(data, pretty=True))),
+    }
+
+    print(f"codec backend: {codec.BACKEND} | file: {EXAMPLE_FILE} ({len(raw) / 1024:.1f} KB)")
+    print(f"{'':<16}{'json (ms)':>12}{'codec (ms)':>12}{'speedup':>10}")
+    for name, (stdlib_ms, codec_ms) in results.items():
+        print(f"{name:<16}{stdlib_ms:>12.3f}{codec_ms:>12.3f}{stdlib_ms / codec_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import pytest
+from src.match.schema import load_match
+from src.synthetic import generate_match, player_stats_html, write_archive
+
+pytest.importorskip("pytest_benchmark")
+
+EXAMPLE_FILE = "example_data/example_match_data.json"
+PLAYER_URL = "https://stats.espncricinfo.com/ci/engine/player/1090625.html?class=11;template=results;type=allround"
+
+
+@pytest.fixture(scope="session")
+def example_file():
+    return EXAMPLE_FILE
+
+@pytest.fixture(scope="session")
+def example_match():
+    return load_match(EXAMPLE_FILE, full=True)
+
+@pytest.fixture(scope="session")
+def player_html():
+    return player_stats_html()
+
+@pytest.fixture(scope="session")
+def player_url():
+    return PLAYER_URL
+
+@pytest.fixture(scope="session")
+def test_match():
+    """A synthetic four innings match, several times the size of the example T20"""
+    return generate_match(seed=1, format="test")
+
+@pytest.fixture(scope="session")
+def match_archive(tmp_path_factory):
+    filename = str(tmp_path_factory.mktemp("archive") / "matches.ndjson")
+    write_archive(filename, 200, format="odi")
+    return filename
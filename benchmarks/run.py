@@ -0,0 +1,34 @@
+"""
+Runs the benchmark suite (needs pytest-benchmark).
+
+    python -m benchmarks.run --save               record a new baseline
+    python -m benchmarks.run                      compare against the latest baseline, fail on regressions
+    python -m benchmarks.run --threshold 10       fail if any benchmark's median is more than 10% slower
+
+Baselines are kept in .benchmarks/ (per machine, they arent committed).
+Any other arguments are passed straight through to pytest, e.g. -k extractor
+"""
+import argparse
+import sys
+import pytest
+
+DEFAULT_THRESHOLD = 20
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark suite for the match analysis and player parsing hot paths.")
+    parser.add_argument("--save", action="store_true", help="Record the results as the new baseline instead of comparing.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help=f"Allowed slowdown of the median in percent (default: {DEFAULT_THRESHOLD}).")
+    args, pytest_args = parser.parse_known_args()
+
+    options = ["benchmarks", "-q", "--benchmark-columns=min,median,mean,rounds", "--benchmark-sort=name"]
+    if args.save:
+        options.append("--benchmark-autosave")
+    else:
+        options += ["--benchmark-compare", f"--benchmark-compare-fail=median:{args.threshold:g}%"]
+
+    return pytest.main(options + pytest_args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
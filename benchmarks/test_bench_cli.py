@@ -0,0 +1,9 @@
+import asyncio
+import pytest
+from src.end_point_functions import match_data
+
+@pytest.mark.parametrize("analysis_type", ["comprehensive", "summary", "live", "structured", "timeline"])
+def test_match_data_from_file(benchmark, tmp_path, example_file, analysis_type):
+    """Whole offline --filename run: load, analyse and write the outputs"""
+    output = str(tmp_path / "output")
+    benchmark(lambda: asyncio.run(match_data(None, output, analysis_type, example_file)))
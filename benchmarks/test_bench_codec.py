@@ -0,0 +1,17 @@
+import pytest
+from src import codec
+from src.match.schema import decode_match
+
+@pytest.fixture(scope="module")
+def raw(example_file):
+    with open(example_file, "rb") as f:
+        return f.read()
+
+def test_decode(benchmark, raw):
+    benchmark(codec.loads, raw)
+
+def test_decode_projected(benchmark, raw):
+    benchmark(decode_match, raw)
+
+def test_encode_pretty(benchmark, example_match):
+    benchmark(codec.dumps, example_match, True)
@@ -0,0 +1,36 @@
+import asyncio
+import pytest
+from src.end_point_functions import team_full_data
+from src.mock_server import MockConfig, start_server
+
+'''
+End-to-end team_full crawl against the local mock server (src/mock_server.py), so the numbers only
+move when the scraper does. Needs a Playwright Chromium (python -m playwright install chromium).
+'''
+
+TEAM_URL = "https://www.espncricinfo.com/cricketers/team/nepal-33"
+
+async def _chromium_available() -> bool:
+    from playwright.async_api import async_playwright
+    try:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            await browser.close()
+        return True
+    except Exception:
+        return False
+
+@pytest.fixture(scope="module")
+def mock_server():
+    if not asyncio.run(_chromium_available()):
+        pytest.skip("Playwright Chromium is not installed")
+    # Fixed latency and a few 429s, the same every run
+    server = start_server(MockConfig(latency=0.01, rate_limit_rate=0.05, team_size=20, seed=1))
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def test_team_full_crawl(benchmark, mock_server, tmp_path):
+    output = str(tmp_path / "team")
+    benchmark.pedantic(lambda: asyncio.run(team_full_data(TEAM_URL, output, base_url=mock_server.base_url, delay=0)), rounds=1)
+    benchmark.extra_info.update(mock_server.stats)
@@ -0,0 +1,43 @@
+import pytest
+from src.match.analyser import CricketMatchAnalyzer, analyze_cricket_match
+from src.match.extractor import CricketDataExtractor
+from src.match.processor import process_cricket_data
+
+analyzer_methods = [
+    "get_match_summary",
+    "get_innings_summary",
+    "get_current_batting_stats",
+    "get_current_bowling_stats",
+    "get_partnerships_info",
+    "get_ball_by_ball_data",
+    "generate_human_readable_report",
+]
+
+extractor_methods = [
+    "extract_match_info",
+    "extract_team_info",
+    "extract_innings_data",
+    "extract_live_batting",
+    "extract_live_bowling",
+    "extract_ball_by_ball",
+    "extract_partnerships",
+    "get_human_readable_summary",
+    "extract_match_timeline",
+    "generate_timeline_report",
+]
+
+@pytest.mark.parametrize("method", analyzer_methods)
+def test_analyzer(benchmark, example_match, method):
+    analyzer = CricketMatchAnalyzer(example_match)
+    benchmark(getattr(analyzer, method))
+
+@pytest.mark.parametrize("method", extractor_methods)
+def test_extractor(benchmark, example_match, method):
+    extractor = CricketDataExtractor(example_match)
+    benchmark(getattr(extractor, method))
+
+def test_analyze_cricket_match(benchmark, example_match):
+    benchmark(analyze_cricket_match, example_match)
+
+def test_process_cricket_data(benchmark, example_match):
+    benchmark(process_cricket_data, example_match)
@@ -0,0 +1,5 @@
+from src.extract_player_data import parse_player_data
+
+def test_parse_player_data(benchmark, player_html, player_url):
+    result = benchmark(parse_player_data, player_html, player_url)
+    assert result["player_name"]
@@ -0,0 +1,17 @@
+import pytest
+from src.match.analyser import analyze_cricket_match
+from src.match.extractor import CricketDataExtractor
+from src.match.loader import iter_matches
+from src.synthetic import generate_match
+
+@pytest.mark.parametrize("format", ["t20", "odi", "test"])
+def test_timeline_by_format(benchmark, format):
+    extractor = CricketDataExtractor(generate_match(seed=1, format=format))
+    benchmark(extractor.extract_match_timeline)
+
+def test_analyze_test_match(benchmark, test_match):
+    benchmark(analyze_cricket_match, test_match)
+
+def test_stream_archive(benchmark, match_archive):
+    # 200 ODIs, one decoded at a time
+    benchmark.pedantic(lambda: sum(1 for _ in iter_matches(match_archive)), rounds=3)
@@ -0,0 +1,30 @@
+import os
+import subprocess
+import sys
+
+'''
+Startup budget for main.py, measured with python -X importtime.
+Our cron jobs run the CLI hundreds of times a day so this is checked on its own, not only against the saved baseline.
+Override the budget with STARTUP_BUDGET_MS on slow machines.
+'''
+
+STARTUP_BUDGET_MS = float(os.environ.get("STARTUP_BUDGET_MS", 150))
+
+def import_time_ms(*args) -> float:
+    """Total import time of main.py and everything it imports (not counting the interpreter's own site setup)"""
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "main.py", *args], capture_output=True, text=True).stderr
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Only top level imports, their cumulative time includes everything under them
+        if name[1] != " " and name.strip() != "site":
+            total += int(cumulative)
+    return total / 1000
+
+def test_startup_budget(benchmark):
+    times = []
+    benchmark.pedantic(lambda: times.append(import_time_ms("--help")), rounds=5)
+    benchmark.extra_info["import_ms"] = min(times)
+    assert min(times) < STARTUP_BUDGET_MS, f"main.py --help spends {min(times):.0f}ms importing, budget is {STARTUP_BUDGET_MS:.0f}ms"
@@ -1,6 +1,11 @@
 import argparse
 import asyncio
-from src.end_point_functions import *
+import atexit
+from src.end_point_functions import team_data, player_data, team_full_data, page, match_data, match_dir_data, ingest_data, query_data, serve_data, live_data, monitor_data, replay_data, refresh_data, images_data
+from src import metrics
+from src import profiling
+from src.utils import browser_state, capture_pages, set_output_compression, use_browser_state
+from src.compression import split_compression, zstandard
 
 help_desc = (
 '''CLI Scraper tool for www.espncricinfo.com by pxy05.
@@ -26,7 +31,7 @@ It is necessary to run this tool with a head to bypass bot detection.'''
 #     return True
 
 async def main():
-    only_by_itself = ["team", "player", "team_full", "page", "match"]
+    only_by_itself = ["team", "player", "team_full", "page", "match", "match_dir", "ingest", "query", "serve", "live", "monitor", "replay", "refresh", "images"]
     only_by_itself_counter = 0
     selected_option = ""
 
@@ -34,14 +39,67 @@ async def main():
     parser.add_argument('--team', type=str, help='To use, insert the link to the team page and it will create a JSON file with team member info (name, image, URL to their profile).')
     parser.add_argument('--player', type=str, help='To use, insert the link to the player page and it will create a JSON file with player info (Batting & Fielding stats, and Bowling stats).')
     parser.add_argument('--team_full', type=str, help='To use, insert the link to the team page and it will create a JSON file with full player data (all players in a team with detailed stats).')
+    parser.add_argument('--refresh', type=str, help='Bring the player stats in a --team / --team_full output file up to date: only players who played since their last fetch (per the --db matches), new players and ones older than --max_age days are fetched, and only changed pages are parsed and written back to the file and --db. --limit caps the number of pages fetched.')
+    parser.add_argument('--images', type=str, help='Download the pictures of every player in a --team / --team_full output file into the --output directory (default: ./images), several at once. Pictures already there are only downloaded again if they changed.')
+    parser.add_argument('--thumbnails', type=int, default=None, help='Also make --images thumbnails no bigger than this many pixels (needs Pillow).')
+    parser.add_argument('--max_age', type=float, default=7, help='Days after which --refresh fetches a player again even without a new match (default: 7).')
     parser.add_argument('--page', type=str, help='To use, insert the link to any page and it will scrape the raw HTML data.')
     parser.add_argument('--match', type=str, help='Download the JSON data for a specific match.')
-    parser.add_argument('--analysis_type', type=str, default='comprehensive', choices=['comprehensive', 'summary', 'live', 'structured', 'timeline'], help='Type of analysis to perform on match data.')
-    parser.add_argument('--filename', type=str, help='Path to existing JSON file containing match data (alternative to --match URL).')
-    parser.add_argument('--output', type=str, default='output', help='Specify the output file path (default: ./output) The type of file depends on the scraping option used.')
+    parser.add_argument('--match_dir', '--match-dir', dest='match_dir', type=str, help='Run --analysis_type over every saved match JSON in a directory in parallel. Outputs and an index.json summary are written into the --output directory.')
+    parser.add_argument('--glob', type=str, default=None, help='Files to pick up inside --match_dir, an --ingest directory or a --serve directory (default: *.json, every .json, .json.gz and .json.zst file for --serve). Use **/ to search subdirectories.')
+    parser.add_argument('--workers', type=int, default=None, help='Number of worker processes for --match_dir (default: number of CPUs).')
+    parser.add_argument('--ingest', type=str, help='Load a scraped output file (team, team_full, player or match JSON) or a directory of them into the local SQLite database (--db).')
+    parser.add_argument('--query', type=str, choices=['matches', 'wickets', 'balls', 'players', 'stats', 'bowler_totals', 'batter_totals'], help='Query the local SQLite database (--db). Narrow the results down with --where. bowler_totals/batter_totals scan the --ball_store instead.')
+    parser.add_argument('--where', type=str, action='append', help='Filter for --query as key=value, can be used more than once e.g. --where bowler=Kirton --where year=2025 (%% wildcards work for names)')
+    parser.add_argument('--limit', type=int, default=None, help='Maximum number of rows --query returns, or of pages --refresh fetches.')
+    parser.add_argument('--serve', type=str, help='Serve the team, player and match outputs in a directory over a local read-only HTTP API (GET /teams/<id>, /players/<objectId>, /matches/<id>, and /live/<match_id> for per-ball updates whenever a match file changes).')
+    parser.add_argument('--live', type=str, help='Poll a match JSON URL (or a match file that keeps being overwritten) and push per-ball updates as Server-Sent Events on http://--host:--port/live/<match_id>.')
+    parser.add_argument('--monitor', type=str, nargs='+', help='Follow several live matches (match JSON URLs, or text files with one URL per line) with one browser. In-play matches are polled every --interval seconds, ones at a break less often. The status of every match is written to <output>_monitor.json.')
+    parser.add_argument('--interval', type=float, default=15, help='Seconds between --live polls, and between --monitor polls of an in-play match (default: 15).')
+    parser.add_argument('--archive', type=str, default=None, help='Directory to keep every --live / --monitor poll in, one <match_id>.snapshots.gz per match (first poll in full, then only what changed) for --replay.')
+    parser.add_argument('--replay', type=str, help='Feed the polls in a .snapshots.gz archive back through --analysis_type, like a live --match run.')
+    parser.add_argument('--speed', type=float, default=1.0, help='--replay speed: 1 waits as long between polls as the original run, 10 is ten times faster, 0 does not wait (default: 1).')
+    parser.add_argument('--at', type=str, default=None, help='Only --replay the poll that was current at this time (epoch seconds or ISO date and time).')
+    parser.add_argument('--concurrency', type=int, default=None, help='Pages --monitor fetches at once (default: 2), or pictures --images downloads at once (default: 16).')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Address --serve and --live listen on (default: 127.0.0.1).')
+    parser.add_argument('--port', type=int, default=8080, help='Port --serve and --live listen on (default: 8080).')
+    parser.add_argument('--cache_size', type=int, default=1024, help='Most responses --serve keeps in memory (default: 1024).')
+    parser.add_argument('--ball_store', type=str, default=None, help='Directory of the memory-mapped ball store. With --ingest every ball of every match is appended to it.')
+    parser.add_argument('--db', type=str, default='cricket.db', help='Path to the SQLite database used by --ingest, --query and --refresh (default: ./cricket.db).')
+    parser.add_argument('--analysis_type', type=str, nargs='+', default=['comprehensive'], choices=['comprehensive', 'summary', 'live', 'structured', 'timeline', 'all'], help='Type of analysis to perform on match data. Give several (e.g. --analysis_type summary live timeline) or all to write each of their outputs from one load of the match.')
+    parser.add_argument('--filename', type=str, help='Path to existing JSON file containing match data (alternative to --match URL). Can also be a JSON array or NDJSON file of many matches, optionally .gz/.zst compressed.')
+    parser.add_argument('--full_data', action='store_true', help='Decode the whole match JSON instead of only the fields used by the analysis, and embed it as raw_data in comprehensive output.')
+    parser.add_argument('--base_url', type=str, default=None, help='Send every request to this host instead of ESPN Cricinfo, e.g. a local mock server started with: python -m src.mock_server')
+    parser.add_argument('--page_store', type=str, default=None, help='Keep every fetched page once per distinct body in this compressed, content-addressed directory. --page then saves a reference instead of the HTML, and so does --full_data comprehensive output for the raw match. See: python -m src.page_store')
+    parser.add_argument('--browser_state', type=str, default='browser_state.json', help='File the browser cookies are kept in between runs (default: ./browser_state.json), so consent modals are only waited for when it is missing or stale. none starts every browser from scratch.')
+    parser.add_argument('--metrics', type=str, default=None, help='Write per-stage timings and counters to this file when the run ends. Prometheus text format for .prom/.txt, JSON otherwise.')
+    parser.add_argument('--profile', type=str, default=None, choices=list(profiling.MODES), help='Profile the command: cpu (cProfile) or alloc (tracemalloc). Sorted stats and a flamegraph collapsed-stack file are written next to --output.')
+    parser.add_argument('--output', type=str, default='output', help='Specify the output file path (default: ./output) The type of file depends on the scraping option used. End it in .gz or .zst (e.g. nepal.json.gz) to compress every JSON/HTML output file.')
 
     args = parser.parse_args()
 
+    if args.metrics:
+        # atexit so the file is still written when a long run is stopped with Ctrl+C
+        atexit.register(metrics.write, args.metrics)
+
+    if args.page_store:
+        capture_pages(args.page_store)
+
+    if args.browser_state and args.browser_state.lower() != "none":
+        use_browser_state(args.browser_state)
+
+    # --output nepal.json.gz -> outputs named from "nepal", all written gzipped
+    output, compression = split_compression(args.output)
+    if compression:
+        if compression == ".zst" and zstandard is None:
+            print("\033[91mError: .zst output needs the zstandard package (pip install zstandard).\033[0m")
+            return
+        for extension in (".json", ".html"):
+            if output.endswith(extension):
+                output = output[:-len(extension)]
+        args.output = output
+        set_output_compression(compression)
+
     for option in only_by_itself:
 
         if getattr(args, option) is not None:
@@ -50,34 +108,58 @@ async def main():
             
         
         if only_by_itself_counter > 1:
-            print("\033[91mError: You cannot specify multiple options (--team, --player, --team_full, --page) at once.\033[0m")
+            print("\033[91mError: You cannot specify multiple options (--team, --player, --team_full, --page, --match, --match_dir, --ingest, --query, --serve, --live, --monitor, --replay, --refresh, --images) at once.\033[0m")
             print("--help for more advice.")
             return
 
     # Check if filename is provided without match
-    if args.filename and not args.match:
+    if args.filename and not args.match and not args.match_dir:
         selected_option = "match"
         only_by_itself_counter = 1
     
     if only_by_itself_counter == 0:
-        print("\033[91mError: You must specify either --team, --player, --team_full, --page, or --match before specifying an output file.\033[0m")
+        print("\033[91mError: You must specify either --team, --player, --team_full, --page, --match, --match_dir, --ingest, --query, --serve, --live, --monitor, --replay, --refresh or --images before specifying an output file.\033[0m")
         print("--help for more advice.")
         return
     
     # if  (not args.page) and (not validate_url(getattr(args, selected_option))):
     #     return
 
-    if selected_option == "team":
-        await team_data(args.team, args.output)
-    elif selected_option == "player":
-        # await player_data(args.player, True)
-        await player_data(args.player, True)
-    elif selected_option == "team_full":
-        await team_full_data(args.team_full, args.output)
-    elif selected_option == "page":
-        await page(args.page, args.output)
-    elif selected_option == "match":
-        await match_data(args.match, args.output, args.analysis_type, args.filename)
+    # Reports are written next to the output, e.g. output.cpu.txt
+    with profiling.profile(args.profile, args.output):
+        if selected_option == "team":
+            await team_data(args.team, args.output, args.base_url)
+        elif selected_option == "player":
+            # await player_data(args.player, True)
+            await player_data(args.player, True, base_url=args.base_url)
+        elif selected_option == "team_full":
+            await team_full_data(args.team_full, args.output, base_url=args.base_url)
+        elif selected_option == "page":
+            await page(args.page, args.output, args.base_url)
+        elif selected_option == "match":
+            await match_data(args.match, args.output, args.analysis_type, args.filename, args.full_data, args.base_url)
+        elif selected_option == "match_dir":
+            await match_dir_data(args.match_dir, args.output, args.analysis_type, args.glob or "*.json", args.workers, args.full_data)
+        elif selected_option == "ingest":
+            await ingest_data(args.ingest, args.db, args.glob or "*.json", args.ball_store)
+        elif selected_option == "query":
+            await query_data(args.query, args.where, args.db, args.output, args.limit, args.ball_store)
+        elif selected_option == "serve":
+            await serve_data(args.serve, args.host, args.port, args.glob, args.cache_size)
+        elif selected_option == "live":
+            await live_data(args.live, args.host, args.port, args.interval, args.base_url, args.archive)
+        elif selected_option == "monitor":
+            await monitor_data(args.monitor, args.output, args.interval, args.base_url, args.concurrency or 2, args.archive)
+        elif selected_option == "refresh":
+            await refresh_data(args.refresh, args.db, args.limit, args.max_age, args.base_url)
+        elif selected_option == "replay":
+            await replay_data(args.replay, args.output, args.analysis_type, args.speed, args.at)
+        elif selected_option == "images":
+            await images_data(args.images, "images" if args.output == "output" else args.output, args.concurrency or 16, args.thumbnails, args.base_url)
+
+    state = browser_state()
+    if state is not None and state.skipped:
+        print(f"Skipped {state.skipped} consent modal checks using {state.filename} ({state.seconds_saved:.1f}s saved)")
 
 if __name__ == "__main__":
     asyncio.run(main())
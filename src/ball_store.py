@@ -0,0 +1,265 @@
+import os
+import re
+from typing import Any, Dict, List, Tuple
+import numpy as np
+from src import codec
+from src.match.extractor import CricketDataExtractor
+from src.match.records import parse_ball_event, split_overs
+from src.match.schema import get_match_id
+
+'''
+Columnar, memory-mapped store of every ball from every ingested match.
+
+Layout of a store directory:
+    <column>.bin   one raw fixed-width array per column in COLUMNS, all the same length
+    strings.json   dictionary sidecar: player keys and names and match ids, array values are indexes into these lists
+    meta.json      row count and column dtypes
+
+Commentary only names players by surname ("Kirton to Thaker"), so each one is looked up in the roster of
+the team batting / bowling that innings and keyed by their objectId. A name the roster doesn't settle
+(not in it, or two players of the team share it) is keyed "name:<surname>" instead, and everyone
+stored under that key is counted together by player_totals().
+
+Bowlers are only credited with the wickets that are theirs (not run outs), and the batter charged with a
+wicket is the one who was out: the striker, or for a run out whoever the match's fall of wickets says it
+was (nobody when the match doesn't have it). Wides aren't balls faced, wides and no balls aren't balls bowled.
+
+Columns are opened with np.memmap in read-only mode, so a scan over tens of thousands of matches
+never parses JSON, doesnt copy the data, and the OS shares the pages between every process reading the store.
+
+The store is append-only with a single writer. A match that is already in the store is skipped,
+so re-ingesting a live match only picks it up once it's been removed (delete the store and rebuild).
+append_match() only appends to the columns, the sidecars are written by flush() once per batch
+(database.ingest_path does it at the end) so an ingest doesn't rewrite them for every match.
+'''
+
+COLUMNS = {
+    "match_id": np.int32,
+    "innings": np.int8,
+    "over": np.int16,
+    "ball": np.int8,
+    "runs": np.int16,
+    "extras": np.int16,
+    "wicket": np.int8,
+    "bowler_wicket": np.int8,
+    "wide": np.int8,
+    "no_ball": np.int8,
+    "batter_id": np.int32,
+    "bowler_id": np.int32,
+    # Player index of the batter who was out on this ball, -1 for none
+    "out_id": np.int32,
+}
+
+_WIDE = re.compile(r"\bWIDES?\b")
+_NO_BALL = re.compile(r"\bNO ?BALLS?\b")
+
+
+def _rosters(match_data: Dict[str, Any]) -> Dict[Tuple[str, str], Tuple[str, str]]:
+    """(team_id, name as commentary writes it) -> (objectId, known_as), names two players of a team share are left out"""
+    rosters = {}
+    ambiguous = set()
+    for team in match_data.get("team", []):
+        team_id = str(team.get("team_id"))
+        for player in team.get("player", []):
+            known_as = player.get("known_as") or ""
+            player_id = player.get("object_id") or player.get("player_id")
+            if not known_as or not player_id:
+                continue
+            for name in {known_as, known_as.split()[-1]}:
+                entry = (team_id, name)
+                if entry in rosters and rosters[entry][0] != str(player_id):
+                    ambiguous.add(entry)
+                rosters[entry] = (str(player_id), known_as)
+    for entry in ambiguous:
+        del rosters[entry]
+    return rosters
+
+
+def _legal_balls(overs) -> int:
+    """'15.3' -> 93, fow_overs and overs_actual compared as balls bowled"""
+    over, ball = split_overs(overs)
+    return over * 6 + ball
+
+
+def _run_outs(match_data: Dict[str, Any]) -> Dict[Tuple[str, int], str]:
+    """(innings number, legal balls bowled) -> player_id of the batter out at that point, from the fall of wickets"""
+    fow = [dict(entry, innings_number=innings.get("innings_number")) for innings in match_data.get("innings", []) for entry in innings.get("fow") or []]
+    fow += match_data.get("live", {}).get("fow") or []
+    outs = {}
+    for entry in fow:
+        player_id = (entry.get("out_player") or {}).get("player_id") or entry.get("player_id")
+        if player_id:
+            outs[(str(entry.get("innings_number")), _legal_balls(entry.get("fow_overs")))] = str(player_id)
+    return outs
+
+
+class BallStore:
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+        meta = self._read_json("meta.json") or {"rows": 0, "columns": {name: np.dtype(dtype).str for name, dtype in COLUMNS.items()}}
+        strings = self._read_json("strings.json") or {"players": [], "names": [], "matches": []}
+        missing = [name for name in COLUMNS if name not in meta["columns"]]
+        if missing:
+            raise ValueError(f"Ball store '{path}' has no {', '.join(missing)} column, delete it and --ingest again.")
+        self.rows = meta["rows"]
+        self.players: List[str] = strings["players"]
+        # Stores written before players were keyed by objectId only have the names
+        self.names: List[str] = strings.get("names", list(self.players))
+        self.matches: List[str] = strings["matches"]
+        self._player_index = {name: i for i, name in enumerate(self.players)}
+        self._match_index = {match_id: i for i, match_id in enumerate(self.matches)}
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _read_json(self, name: str):
+        if not os.path.exists(self._file(name)):
+            return None
+        return codec.load(self._file(name))
+
+    def _write_json(self, name: str, data) -> None:
+        # Write then rename so a reader never sees a half written sidecar
+        tmp = self._file(name + ".tmp")
+        codec.dump(data, tmp, pretty=False)
+        os.replace(tmp, self._file(name))
+
+    def _player_id(self, key: str, name: str) -> int:
+        index = self._player_index.get(key)
+        if index is None:
+            index = len(self.players)
+            self.players.append(key)
+            self.names.append(name)
+            self._player_index[key] = index
+        return index
+
+    def __contains__(self, match_id: str) -> bool:
+        return match_id in self._match_index
+
+    def append_match(self, match_data: Dict[str, Any], source: str = None) -> int:
+        """Append every ball of a match (from CricketDataExtractor.ball_records) and return how many were added"""
+        match_id = get_match_id(match_data, source)
+        if match_id in self:
+            return 0
+
+        # comms is newest first, store the balls in the order they were bowled
+        balls = CricketDataExtractor(match_data).ball_records()[::-1]
+        if not balls:
+            return 0
+
+        rosters = _rosters(match_data)
+        sides = {str(innings.get("innings_number")): (str(innings.get("batting_team_id")), str(innings.get("bowling_team_id")))
+                 for innings in match_data.get("innings", [])}
+
+        by_player_id = {str(player["player_id"]): (str(player.get("object_id") or player["player_id"]), player.get("known_as") or "")
+                        for team in match_data.get("team", []) for player in team.get("player", []) if player.get("player_id")}
+        run_outs = _run_outs(match_data)
+
+        def player(team_id: str, name: str) -> int:
+            key, known_as = rosters.get((team_id, name), (f"name:{name}", name))
+            return self._player_id(key, known_as)
+
+        def run_out(ball, legal: bool) -> int:
+            # A run out off a wide / no ball is numbered with the ball to come, one more than were bowled
+            balls_bowled = _legal_balls(ball.over) - (not legal)
+            player_id = run_outs.get((str(ball.innings), balls_bowled))
+            if player_id not in by_player_id:
+                return -1
+            return self._player_id(*by_player_id[player_id])
+
+        match_index = len(self.matches)
+        columns = {name: np.empty(len(balls), dtype=dtype) for name, dtype in COLUMNS.items()}
+        for i, ball in enumerate(balls):
+            over, ball_number = split_overs(ball.over)
+            runs, extras, wicket = parse_ball_event(ball.event)
+            wicket = wicket or bool(ball.dismissal)
+            event = (ball.event or "").upper()
+            wide, no_ball = bool(_WIDE.search(event)), bool(_NO_BALL.search(event))
+            is_run_out = ball.dismissal.strip().lower().startswith("run out")
+            bowler, _, batter = ball.players.partition(" to ")
+            batting_team, bowling_team = sides.get(str(ball.innings), ("", ""))
+            batter_id = player(batting_team, batter.strip())
+            columns["match_id"][i] = match_index
+            columns["innings"][i] = int(ball.innings or 0)
+            columns["over"][i] = over
+            columns["ball"][i] = ball_number
+            columns["runs"][i] = runs
+            columns["extras"][i] = extras
+            columns["wicket"][i] = wicket
+            columns["bowler_wicket"][i] = wicket and not is_run_out
+            columns["wide"][i] = wide
+            columns["no_ball"][i] = no_ball
+            columns["batter_id"][i] = batter_id
+            columns["bowler_id"][i] = player(bowling_team, bowler.strip())
+            columns["out_id"][i] = -1 if not wicket else run_out(ball, not (wide or no_ball)) if is_run_out else batter_id
+
+        for name, values in columns.items():
+            filename = self._file(f"{name}.bin")
+            # Drop anything past "rows" left behind by an append that was interrupted before meta.json was written
+            expected_size = self.rows * values.itemsize
+            if os.path.exists(filename) and os.path.getsize(filename) > expected_size:
+                os.truncate(filename, expected_size)
+            with open(filename, "ab") as f:
+                f.write(values.tobytes())
+
+        self.matches.append(match_id)
+        self._match_index[match_id] = match_index
+        self.rows += len(balls)
+        return len(balls)
+
+    def flush(self) -> None:
+        """Write the sidecars, until then other readers (and a reopened store) don't see the new matches"""
+        self._write_json("strings.json", {"players": self.players, "names": self.names, "matches": self.matches})
+        # meta.json is written last, readers only look at the first "rows" entries of each column
+        self._write_json("meta.json", {"rows": self.rows, "columns": {name: np.dtype(dtype).str for name, dtype in COLUMNS.items()}})
+
+    def __enter__(self) -> "BallStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.flush()
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only memory map of one column (zero-copy)"""
+        if self.rows == 0:
+            return np.empty(0, dtype=COLUMNS[name])
+        return np.memmap(self._file(f"{name}.bin"), dtype=COLUMNS[name], mode="r", shape=(self.rows,))
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        return {name: self.column(name) for name in COLUMNS}
+
+    def player_totals(self, role: str = "bowler") -> List[Dict[str, Any]]:
+        """
+        Per player totals over every ball in the store, e.g. wickets per bowler.
+        role is "bowler" or "batter". Done with bincount over the mapped columns.
+        balls are legal balls bowled for a bowler and balls faced (no wides) for a batter.
+        """
+        ids = self.column(f"{role}_id")
+        size = len(self.players)
+        runs = np.bincount(ids, weights=self.column("runs"), minlength=size)
+        extras = np.bincount(ids, weights=self.column("extras"), minlength=size)
+        deliveries = np.bincount(ids, minlength=size)
+        if role == "bowler":
+            wickets = np.bincount(ids, weights=self.column("bowler_wicket"), minlength=size)
+            not_balls = self.column("wide") | self.column("no_ball")
+        else:
+            out_ids = self.column("out_id")
+            wickets = np.bincount(out_ids[out_ids >= 0], minlength=size)
+            not_balls = self.column("wide")
+        balls = deliveries - np.bincount(ids, weights=not_balls, minlength=size)
+
+        totals = []
+        # A batter run out at the non-striker's end may not have faced a ball
+        for index in np.nonzero(deliveries + wickets)[0]:
+            key = self.players[index]
+            totals.append({
+                "player_id": key if key.isdigit() else None,
+                "name": self.names[index],
+                "balls": int(balls[index]),
+                "runs": int(runs[index]),
+                "extras": int(extras[index]),
+                "wickets": int(wickets[index])
+            })
+        totals.sort(key=lambda total: (-total["wickets"], -total["runs"]) if role == "bowler" else (-total["runs"], total["balls"]))
+        return totals
@@ -0,0 +1,82 @@
+import os
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+from src import codec
+from src import metrics
+
+'''
+Cookies and storage of earlier browsers (--browser_state <file>), so consent modals are only dealt with once.
+
+Every fresh Playwright context starts without cookies, so each page used to sit through up to 2 seconds
+per modal probe ("Consent", "Accept All", "ALL") whether a modal showed up or not. After a probe the
+context's storage_state (cookies and localStorage) is saved along with a record of the probe:
+
+    {"storage_state": {"cookies": [...], "origins": [...]},
+     "probes": {"www.espncricinfo.com button:has-text(\\"Consent\\")": {"t": 1732958400.1, "waited": 2.01, "clicked": false}}}
+
+New contexts are created from the saved storage_state and a probe with a record for its host is skipped,
+unless the record is older than max_age_days or one of the host's saved cookies has expired since.
+The time the skipped probe took when it last ran is added to the browser_state.seconds_saved counter.
+'''
+
+MAX_AGE_DAYS = 30
+
+
+def _cookie_matches(cookie: Dict[str, Any], host: str) -> bool:
+    domain = cookie.get("domain", "").lstrip(".")
+    return bool(domain) and (host == domain or host.endswith(f".{domain}"))
+
+
+class BrowserState:
+    def __init__(self, filename: str, max_age_days: float = MAX_AGE_DAYS):
+        self.filename = filename
+        self.max_age = max_age_days * 86400
+        self.storage_state: Optional[Dict[str, Any]] = None
+        self.probes: Dict[str, Dict[str, Any]] = {}
+        self.skipped = 0
+        self.seconds_saved = 0.0
+        if os.path.exists(filename):
+            try:
+                saved = codec.load(filename)
+                self.storage_state = saved.get("storage_state")
+                self.probes = saved.get("probes", {})
+            except (codec.JSONDecodeError, ValueError, AttributeError):
+                # A broken file is the same as no file, the probes just run again
+                print(f"\033[91mError: Ignoring unreadable browser state '{filename}'.\033[0m")
+
+    def context_options(self) -> Dict[str, Any]:
+        """Keyword arguments for browser.new_context()"""
+        return {"storage_state": self.storage_state} if self.storage_state else {}
+
+    def needs_probe(self, url: str, selector: str, now: Optional[float] = None) -> bool:
+        now = time.time() if now is None else now
+        host = urlparse(url).netloc
+        record = self.probes.get(f"{host} {selector}")
+        if record is None or now - record["t"] > self.max_age:
+            return True
+        # Session cookies (expires -1) never go stale in the file, only ones with a date
+        cookies = (self.storage_state or {}).get("cookies", [])
+        return any(_cookie_matches(cookie, host) and 0 < cookie.get("expires", -1) < now for cookie in cookies)
+
+    def skip(self, url: str, selector: str) -> None:
+        waited = self.probes[f"{urlparse(url).netloc} {selector}"]["waited"]
+        self.skipped += 1
+        self.seconds_saved += waited
+        metrics.count("browser_state.probes_skipped")
+        metrics.count("browser_state.seconds_saved", waited)
+
+    async def record(self, context, url: str, selector: str, waited: float, clicked: bool) -> None:
+        """Remember a probe that ran and save the context's cookies and storage with it"""
+        self.probes[f"{urlparse(url).netloc} {selector}"] = {"t": round(time.time(), 3), "waited": round(waited, 3), "clicked": clicked}
+        self.storage_state = await context.storage_state()
+        self.save()
+
+    def save(self) -> None:
+        # Written to a temporary file first so a crash (or another run) never leaves half a file
+        directory = os.path.dirname(self.filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{self.filename}.{os.getpid()}.tmp"
+        codec.dump({"storage_state": self.storage_state, "probes": self.probes}, temporary, pretty=True)
+        os.replace(temporary, self.filename)
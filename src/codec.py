@@ -0,0 +1,85 @@
+import json
+from src.compression import open_output, read_bytes
+
+# orjson is optional, it is a lot faster than the stdlib json module on the
+# big match documents. If it isnt installed everything falls back to json.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+if orjson is not None:
+    BACKEND = "orjson"
+elif msgspec is not None:
+    BACKEND = "msgspec"
+else:
+    BACKEND = "json"
+
+# The one exception type callers need to handle. orjson.JSONDecodeError is already a
+# subclass of it and msgspec's DecodeError is caught in loads() and re-raised as it.
+JSONDecodeError = json.JSONDecodeError
+
+
+def loads(data):
+    """Decode a JSON document from str or bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+
+    if msgspec is not None:
+        try:
+            return msgspec.json.decode(data)
+        except msgspec.DecodeError as e:
+            raise JSONDecodeError(str(e), data if isinstance(data, str) else "", 0) from None
+
+    return json.loads(data)
+
+
+def dumps(data, pretty: bool = False) -> str:
+    """
+    Encode data to a JSON string.
+
+    pretty=True gives the same layout as json.dumps(data, indent=2, ensure_ascii=False)
+    which is what every output file of this tool has always been written with. The bytes are
+    the same too except for two things orjson writes differently: floats with an exponent are
+    shorter (1e-7 where json has 1e-07) and NaN / Infinity, which aren't valid JSON, become null.
+    """
+    return dumps_bytes(data, pretty).decode("utf-8")
+
+
+def dumps_bytes(data, pretty: bool = False) -> bytes:
+    """Same as dumps but returns UTF-8 bytes (saves a decode when writing to a binary file)"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(data, option=option)
+        except TypeError:
+            # orjson refuses things json copes with (ints over 64 bit, subclasses etc.)
+            pass
+
+    elif msgspec is not None and not pretty:
+        try:
+            return msgspec.json.encode(data)
+        except TypeError:
+            pass
+
+    if pretty:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def load(filename: str):
+    """Read and decode a JSON file (gzip or zstd compressed ones too)"""
+    return loads(read_bytes(filename))
+
+
+def dump(data, filename: str, pretty: bool = True) -> None:
+    """Encode data and write it to filename, compressed if it ends in .gz or .zst"""
+    with open_output(filename) as f:
+        f.write(dumps_bytes(data, pretty))
@@ -0,0 +1,68 @@
+import gzip
+
+# zstandard is optional, only needed for .zst files
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Output files are compressed according to their extension
+COMPRESSED_EXTENSIONS = (".gz", ".zst")
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 6
+
+
+def open_binary(filename: str):
+    """
+    Open a file for reading, transparently decompressing gzip or zstd.
+    The format is worked out from the first bytes of the file so the extension doesnt matter.
+    """
+    f = open(filename, "rb")
+    magic = f.read(4)
+    f.seek(0)
+
+    if magic[:2] == GZIP_MAGIC:
+        return gzip.GzipFile(fileobj=f, mode="rb")
+
+    if magic == ZSTD_MAGIC:
+        if zstandard is None:
+            f.close()
+            raise RuntimeError(f"'{filename}' is zstd compressed, install the zstandard package to read it.")
+        return zstandard.ZstdDecompressor().stream_reader(f, closefd=True)
+
+    return f
+
+
+def read_bytes(filename: str) -> bytes:
+    """Read a whole (possibly compressed) file"""
+    with open_binary(filename) as f:
+        return f.read()
+
+
+def open_output(filename: str):
+    """Open a file for writing, compressed by its extension: .gz gzip, .zst zstd, anything else plain"""
+    if filename.endswith(".gz"):
+        return gzip.open(filename, "wb", compresslevel=GZIP_LEVEL)
+
+    if filename.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"Can't write '{filename}', install the zstandard package for .zst output.")
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(open(filename, "wb"), closefd=True)
+
+    return open(filename, "wb")
+
+
+def write_bytes(filename: str, data: bytes) -> None:
+    with open_output(filename) as f:
+        f.write(data)
+
+
+def split_compression(filename: str):
+    """"nepal.json.gz" -> ("nepal.json", ".gz"), ("nepal.json", "") when it isn't compressed"""
+    for extension in COMPRESSED_EXTENSIONS:
+        if filename.endswith(extension):
+            return filename[:-len(extension)], extension
+    return filename, ""
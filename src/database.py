@@ -0,0 +1,431 @@
+import glob
+import os
+import sqlite3
+from typing import Any, Dict, List, Tuple
+from src import codec
+from src.match.loader import iter_match_documents
+from src.match.records import BallRecord
+from src.match.schema import get_match_id, project_match
+
+'''
+Local SQLite database of everything the scraper produces.
+
+ingest_path() normalises the JSON outputs of --team (roster), --team_full, --player and match JSON
+(single matches or archives) into the tables below. Every table has a primary key and inserts are
+upserts, so ingesting the same file twice (or a newer snapshot of a live match) just updates rows.
+
+run_query() answers the common questions with indexed lookups instead of re-reading every JSON file.
+'''
+
+DEFAULT_DB = "cricket.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    player_id TEXT PRIMARY KEY,
+    name TEXT COLLATE NOCASE,
+    slug TEXT,
+    image_url TEXT,
+    headshot_image_url TEXT,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_players_name ON players (name);
+
+CREATE TABLE IF NOT EXISTS player_stats (
+    player_id TEXT NOT NULL,
+    heading TEXT NOT NULL,
+    row_number INTEGER NOT NULL,
+    span TEXT,
+    matches INTEGER,
+    runs INTEGER,
+    wickets INTEGER,
+    data TEXT,
+    PRIMARY KEY (player_id, heading, row_number)
+);
+
+CREATE TABLE IF NOT EXISTS matches (
+    match_id TEXT PRIMARY KEY,
+    title TEXT,
+    start_date TEXT,
+    year INTEGER,
+    season TEXT,
+    venue TEXT COLLATE NOCASE,
+    city TEXT,
+    format TEXT,
+    result TEXT,
+    team1_id TEXT,
+    team1_name TEXT COLLATE NOCASE,
+    team2_id TEXT,
+    team2_name TEXT COLLATE NOCASE,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_matches_year ON matches (year);
+CREATE INDEX IF NOT EXISTS idx_matches_team1 ON matches (team1_name);
+CREATE INDEX IF NOT EXISTS idx_matches_team2 ON matches (team2_name);
+
+CREATE TABLE IF NOT EXISTS innings (
+    match_id TEXT NOT NULL,
+    innings_number INTEGER NOT NULL,
+    batting_team_id TEXT,
+    bowling_team_id TEXT,
+    runs INTEGER,
+    wickets INTEGER,
+    overs TEXT,
+    run_rate REAL,
+    extras INTEGER,
+    target INTEGER,
+    PRIMARY KEY (match_id, innings_number)
+);
+
+CREATE TABLE IF NOT EXISTS match_players (
+    match_id TEXT NOT NULL,
+    player_id TEXT NOT NULL,
+    legacy_player_id TEXT,
+    team_id TEXT,
+    team_name TEXT,
+    name TEXT,
+    role TEXT,
+    captain INTEGER,
+    keeper INTEGER,
+    PRIMARY KEY (match_id, player_id)
+);
+CREATE INDEX IF NOT EXISTS idx_match_players_player ON match_players (player_id);
+
+CREATE TABLE IF NOT EXISTS balls (
+    match_id TEXT NOT NULL,
+    innings INTEGER NOT NULL,
+    over TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    over_number INTEGER,
+    bowler TEXT COLLATE NOCASE,
+    batter TEXT COLLATE NOCASE,
+    event TEXT,
+    dismissal TEXT,
+    is_wicket INTEGER,
+    text TEXT,
+    PRIMARY KEY (match_id, innings, over, seq)
+);
+CREATE INDEX IF NOT EXISTS idx_balls_bowler ON balls (bowler, is_wicket);
+CREATE INDEX IF NOT EXISTS idx_balls_batter ON balls (batter);
+
+-- When each player's stats page was last fetched and a hash of its stats tables (--refresh)
+CREATE TABLE IF NOT EXISTS player_pages (
+    player_id TEXT PRIMARY KEY,
+    content_hash TEXT,
+    fetched_at TEXT,
+    changed_at TEXT
+);
+"""
+
+
+def connect(db_path: str = DEFAULT_DB) -> sqlite3.Connection:
+    """Open (creating if needed) the database and make sure all tables and indexes exist"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _upsert(conn: sqlite3.Connection, table: str, key: Tuple[str, ...], rows: List[Dict[str, Any]]) -> int:
+    """INSERT ... ON CONFLICT DO UPDATE for a batch of rows that all have the same columns"""
+    if not rows:
+        return 0
+    columns = list(rows[0])
+    updates = ", ".join(f"{column} = excluded.{column}" for column in columns if column not in key)
+    sql = (
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)}) "
+        f"ON CONFLICT ({', '.join(key)}) DO " + (f"UPDATE SET {updates}" if updates else "NOTHING")
+    )
+    conn.executemany(sql, [tuple(row[column] for column in columns) for row in rows])
+    return len(rows)
+
+
+def _to_int(value):
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        value = value.strip().rstrip("*")
+        if value.lstrip("-").isdigit():
+            return int(value)
+    return None
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _text(value):
+    return None if value is None else str(value)
+
+
+def ingest_player_stats(conn: sqlite3.Connection, player: Dict[str, Any]) -> int:
+    """Output of extract_player_data: {"player_name", "player_id", "stats": {heading: [rows]}}"""
+    player_id = _text(player.get("player_id"))
+    if not player_id:
+        return 0
+
+    conn.execute(
+        "INSERT INTO players (player_id, name) VALUES (?, ?) ON CONFLICT (player_id) DO UPDATE SET name = COALESCE(players.name, excluded.name)",
+        (player_id, player.get("player_name"))
+    )
+    # Rows for a heading can disappear between scrapes, replace the player's stats wholesale
+    conn.execute("DELETE FROM player_stats WHERE player_id = ?", (player_id,))
+
+    rows = []
+    for heading, stats_rows in player.get("stats", {}).items():
+        for row_number, row in enumerate(stats_rows):
+            rows.append({
+                "player_id": player_id,
+                "heading": heading,
+                "row_number": row_number,
+                "span": row.get("Span"),
+                "matches": _to_int(row.get("Mat")),
+                "runs": _to_int(row.get("Runs")),
+                "wickets": _to_int(row.get("Wkts")),
+                "data": codec.dumps(row)
+            })
+    return _upsert(conn, "player_stats", ("player_id", "heading", "row_number"), rows) + 1
+
+
+def ingest_roster_player(conn: sqlite3.Connection, player: Dict[str, Any]) -> int:
+    """One entry of extract_team_data output (team_full entries also carry "full_data")"""
+    player_id = _text(player.get("objectId"))
+    if not player_id:
+        return 0
+
+    full_data = player.get("full_data")
+    data = {key: value for key, value in player.items() if key != "full_data"}
+    count = _upsert(conn, "players", ("player_id",), [{
+        "player_id": player_id,
+        "name": player.get("longName") or player.get("name"),
+        "slug": player.get("slug"),
+        "image_url": player.get("imageUrl"),
+        "headshot_image_url": player.get("headshotImageUrl"),
+        "data": codec.dumps(data)
+    }])
+
+    if isinstance(full_data, dict):
+        count += ingest_player_stats(conn, {**full_data, "player_id": player_id})
+    return count
+
+
+def ingest_match(conn: sqlite3.Connection, match_data: Dict[str, Any], source: str = None) -> int:
+    """A match JSON document: match details, innings, both squads and every ball in comms"""
+    match_id = get_match_id(match_data, source)
+    match = match_data.get("match", {})
+    start_date = match.get("start_date_raw") or ""
+
+    count = _upsert(conn, "matches", ("match_id",), [{
+        "match_id": match_id,
+        "title": match_data.get("description") or match.get("cms_match_title"),
+        "start_date": start_date,
+        "year": _to_int(start_date[:4]),
+        "season": match.get("season"),
+        "venue": match.get("ground_name"),
+        "city": match.get("town_name"),
+        "format": match.get("international_class_name"),
+        "result": match_data.get("live", {}).get("status"),
+        "team1_id": _text(match.get("team1_id")),
+        "team1_name": match.get("team1_name"),
+        "team2_id": _text(match.get("team2_id")),
+        "team2_name": match.get("team2_name"),
+        "source": source
+    }])
+
+    count += _upsert(conn, "innings", ("match_id", "innings_number"), [{
+        "match_id": match_id,
+        "innings_number": _to_int(innings.get("innings_number")),
+        "batting_team_id": _text(innings.get("batting_team_id")),
+        "bowling_team_id": _text(innings.get("bowling_team_id")),
+        "runs": _to_int(innings.get("runs")),
+        "wickets": _to_int(innings.get("wickets")),
+        "overs": _text(innings.get("overs")),
+        "run_rate": _to_float(innings.get("run_rate")),
+        "extras": _to_int(innings.get("extras")),
+        "target": _to_int(innings.get("target"))
+    } for innings in match_data.get("innings", [])])
+
+    count += _upsert(conn, "match_players", ("match_id", "player_id"), [{
+        "match_id": match_id,
+        "player_id": _text(player.get("object_id") or player.get("player_id")),
+        "legacy_player_id": _text(player.get("player_id")),
+        "team_id": _text(team.get("team_id")),
+        "team_name": team.get("team_name"),
+        "name": player.get("known_as"),
+        "role": player.get("player_primary_role"),
+        "captain": int(bool(player.get("captain"))),
+        "keeper": int(bool(player.get("keeper")))
+    } for team in match_data.get("team", []) for player in team.get("player", [])])
+
+    # comms is newest first, walk it oldest first so a repeated over number (wides, no balls)
+    # gets the same seq every time a later snapshot of the match is ingested
+    balls = []
+    seen = {}
+    for comm in reversed(match_data.get("comms", [])):
+        for ball in reversed(comm.get("ball", [])):
+            record = BallRecord.from_comms(ball, comm.get("over_number", 0), comm.get("innings_number", 0))
+            innings = _to_int(record.innings) or 0
+            key = (innings, record.over)
+            seen[key] = seen.get(key, -1) + 1
+            bowler, _, batter = record.players.partition(" to ")
+            balls.append({
+                "match_id": match_id,
+                "innings": innings,
+                "over": record.over,
+                "seq": seen[key],
+                "over_number": _to_int(record.over_number),
+                "bowler": bowler.strip(),
+                "batter": batter.strip(),
+                "event": record.event,
+                "dismissal": record.dismissal,
+                "is_wicket": int(bool(record.dismissal) or "OUT" in record.event.upper()),
+                "text": record.text
+            })
+    count += _upsert(conn, "balls", ("match_id", "innings", "over", "seq"), balls)
+
+    return count
+
+
+def is_match_document(document) -> bool:
+    """Whether a decoded document is a match (rather than a team, player or player stats output)"""
+    return isinstance(document, dict) and any(key in document for key in ['match', 'innings', 'comms'])
+
+
+def ingest_file(conn: sqlite3.Connection, filename: str, ball_store=None) -> Dict[str, int]:
+    """
+    Ingest one output file, working out what it is from its contents.
+    Arrays are walked item by item so big files are never fully decoded at once.
+    Matches are also appended to ball_store (a src.ball_store.BallStore) when one is given.
+    """
+    counts = {"matches": 0, "players": 0, "player_stats": 0, "skipped": 0, "rows": 0, "balls_stored": 0}
+    match_index = 0
+
+    with conn:
+        for text in iter_match_documents(filename):
+            document = codec.loads(text)
+
+            if is_match_document(document):
+                match_index += 1
+                source = filename if match_index == 1 else f"{filename}#{match_index}"
+                match_data = project_match(document)
+                counts["rows"] += ingest_match(conn, match_data, source)
+                counts["matches"] += 1
+                if ball_store is not None:
+                    counts["balls_stored"] += ball_store.append_match(match_data, source)
+            elif isinstance(document, dict) and "stats" in document and "player_id" in document:
+                counts["rows"] += ingest_player_stats(conn, document)
+                counts["player_stats"] += 1
+            elif isinstance(document, dict) and "objectId" in document:
+                counts["rows"] += ingest_roster_player(conn, document)
+                counts["players"] += 1
+            else:
+                counts["skipped"] += 1
+
+    return counts
+
+
+def ingest_path(conn: sqlite3.Connection, path: str, pattern: str = "*.json", ball_store=None) -> Dict[str, int]:
+    """Ingest a single file or every file matching pattern inside a directory"""
+    if os.path.isdir(path):
+        files = sorted(glob.glob(os.path.join(path, pattern), recursive=True))
+    else:
+        files = [path]
+
+    totals = {"files": 0, "matches": 0, "players": 0, "player_stats": 0, "skipped": 0, "rows": 0, "balls_stored": 0}
+    try:
+        for filename in files:
+            counts = ingest_file(conn, filename, ball_store)
+            totals["files"] += 1
+            for key, value in counts.items():
+                totals[key] += value
+    finally:
+        # The ball store's sidecars are written once for the whole batch
+        if ball_store is not None:
+            ball_store.flush()
+    return totals
+
+
+# name -> (SQL, {filter name: SQL condition}, ORDER BY)
+QUERIES = {
+    "matches": (
+        "SELECT match_id, start_date, title, team1_name, team2_name, venue, result FROM matches",
+        {
+            "year": "year = :year",
+            "team": "(team1_name LIKE :team OR team2_name LIKE :team)",
+            "venue": "venue LIKE :venue",
+            "match_id": "match_id = :match_id"
+        },
+        "start_date"
+    ),
+    "wickets": (
+        "SELECT m.start_date, m.title, b.innings, b.over, b.bowler, b.batter, b.dismissal, b.event "
+        "FROM balls b JOIN matches m ON m.match_id = b.match_id WHERE b.is_wicket = 1",
+        {
+            "bowler": "b.bowler LIKE :bowler",
+            "batter": "b.batter LIKE :batter",
+            "year": "m.year = :year",
+            "match_id": "b.match_id = :match_id"
+        },
+        "m.start_date, b.innings, b.over"
+    ),
+    "balls": (
+        "SELECT m.start_date, b.match_id, b.innings, b.over, b.bowler, b.batter, b.event, b.dismissal "
+        "FROM balls b JOIN matches m ON m.match_id = b.match_id",
+        {
+            "bowler": "b.bowler LIKE :bowler",
+            "batter": "b.batter LIKE :batter",
+            "year": "m.year = :year",
+            "match_id": "b.match_id = :match_id",
+            "innings": "b.innings = :innings"
+        },
+        "m.start_date, b.match_id, b.innings, b.over, b.seq"
+    ),
+    "players": (
+        "SELECT player_id, name, slug, image_url FROM players",
+        {
+            "name": "name LIKE :name",
+            "player_id": "player_id = :player_id"
+        },
+        "name"
+    ),
+    "stats": (
+        "SELECT p.name, s.player_id, s.heading, s.span, s.matches, s.runs, s.wickets "
+        "FROM player_stats s LEFT JOIN players p ON p.player_id = s.player_id",
+        {
+            "name": "p.name LIKE :name",
+            "player_id": "s.player_id = :player_id",
+            "heading": "s.heading LIKE :heading"
+        },
+        "s.player_id, s.heading, s.row_number"
+    ),
+}
+
+
+def run_query(conn: sqlite3.Connection, name: str, filters: Dict[str, str] = None, limit: int = None) -> List[Dict[str, Any]]:
+    """
+    Run one of the QUERIES with key=value filters.
+    Text filters are matched case-insensitively with LIKE so % wildcards work, e.g. bowler=Kirt%
+    (a leading % still works but can't use the index)
+    """
+    if name not in QUERIES:
+        raise ValueError(f"Unknown query '{name}'. Valid options: {', '.join(QUERIES)}")
+
+    sql, allowed_filters, order_by = QUERIES[name]
+    filters = filters or {}
+    conditions = []
+    for key in filters:
+        if key not in allowed_filters:
+            raise ValueError(f"Unknown filter '{key}' for query '{name}'. Valid filters: {', '.join(allowed_filters)}")
+        conditions.append(allowed_filters[key])
+
+    if conditions:
+        sql += (" AND " if " WHERE " in sql else " WHERE ") + " AND ".join(conditions)
+    sql += f" ORDER BY {order_by}"
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+
+    return [dict(row) for row in conn.execute(sql, filters)]
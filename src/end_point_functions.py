@@ -1,13 +1,19 @@
 from anyio import sleep
-from src.utils import fetch_page, write_to_file, verify_link
-from src.extract_team_data import extract_team_data, get_team_id, get_team_country, get_team_uuid
-from src.extract_player_data import extract_player_data
-from src.extract_match_data import extract_match_data
+import asyncio
+from itertools import chain
+import contextlib
+import glob
+import io
+import os
+import sys
+import time
+from src.utils import fetch_page, write_to_file, verify_link, page_store, output_filename
 from src.progress_bar import print_progress_bar
-import json
-from src.match.processor import process_cricket_data
-from src.match.analyser import CricketMatchAnalyzer, analyze_cricket_match
-from src.match.extractor import CricketDataExtractor
+from src import codec
+from src import metrics
+
+# Playwright, BeautifulSoup, pandas, numpy and the match/database modules are imported inside the
+# functions that need them, so main.py --help and the light commands don't pay for all of them at startup.
 
 '''
 Using sleep between each player info retrieval.
@@ -18,10 +24,11 @@ Sleep times between players tested:
 
 
 
-async def team_data(URL: str, output: str = "output") -> None:
+async def team_data(URL: str, output: str = "output", base_url: str = None) -> None:
     if not verify_link(URL, "team"):
         print("\033[91mError: Invalid team URL. It should start with 'https://www.espncricinfo.com/team/' or 'https://www.espncricinfo.com/cricketers/team/' and be followed by the team name only (no extra slashes).\033[0m")
         return
+    from src.extract_team_data import extract_team_data, get_team_id, get_team_country
 
     team_id = get_team_id(URL).replace("-", "_")
     team_country = get_team_country(URL)
@@ -33,9 +40,9 @@ async def team_data(URL: str, output: str = "output") -> None:
     print(f"Output will be saved to: {output}")
     print(f"Scraping team: {team_id}")
 
-    all_players = await extract_team_data(URL, output)
+    all_players = await extract_team_data(URL, output, base_url)
 
-    print(f"Output saved to: {output}.json")
+    print(f"Output saved to: {output_filename(output, 'json')}")
 
     print(f"Task Completed: Collected all {len(all_players)} players from {team_country}.")
     
@@ -43,22 +50,27 @@ async def team_data(URL: str, output: str = "output") -> None:
     write_to_file(all_players, "json", output)
 
 
-async def player_data(URL: str, individual_player: bool = False, output: str = "output") -> None:
+async def player_data(URL: str, individual_player: bool = False, output: str = "output", base_url: str = None) -> None:
 
     if individual_player:
-        player_data = await extract_player_data(URL, True)
+        from src.extract_player_data import extract_player_data
+        player_data = await extract_player_data(URL, True, base_url)
         if output == "output":
             output = player_data.get("player_id")
         write_to_file(player_data, "json", output)
 
 
-async def team_full_data(URL: str, output: str = "output", existing_team_data: str = None, existing_player_data: str = None) -> None:
+async def team_full_data(URL: str, output: str = "output", existing_team_data: str = None, existing_player_data: str = None, base_url: str = None, delay: float = 5) -> None:
     # existing_team_data is just the path to the JSON file containing team data (literally just a list of team members links and ids)
     # existing_player_data is just the path to the JSON file containing player data (already scraped data)
+    # base_url sends every request to another host e.g. the local mock server (src/mock_server.py)
+    # delay is the pause between players, keep it when scraping the real site
     dissected_url = URL.strip().split('/')
     if not verify_link(URL, "team"):
         print("\033[91mError: Invalid team URL. It should start with 'https://www.espncricinfo.com/team/' or 'https://www.espncricinfo.com/cricketers/team/' and be followed by the team name only (no extra slashes).\033[0m")
         return
+    from src.extract_team_data import extract_team_data
+    from src.extract_player_data import extract_player_data
     #dissected_url has array structure like ['https:', '', 'www.espncricinfo.com', 'team', 'united-arab-emirates-27']
     print(f"Scraping players from: {dissected_url[-1]}")
     print(f"Data will be saved into: {output}")
@@ -70,66 +82,166 @@ async def team_full_data(URL: str, output: str = "output", existing_team_data: s
 
 
     if existing_team_data: #if existing team members list then use it
-        with open(existing_team_data, "r", encoding="utf-8") as f:
-            team_json = json.load(f)
+        team_json = codec.load(existing_team_data)
 
     if existing_player_data and not existing_team_data: # if existing player data was already scraped then finish off the job
-        with open(existing_player_data, "r", encoding="utf-8") as f:
-            team_json = json.load(f)
+        team_json = codec.load(existing_player_data)
 
     if not existing_player_data and not existing_team_data:
-        team_json = await extract_team_data(URL, output)
+        team_json = await extract_team_data(URL, output, base_url)
 
     index = 0
 
     for player in team_json:
         index+=1
         player_id = str(player.get("objectId"))
-        player_data = await extract_player_data(player_id, False)
+        player_data = await extract_player_data(player_id, False, base_url)
         player["full_data"] = player_data
         print_progress_bar(index / len(team_json), True)
         write_to_file(team_json, "json", output) # save the updated team JSON after each player is processed so save if anything interrupts v annoying
-        await sleep(5)
+        with metrics.span("team_full_data.sleep"):
+            await sleep(delay)
+
+async def refresh_data(team_file: str, db_path: str = "cricket.db", limit: int = None, max_age_days: float = 7, base_url: str = None, delay: float = 5) -> None:
+    """
+    Re-fetch the stats pages of the players in a team / team_full output that may have changed
+    (see src/refresh.py) and update the file and the database with the ones that did.
+    """
+    if not os.path.isfile(team_file):
+        print(f"\033[91mError: File '{team_file}' not found.\033[0m")
+        return
+    team_json = codec.load(team_file)
+    if not isinstance(team_json, list):
+        print(f"\033[91mError: '{team_file}' is not a --team or --team_full output.\033[0m")
+        return
+    from src.database import connect
+    from src.refresh import refresh_players
+    from src.utils import BrowserSession
+
+    conn = connect(db_path)
+    counts = None
+    try:
+        async with BrowserSession(base_url) as session:
+            counts = await refresh_players(conn, team_json, session.fetch, limit, max_age_days, delay)
+    finally:
+        conn.close()
+        # Also written when interrupted, the players refreshed so far are already in the database.
+        # Written back to the exact file, compressed the same way it was (not by --output)
+        if counts is None or counts["changed"]:
+            codec.dump(team_json, team_file, pretty=True)
+    print(f"Refreshed {team_file}: {counts['fetched']} fetched, {counts['changed']} changed, {counts['unchanged']} unchanged, "
+          f"{counts['skipped']} skipped, {counts['failed']} failed")
+
+async def images_data(team_file: str, output: str = "images", concurrency: int = 16, thumbnail_size: int = None, base_url: str = None) -> None:
+    """
+    Download the pictures of every player in a team / team_full output into the output directory
+    (see src/images.py), only the ones that changed since the last run are downloaded again.
+    thumbnail_size also makes resized copies (needs Pillow).
+    """
+    if not os.path.isfile(team_file):
+        print(f"\033[91mError: File '{team_file}' not found.\033[0m")
+        return
+    team_json = codec.load(team_file)
+    if not isinstance(team_json, list):
+        print(f"\033[91mError: '{team_file}' is not a --team or --team_full output.\033[0m")
+        return
+    from src.images import sync_images
+
+    print(f"Syncing player images from {team_file} into {output}")
+    start = time.perf_counter()
+    try:
+        counts = await sync_images(team_json, output, concurrency, thumbnail_size, base_url)
+    except RuntimeError as e:
+        print(f"\033[91mError: {str(e)}\033[0m")
+        return
+    print(f"Task Completed: {counts['urls']} images for {counts['players']} players in {time.perf_counter() - start:.1f}s: "
+          f"{counts['downloaded']} downloaded, {counts['deduplicated']} duplicates, {counts['unchanged']} unchanged, "
+          f"{counts['missing']} missing, {counts['failed']} failed.")
+    if thumbnail_size:
+        print(f"{counts['thumbnails']} new {thumbnail_size}px thumbnails in {os.path.join(output, 'thumbnails', str(thumbnail_size))}")
 
-async def page(url: str, output: str = "output") -> None:
-    page_html = await fetch_page(url)
+async def page(url: str, output: str = "output", base_url: str = None) -> None:
+    page_html = await fetch_page(url, base_url)
+    store = page_store()
+    if store is not None:
+        # fetch_page already put the body in the store, the output only points at it
+        from src.page_store import content_hash
+        write_to_file(store.reference(content_hash(page_html.encode("utf-8")), url), "json", output)
+        print(f"Page stored in {store.directory}, reference saved to: {output_filename(output, 'json')}")
+        return
     write_to_file(page_html, "html", output)
 
-async def match_data(match_url: str = None, output: str = "output", analysis_type: str = "comprehensive", filename: str = None) -> None:
+async def match_data(match_url: str = None, output: str = "output", analysis_type: str = "comprehensive", filename: str = None, full_data: bool = False, base_url: str = None) -> None:
     """
     Extract and analyze cricket match data from ESPN Cricinfo
     
     Args:
         match_url: ESPN Cricinfo match JSON URL (optional if filename is provided)
         output: Output filename (without extension)
-        analysis_type: Type of analysis to perform
+        analysis_type: Type of analysis to perform, or a list of them ("summary,live", ["summary", "live"], "all")
+            which are all written from one load of the match
             - "comprehensive": Full analysis with all data extraction methods
             - "summary": Basic match summary only
             - "live": Current match state only
             - "structured": Structured data extraction only
             - "timeline": Event-by-event timeline of the match
         filename: Path to existing JSON file containing match data (optional)
+        full_data: Keep the whole match document in memory and embed it as "raw_data" in the
+            comprehensive output. By default only the fields the analysers read are decoded
+            and "raw_data" just references where the match came from.
+        base_url: Fetch match_url from this host instead of ESPN (e.g. the local mock server)
     """
+    from src.match.loader import iter_matches
     try:
         # Load match data from file or URL
         if filename:
             print(f"Loading match data from file: {filename}")
             try:
-                with open(filename, 'r', encoding='utf-8') as f:
-                    match_data = json.load(f)
-                print(f"Successfully loaded match data from file")
+                # The file can hold one match or many (JSON array / NDJSON, optionally compressed),
+                # they are streamed one at a time so only a couple are ever in memory
+                with metrics.span("match_data.load"):
+                    matches = iter_matches(filename, full_data)
+                    first_match = next(matches, None)
+                    second_match = next(matches, None)
             except FileNotFoundError:
                 print(f"\033[91mError: File '{filename}' not found.\033[0m")
                 return
-            except json.JSONDecodeError as e:
+            except codec.JSONDecodeError as e:
                 print(f"\033[91mError: Invalid JSON in file '{filename}': {str(e)}\033[0m")
                 return
             except Exception as e:
                 print(f"\033[91mError reading file '{filename}': {str(e)}\033[0m")
                 return
+
+            if first_match is None:
+                print(f"\033[91mError: No match data found in file '{filename}'.\033[0m")
+                return
+
+            if second_match is None:
+                print(f"Successfully loaded match data from file")
+                if _analyse_match(first_match, output, analysis_type, filename, full_data):
+                    print(f"\nMatch data processing completed successfully!")
+                return
+
+            print(f"File contains multiple matches, analysing them one at a time")
+            analysed = 0
+            index = 0
+            try:
+                for index, match in enumerate(chain([first_match, second_match], matches), 1):
+                    print(f"\n--- Match {index} ---")
+                    if _analyse_match(match, f"{output}_{index}", analysis_type, f"{filename}#{index}", full_data):
+                        analysed += 1
+            except (codec.JSONDecodeError, ValueError) as e:
+                print(f"\033[91mError: Invalid JSON after match {index} in file '{filename}': {str(e)}\033[0m")
+
+            print(f"\nMatch data processing completed: {analysed} of {index} matches analysed successfully!")
+            return
+
         elif match_url:
             print(f"Fetching match data from URL: {match_url}")
-            match_data = await extract_match_data(match_url)
+            from src.extract_match_data import extract_match_data
+            with metrics.span("match_data.fetch"):
+                match_data = await extract_match_data(match_url, full=full_data, base_url=base_url)
             if not match_data:
                 print("\033[91mError: Failed to fetch match data. Please check the URL.\033[0m")
                 return
@@ -137,171 +249,594 @@ async def match_data(match_url: str = None, output: str = "output", analysis_typ
         else:
             print("\033[91mError: Either match_url or filename must be provided.\033[0m")
             return
-        
-        # Validate that this is match data, not player data
-        if not _is_match_data(match_data):
-            print("\033[91mError: The provided data does not appear to be cricket match data.\033[0m")
-            print("Please ensure you're using a match JSON file, not player data.")
-            return
-        
-        # Initialize analyzers
-        analyzer = CricketMatchAnalyzer(match_data)
-        extractor = CricketDataExtractor(match_data)
-        
-        # Process based on analysis type
-        if analysis_type == "comprehensive":
-            print("\nPerforming comprehensive analysis...")
-            
-            # Get comprehensive analysis
-            analysis_result = analyze_cricket_match(match_data)
-            
-            # Process with the processor function
-            processed_data = process_cricket_data(match_data)
-            
-            # Convert DataFrames to dictionaries for JSON serialization
-            analysis_result_serializable = {
-                'match_summary': analysis_result['match_summary'],
-                'innings_data': analysis_result['innings_data'],
-                'batting_stats': analysis_result['batting_stats'].to_dict('records') if not analysis_result['batting_stats'].empty else [],
-                'bowling_stats': analysis_result['bowling_stats'].to_dict('records') if not analysis_result['bowling_stats'].empty else [],
-                'ball_by_ball': analysis_result['ball_by_ball'].to_dict('records') if not analysis_result['ball_by_ball'].empty else [],
-                'human_report': analysis_result['human_report']
-            }
-            
-            # Combine all results
-            comprehensive_data = {
-                "raw_data": match_data,
-                "analysis": analysis_result_serializable,
-                "processed": processed_data,
-                "extracted": {
-                    "match_info": extractor.extract_match_info(),
-                    "team_info": extractor.extract_team_info(),
-                    "innings_data": extractor.extract_innings_data(),
-                    "live_batting": extractor.extract_live_batting(),
-                    "live_bowling": extractor.extract_live_bowling(),
-                    "ball_by_ball": extractor.extract_ball_by_ball(),
-                    "partnerships": extractor.extract_partnerships()
-                }
-            }
-            
-            # Save comprehensive data
-            write_to_file(comprehensive_data, "json", f"{output}_comprehensive")
-            
-            # Print human-readable report
-            print("\n" + "="*80)
-            print("CRICKET MATCH ANALYSIS REPORT")
-            print("="*80)
-            print(analysis_result['human_report'])
-            
-            print(f"\nComprehensive analysis saved to: {output}_comprehensive.json")
-            
-        elif analysis_type == "summary":
-            print("\nGenerating match summary...")
-            
-            # Get basic summary
-            match_info = extractor.extract_match_info()
-            team_info = extractor.extract_team_info()
-            innings_data = extractor.extract_innings_data()
-            
-            summary_data = {
-                "match_info": match_info,
-                "team_info": team_info,
-                "innings_summary": innings_data,
-                "human_readable": extractor.get_human_readable_summary()
-            }
-            
-            write_to_file(summary_data, "json", f"{output}_summary")
-            
-            print(extractor.get_human_readable_summary())
-            print(f"\nMatch summary saved to: {output}_summary.json")
-            
-        elif analysis_type == "live":
-            print("\nExtracting live match state...")
-            
-            # Get current match state
-            live_batting = extractor.extract_live_batting()
-            live_bowling = extractor.extract_live_bowling()
-            partnerships = extractor.extract_partnerships()
-            
-            live_data = {
-                "current_batting": live_batting,
-                "current_bowling": live_bowling,
-                "partnerships": partnerships,
-                "timestamp": match_data.get('live', {}).get('timestamp', '')
-            }
-            
-            write_to_file(live_data, "json", f"{output}_live")
-            
-            print("Current Batting:")
-            for batter in live_batting:
-                if batter['position'] in ['striker', 'non-striker']:
-                    print(f"  {batter['position']}: {batter['runs']}* ({batter['balls_faced']}b) SR: {batter['strike_rate']}")
-            
-            print("\nCurrent Bowling:")
-            for bowler in live_bowling:
-                print(f"  {bowler['overs']}-{bowler['maidens']}-{bowler['runs_conceded']}-{bowler['wickets']} Econ: {bowler['economy_rate']}")
-            
-            print(f"\nLive match data saved to: {output}_live.json")
-            
-        elif analysis_type == "structured":
-            print("\nExtracting structured data...")
-            
-            # Get structured data using analyzer
-            match_summary = analyzer.get_match_summary()
-            innings_summary = analyzer.get_innings_summary()
-            batting_stats = analyzer.get_current_batting_stats()
-            bowling_stats = analyzer.get_current_bowling_stats()
-            ball_by_ball = analyzer.get_ball_by_ball_data()
-            
-            structured_data = {
-                "match_summary": match_summary,
-                "innings_summary": innings_summary,
-                "batting_stats": batting_stats.to_dict('records') if not batting_stats.empty else [],
-                "bowling_stats": bowling_stats.to_dict('records') if not bowling_stats.empty else [],
-                "ball_by_ball": ball_by_ball.to_dict('records') if not ball_by_ball.empty else []
-            }
-            
-            write_to_file(structured_data, "json", f"{output}_structured")
-            
-            print("Match Summary:")
-            print(json.dumps(match_summary, indent=2))
-            
-            print(f"\nStructured data saved to: {output}_structured.json")
-            
-        elif analysis_type == "timeline":
-            print("\nGenerating event-by-event timeline...")
-            
-            # Get timeline data
-            timeline_events = extractor.extract_match_timeline()
-            timeline_report = extractor.generate_timeline_report()
-            
-            timeline_data = {
-                "timeline_events": timeline_events,
-                "timeline_report": timeline_report,
-                "total_events": len(timeline_events)
-            }
-            
-            write_to_file(timeline_data, "json", output)
-            
-            # Also save the human-readable report as a text file
-            with open(f"{output}.txt", 'w', encoding='utf-8') as f:
-                f.write(timeline_report)
-            
-            print(timeline_report)
-            print(f"\nTimeline data saved to: {output}.json")
-            print(f"Timeline report saved to: {output}.txt")
-            
-        else:
-            print(f"\033[91mError: Invalid analysis_type '{analysis_type}'. Valid options: comprehensive, summary, live, structured, timeline\033[0m")
-            return
 
-        
-        print(f"\nMatch data processing completed successfully!")
+        if _analyse_match(match_data, output, analysis_type, match_url, full_data):
+            print(f"\nMatch data processing completed successfully!")
         
     except Exception as e:
         print(f"\033[91mError processing match data: {str(e)}\033[0m")
         print("Please check the match URL and try again.")
 
+async def match_dir_data(match_dir: str, output: str = "output", analysis_type: str = "comprehensive", pattern: str = "*.json", workers: int = None, full_data: bool = False) -> None:
+    """
+    Run analysis_type (one or several) over every saved match file in a directory using a process pool.
+
+    Args:
+        match_dir: Directory containing match JSON files (archives of many matches work too)
+        output: Directory the per-match outputs and index.json are written to
+        analysis_type: Same choices as match_data
+        pattern: Glob for the files to pick up inside match_dir, e.g. "*.json" or "**/*.json.gz"
+        workers: Number of worker processes (default: number of CPUs). 1 runs everything in this process.
+        full_data: See match_data
+    """
+    if not os.path.isdir(match_dir):
+        print(f"\033[91mError: '{match_dir}' is not a directory.\033[0m")
+        return
+
+    # Outputs share names with their match files (timeline writes <stem>.json) and index.json could be a
+    # match file too, so they can't go anywhere the match files are picked up from
+    match_dir_path = os.path.realpath(match_dir)
+    output_path = os.path.realpath(output)
+    if os.path.commonpath([match_dir_path, output_path]) == match_dir_path:
+        print(f"\033[91mError: The output directory '{output}' can't be '{match_dir}' or inside it, the outputs would overwrite the match files.\033[0m")
+        return
+
+    files = sorted(glob.glob(os.path.join(match_dir, pattern), recursive=True))
+    if not files:
+        print(f"\033[91mError: No files matching '{pattern}' in '{match_dir}'.\033[0m")
+        return
+
+    from src.match.results import analysis_types
+    try:
+        analysis_type = ",".join(analysis_types(analysis_type))
+    except ValueError as e:
+        print(f"\033[91mError: {str(e)}\033[0m")
+        return
+
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(output, exist_ok=True)
+    # Outputs mirror the layout under match_dir so 2024/final.json and 2025/final.json don't overwrite each other
+    jobs = [(filename, os.path.join(output, _match_file_stem(filename, match_dir)), analysis_type, full_data) for filename in files]
+    for job in jobs:
+        os.makedirs(os.path.dirname(job[1]), exist_ok=True)
+
+    print(f"Analysing {len(files)} files from {match_dir} with {workers} worker(s) ({analysis_type})")
+    print(f"Outputs will be saved into: {output}")
+
+    results = []
+    if workers == 1:
+        for index, job in enumerate(jobs, 1):
+            results.extend(_analyse_match_file(job))
+            print_progress_bar(index / len(jobs), True)
+    else:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        # Workers are reused between files so pandas etc. only get imported once per process
+        from src import utils
+        # Workers write outputs the same way as this process: same page store, same output compression
+        store = page_store()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(store.directory if store else None, utils._output_compression)) as pool:
+            futures = [pool.submit(_analyse_match_file, job) for job in jobs]
+            for index, future in enumerate(as_completed(futures), 1):
+                results.extend(future.result())
+                print_progress_bar(index / len(jobs), True)
+    print()
+
+    results.sort(key=lambda result: (result["file"], result.get("index", 0)))
+    analysed = sum(1 for result in results if result["ok"])
+    index_data = {
+        "match_dir": match_dir,
+        "pattern": pattern,
+        "analysis_type": analysis_type,
+        "total_files": len(files),
+        "total_matches": len(results),
+        "matches_analysed": analysed,
+        "matches_failed": len(results) - analysed,
+        "matches": results
+    }
+    write_to_file(index_data, "json", os.path.join(output, "index"))
+
+    for result in results:
+        if not result["ok"]:
+            print(f"\033[91mFailed: {result['file']}: {result.get('error', 'not cricket match data')}\033[0m")
+    print(f"Task Completed: {analysed} of {len(results)} matches analysed. Index saved to: {output_filename(os.path.join(output, 'index'), 'json')}")
+
+def _init_worker(page_store_directory: str, output_compression: str) -> None:
+    from src.utils import capture_pages, set_output_compression
+    capture_pages(page_store_directory)
+    set_output_compression(output_compression)
+
+def _match_file_stem(filename: str, match_dir: str = None) -> str:
+    """matches/2025/final.json.gz -> final, or 2025/final relative to match_dir matches/"""
+    name = os.path.relpath(filename, match_dir) if match_dir else os.path.basename(filename)
+    for extension in [".gz", ".zst", ".json", ".ndjson"]:
+        if name.endswith(extension):
+            name = name[:-len(extension)]
+    return name
+
+def _analyse_match_file(job) -> list:
+    """
+    Process pool worker for match_dir_data. Analyses every match in one file with the
+    normal match_data output (printing suppressed) and returns a small summary per match for the index.
+    """
+    from src.match.loader import iter_matches
+    filename, output, analysis_type, full_data = job
+    results = []
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            documents = iter_matches(filename, full_data)
+            previous = next(documents, None)
+            index = 0
+            while previous is not None:
+                index += 1
+                current = next(documents, None)
+                # Single match files keep the plain name, archives get numbered outputs
+                match_output = output if index == 1 and current is None else f"{output}_{index}"
+                results.append(_summarise_match_file(previous, filename, index, match_output, analysis_type, full_data))
+                previous = current
+    except Exception as e:
+        results.append({"file": filename, "index": len(results) + 1, "ok": False, "error": str(e)})
+
+    if not results:
+        results.append({"file": filename, "index": 1, "ok": False, "error": "no match data in file"})
+    return results
+
+def _summarise_match_file(match_data: dict, filename: str, index: int, output: str, analysis_type: str, full_data: bool) -> dict:
+    result = {"file": filename, "index": index, "output": output, "ok": False}
+    try:
+        results = _analyse_match(match_data, output, analysis_type, f"{filename}#{index}", full_data)
+    except Exception as e:
+        result["error"] = str(e)
+        return result
+
+    if results is not None:
+        # The index entry reads what the analysis already worked out
+        match_info = results.match_info
+        result.update({
+            "ok": True,
+            "match_title": match_info["match_title"],
+            "date": match_info["date"],
+            "venue": match_info["venue"],
+            "result": match_info["result"],
+            "innings": [f"{inn['runs']}/{inn['wickets']} ({inn['overs']} ov)" for inn in results.innings_data]
+        })
+    return result
+
+async def ingest_data(path: str, db_path: str = "cricket.db", pattern: str = "*.json", ball_store_path: str = None) -> None:
+    """
+    Load scraped outputs (team, team_full, player and match JSON files) into the local SQLite database.
+    path can be a single file or a directory (files picked with pattern).
+    ball_store_path: also append every ball of every match to the columnar ball store in this directory.
+    """
+    if not os.path.exists(path):
+        print(f"\033[91mError: '{path}' not found.\033[0m")
+        return
+
+    from src import database
+    print(f"Ingesting {path} into {db_path}")
+    conn = database.connect(db_path)
+    store = None
+    if ball_store_path:
+        # numpy is only needed for the ball store
+        from src.ball_store import BallStore
+        try:
+            store = BallStore(ball_store_path)
+        except ValueError as e:
+            print(f"\033[91mError: {str(e)}\033[0m")
+            conn.close()
+            return
+    try:
+        totals = database.ingest_path(conn, path, pattern, store)
+    except (codec.JSONDecodeError, ValueError) as e:
+        print(f"\033[91mError: Invalid JSON while ingesting '{path}': {str(e)}\033[0m")
+        return
+    finally:
+        conn.close()
+
+    print(f"Task Completed: {totals['files']} files, {totals['matches']} matches, {totals['players']} roster players, "
+          f"{totals['player_stats']} player stat pages ({totals['rows']} rows upserted, {totals['skipped']} skipped).")
+    if store is not None:
+        print(f"{totals['balls_stored']} new balls appended to {ball_store_path} ({store.rows} balls from {len(store.matches)} matches in total).")
+
+async def query_data(query: str, filters: list = None, db_path: str = "cricket.db", output: str = "output", limit: int = None, ball_store_path: str = None) -> None:
+    """
+    Query the local SQLite database. filters is a list of "key=value" strings, e.g. ["bowler=Kirton", "year=2025"]
+    "bowler_totals" and "batter_totals" scan the columnar ball store instead.
+    Results are printed and saved to <output>.json when an output name is given.
+    """
+    if query in ["bowler_totals", "batter_totals"]:
+        rows = _query_ball_store(query, ball_store_path, limit)
+        if rows is None:
+            return
+    else:
+        rows = _query_database(query, filters, db_path, limit)
+        if rows is None:
+            return
+
+    for row in rows:
+        print(" | ".join("" if value is None else str(value) for value in row.values()))
+    print(f"\n{len(rows)} rows")
+
+    if output != "output":
+        write_to_file(rows, "json", output)
+        print(f"Query results saved to: {output_filename(output, 'json')}")
+
+def _query_ball_store(query: str, ball_store_path: str, limit: int):
+    if not ball_store_path or not os.path.isdir(ball_store_path):
+        print(f"\033[91mError: Ball store '{ball_store_path}' not found. Use --ingest with --ball_store first.\033[0m")
+        return None
+    from src.ball_store import BallStore
+    try:
+        rows = BallStore(ball_store_path).player_totals("bowler" if query == "bowler_totals" else "batter")
+    except ValueError as e:
+        print(f"\033[91mError: {str(e)}\033[0m")
+        return None
+    return rows[:limit] if limit else rows
+
+def _query_database(query: str, filters: list, db_path: str, limit: int):
+    if not os.path.exists(db_path):
+        print(f"\033[91mError: Database '{db_path}' not found. Use --ingest first.\033[0m")
+        return None
+
+    parsed_filters = {}
+    for item in filters or []:
+        key, separator, value = item.partition("=")
+        if not separator:
+            print(f"\033[91mError: Invalid filter '{item}'. Filters should look like key=value.\033[0m")
+            return None
+        parsed_filters[key.strip()] = value.strip()
+
+    from src import database
+    conn = database.connect(db_path)
+    try:
+        return database.run_query(conn, query, parsed_filters, limit)
+    except ValueError as e:
+        print(f"\033[91mError: {str(e)}\033[0m")
+        return None
+    finally:
+        conn.close()
+
+async def serve_data(directory: str, host: str = "127.0.0.1", port: int = 8080, pattern: str = None, cache_size: int = 1024) -> None:
+    """
+    Serve the team, player and match outputs in directory over a read-only HTTP API (see src/server.py)
+    until interrupted. Without a pattern every .json, .json.gz and .json.zst file under it is served.
+    """
+    if not os.path.isdir(directory):
+        print(f"\033[91mError: '{directory}' is not a directory.\033[0m")
+        return
+
+    from src.server import DEFAULT_PATTERNS, ApiServer, OutputCache
+    api = ApiServer(OutputCache(directory, pattern or DEFAULT_PATTERNS, cache_size))
+    await api.start(host, port)
+    stats = api.cache.stats()
+    print(f"Serving {stats['teams']} teams, {stats['players']} players and {stats['matches']} matches from {directory}")
+    print(f"Listening on http://{host}:{api.port} (Ctrl+C to stop)")
+    try:
+        await api.server.serve_forever()
+    finally:
+        await api.close()
+
+async def live_data(source: str, host: str = "127.0.0.1", port: int = 8080, interval: float = 15, base_url: str = None, archive_dir: str = None) -> None:
+    """
+    Poll a match (ESPN match JSON URL, or a file something else keeps overwriting) every interval seconds
+    and push per-ball deltas to subscribers of http://host:port/live/<match_id> until interrupted.
+    With archive_dir every poll (the whole document) is kept in <archive_dir>/<match_id>.snapshots.gz for --replay.
+    """
+    from src.compression import read_bytes
+    from src.match.schema import decode_match, get_match_id
+    from src.server import ApiServer, poll_match
+    from src.snapshot_archive import ArchiveWriter
+    last_modified = None
+    archives = {}
+
+    async def fetch():
+        nonlocal last_modified
+        polled_at = time.time()
+        if not os.path.isfile(source):
+            from src.extract_match_data import extract_match_data
+            match_data = await extract_match_data(source, full=bool(archive_dir), base_url=base_url)
+        else:
+            modified = os.stat(source).st_mtime_ns
+            if modified == last_modified:
+                return None
+            last_modified = modified
+            match_data = decode_match(await asyncio.to_thread(read_bytes, source), bool(archive_dir))
+        if archive_dir and match_data:
+            match_id = get_match_id(match_data, source)
+            if match_id not in archives:
+                archives[match_id] = ArchiveWriter(os.path.join(archive_dir, f"{match_id}.snapshots.gz"))
+            await asyncio.to_thread(archives[match_id].append, match_data, polled_at)
+        return match_data
+
+    if archive_dir:
+        os.makedirs(archive_dir, exist_ok=True)
+    api = ApiServer()
+    await api.start(host, port)
+    poller = asyncio.create_task(poll_match(api, fetch, source, interval))
+    print(f"Polling {source} every {interval:g}s")
+    print(f"Live feed on http://{host}:{api.port}/live/<match_id> (Ctrl+C to stop)")
+    try:
+        await api.server.serve_forever()
+    finally:
+        poller.cancel()
+        await api.close()
+        for archive in archives.values():
+            archive.close()
+
+async def monitor_data(urls: list, output: str = "output", interval: float = 15, base_url: str = None, concurrency: int = 2, archive_dir: str = None) -> None:
+    """
+    Follow several live matches from one process (see src/monitor.py) with a single shared browser,
+    writing the status of all of them to <output>_monitor.json until they have all finished.
+    urls can also hold text files with one match JSON URL per line.
+    With archive_dir every poll is kept in <archive_dir>/<match_id>.snapshots.gz for --replay.
+    """
+    from src.extract_match_data import extract_match_data
+    from src.monitor import Monitor
+    from src.utils import BrowserSession
+
+    match_urls = []
+    for url in urls:
+        if os.path.isfile(url):
+            with open(url, encoding="utf-8") as f:
+                match_urls += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+        else:
+            match_urls.append(url)
+    if not match_urls:
+        print("\033[91mError: No match URLs to monitor.\033[0m")
+        return
+    if archive_dir:
+        os.makedirs(archive_dir, exist_ok=True)
+
+    async with BrowserSession(base_url, max_pages=concurrency) as session:
+        async def fetch(url):
+            return await extract_match_data(url, full=bool(archive_dir), session=session)
+
+        monitor = Monitor(match_urls, fetch, output, interval, concurrency, archive_dir)
+        print(f"Monitoring {len(monitor.watches)} matches, status in {output}_monitor.json (Ctrl+C to stop)")
+        try:
+            await monitor.run()
+        finally:
+            monitor.close()
+    print("All matches have finished")
+
+async def replay_data(filename: str, output: str = "output", analysis_type: str = "live", speed: float = 1.0, at: str = None) -> None:
+    """
+    Feed the polls kept in a snapshot archive (--archive) back through the match analysis, each one
+    written to the same output files a live --match run would have written.
+    speed 1 waits as long between polls as the original run did, 10 is ten times faster, 0 doesn't wait.
+    at (epoch seconds or an ISO date and time) only analyses the poll that was current at that time.
+    """
+    from datetime import datetime
+    from src.snapshot_archive import iter_snapshots, snapshot_at
+    if not os.path.isfile(filename):
+        print(f"\033[91mError: File '{filename}' not found.\033[0m")
+        return
+
+    if at is not None:
+        try:
+            timestamp = float(at)
+        except ValueError:
+            try:
+                timestamp = datetime.fromisoformat(at).timestamp()
+            except ValueError:
+                print(f"\033[91mError: Invalid --at '{at}', use epoch seconds or an ISO date and time.\033[0m")
+                return
+        found = snapshot_at(filename, timestamp)
+        if found is None:
+            print(f"\033[91mError: '{filename}' starts after {at}.\033[0m")
+            return
+        polled_at, match_data = found
+        print(f"Poll at {datetime.fromtimestamp(polled_at).isoformat(timespec='seconds')}")
+        _analyse_match(match_data, output, analysis_type, f"{filename}@{polled_at}")
+        return
+
+    previous = None
+    count = 0
+    for polled_at, match_data in iter_snapshots(filename):
+        if previous is not None and speed > 0:
+            await asyncio.sleep((polled_at - previous) / speed)
+        previous = polled_at
+        count += 1
+        print(f"\n--- Poll {count} at {datetime.fromtimestamp(polled_at).isoformat(timespec='seconds')} ---")
+        _analyse_match(match_data, output, analysis_type, f"{filename}@{polled_at}")
+    print(f"\nReplayed {count} polls from {filename}")
+
+@metrics.timed("match_data.analyse")
+def _analyse_match(match_data: dict, output: str, analysis_type, source: str, full_data: bool = False):
+    """
+    Run one or more analysis types (a name, "a,b", a list or "all") over a single loaded match and write
+    their output files. The types share one MatchResults so what they have in common is only worked out once.
+    source is recorded as raw_data in comprehensive output when full_data is off.
+    Returns the MatchResults, or None if the data isnt match data or an analysis type is unknown.
+    """
+    from src.match.results import MatchResults, analysis_types
+    try:
+        types = analysis_types(analysis_type)
+    except ValueError as e:
+        print(f"\033[91mError: {str(e)}\033[0m")
+        return None
+
+    # Validate that this is match data, not player data
+    if not _is_match_data(match_data):
+        print("\033[91mError: The provided data does not appear to be cricket match data.\033[0m")
+        print("Please ensure you're using a match JSON file, not player data.")
+        return None
+    metrics.count("match_data.matches")
+
+    # Initialize analyzers
+    # (CricketMatchAnalyzer brings in pandas, only comprehensive and structured use it)
+    results = MatchResults(match_data)
+    for name in types:
+        with metrics.span(f"match_data.analyse.{name}"):
+            _ANALYSES[name](results, output, source, full_data)
+        metrics.count(f"match_data.outputs.{name}")
+    return results
+
+def _write_comprehensive(results, output: str, source: str, full_data: bool) -> None:
+    print("\nPerforming comprehensive analysis...")
+    match_data = results.data
+    extractor = results.extractor
+
+    # Get comprehensive analysis
+    analysis_result = results.analysis
+
+    # Process with the processor function
+    processed_data = results.processed
+
+    # Convert DataFrames to dictionaries for JSON serialization
+    analysis_result_serializable = {
+        'match_summary': analysis_result['match_summary'],
+        'innings_data': analysis_result['innings_data'],
+        'batting_stats': analysis_result['batting_stats'].to_dict('records') if not analysis_result['batting_stats'].empty else [],
+        'bowling_stats': analysis_result['bowling_stats'].to_dict('records') if not analysis_result['bowling_stats'].empty else [],
+        'ball_by_ball': analysis_result['ball_by_ball'].to_dict('records') if not analysis_result['ball_by_ball'].empty else [],
+        'human_report': analysis_result['human_report']
+    }
+
+    # With a page store the raw match is stored there once and only referenced
+    raw_data = match_data if full_data else {"source": source}
+    store = page_store()
+    if full_data and store is not None:
+        raw_data = {"source": source, **store.reference(store.put(codec.dumps_bytes(match_data)))}
+
+    # Combine all results
+    comprehensive_data = {
+        "raw_data": raw_data,
+        "analysis": analysis_result_serializable,
+        "processed": processed_data,
+        "extracted": {
+            "match_info": results.match_info,
+            "team_info": results.team_info,
+            "innings_data": results.innings_data,
+            "live_batting": results.live_batting,
+            "live_bowling": results.live_bowling,
+            "ball_by_ball": extractor.extract_ball_by_ball(),
+            "partnerships": results.partnerships
+        }
+    }
+
+    # Save comprehensive data
+    write_to_file(comprehensive_data, "json", f"{output}_comprehensive")
+
+    # Print human-readable report
+    print("\n" + "="*80)
+    print("CRICKET MATCH ANALYSIS REPORT")
+    print("="*80)
+    print(analysis_result['human_report'])
+
+    print(f"\nComprehensive analysis saved to: {output_filename(f'{output}_comprehensive', 'json')}")
+
+def _write_summary(results, output: str, source: str, full_data: bool) -> None:
+    print("\nGenerating match summary...")
+
+    # Get basic summary, streamed to stdout as it's rendered and kept only for the JSON field
+    buffer = io.StringIO()
+    results.extractor.write_human_readable_summary(_Tee(sys.stdout, buffer))
+    sys.stdout.write("\n")
+
+    summary_data = {
+        "match_info": results.match_info,
+        "team_info": results.team_info,
+        "innings_summary": results.innings_data,
+        "human_readable": buffer.getvalue()
+    }
+
+    write_to_file(summary_data, "json", f"{output}_summary")
+
+    print(f"\nMatch summary saved to: {output_filename(f'{output}_summary', 'json')}")
+
+def _write_live(results, output: str, source: str, full_data: bool) -> None:
+    print("\nExtracting live match state...")
+
+    # Get current match state
+    live_batting = results.live_batting
+    live_bowling = results.live_bowling
+
+    live_data = {
+        "current_batting": live_batting,
+        "current_bowling": live_bowling,
+        "partnerships": results.partnerships,
+        "timestamp": results.data.get('live', {}).get('timestamp', '')
+    }
+
+    write_to_file(live_data, "json", f"{output}_live")
+
+    print("Current Batting:")
+    for batter in live_batting:
+        if batter['position'] in ['striker', 'non-striker']:
+            print(f"  {batter['position']}: {batter['runs']}* ({batter['balls_faced']}b) SR: {batter['strike_rate']}")
+
+    print("\nCurrent Bowling:")
+    for bowler in live_bowling:
+        print(f"  {bowler['overs']}-{bowler['maidens']}-{bowler['runs_conceded']}-{bowler['wickets']} Econ: {bowler['economy_rate']}")
+
+    print(f"\nLive match data saved to: {output_filename(f'{output}_live', 'json')}")
+
+def _write_structured(results, output: str, source: str, full_data: bool) -> None:
+    print("\nExtracting structured data...")
+
+    # Get structured data using analyzer (reused from comprehensive when that ran too)
+    structured = results.structured
+    match_summary = structured["match_summary"]
+    batting_stats = structured["batting_stats"]
+    bowling_stats = structured["bowling_stats"]
+    ball_by_ball = structured["ball_by_ball"]
+
+    structured_data = {
+        "match_summary": match_summary,
+        "innings_summary": structured["innings_summary"],
+        "batting_stats": batting_stats.to_dict('records') if not batting_stats.empty else [],
+        "bowling_stats": bowling_stats.to_dict('records') if not bowling_stats.empty else [],
+        "ball_by_ball": ball_by_ball.to_dict('records') if not ball_by_ball.empty else []
+    }
+
+    write_to_file(structured_data, "json", f"{output}_structured")
+
+    print("Match Summary:")
+    print(codec.dumps(match_summary, pretty=True))
+
+    print(f"\nStructured data saved to: {output_filename(f'{output}_structured', 'json')}")
+
+def _write_timeline(results, output: str, source: str, full_data: bool) -> None:
+    print("\nGenerating event-by-event timeline...")
+
+    # The records are extracted once and used for both the events and the report. The report is
+    # rendered once, streamed straight into the text file and stdout, and only kept for the JSON field
+    timeline_events = results.timeline_events
+    buffer = io.StringIO()
+    with open(f"{output}.txt", 'w', encoding='utf-8') as f:
+        results.extractor.write_timeline_report(_Tee(f, sys.stdout, buffer), results.timeline, results.match_info)
+    sys.stdout.write("\n")
+
+    timeline_data = {
+        "timeline_events": timeline_events,
+        "timeline_report": buffer.getvalue(),
+        "total_events": len(timeline_events)
+    }
+
+    write_to_file(timeline_data, "json", output)
+
+    print(f"\nTimeline data saved to: {output_filename(output, 'json')}")
+    print(f"Timeline report saved to: {output}.txt")
+
+class _Tee:
+    """Text stream writing to several others at once (a report to its file, stdout and the JSON buffer)"""
+    def __init__(self, *streams):
+        self.streams = streams
+
+    def write(self, text: str) -> int:
+        for stream in self.streams:
+            stream.write(text)
+        return len(text)
+
+_ANALYSES = {
+    "comprehensive": _write_comprehensive,
+    "summary": _write_summary,
+    "live": _write_live,
+    "structured": _write_structured,
+    "timeline": _write_timeline
+}
+
 def _is_match_data(data):
     """
     Validate that the provided data is cricket match data, not player data
@@ -1,11 +1,15 @@
-import requests
-import json
-from playwright.async_api import async_playwright
+from src import codec
 import re
-from src.utils import *
+from src.utils import fetch_page
+from src.match.schema import decode_match
 
-async def extract_match_data(url: str, output_file: str = None):
-    html = await fetch_page(url)
+async def extract_match_data(url: str, output_file: str = None, full: bool = True, base_url: str = None, session=None):
+    # full=False only keeps the fields the analysers use (see src/match/schema.py)
+    # session: a src.utils.BrowserSession to fetch with instead of launching a browser for this one page
+    if session is not None:
+        html = await session.fetch(url)
+    else:
+        html = await fetch_page(url, base_url)
     match = re.search(r'<pre.*?>(.*?)</pre>', html, re.DOTALL)
     if match:
         json_str = match.group(1)
@@ -15,8 +19,7 @@ async def extract_match_data(url: str, output_file: str = None):
             json_str = match.group(1).strip()
         else:
             raise ValueError("Could not extract JSON from HTML")
-    data = json.loads(json_str)
+    data = decode_match(json_str, full)
     if output_file:
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        codec.dump(data, output_file, pretty=True)
     return data
@@ -1,12 +1,24 @@
 from bs4 import BeautifulSoup
 from src.utils import fetch_page
+from src import metrics
 import re
 
-async def extract_player_data(url: str, single_player: bool ):
-
+def player_stats_url(url: str) -> str:
+    # A bare objectId is turned into the all-round stats page URL
     if "https" not in url:
         url = "https://stats.espncricinfo.com/ci/engine/player/" + url + ".html?class=11;template=results;type=allround"
+    return url
+
+async def extract_player_data(url: str, single_player: bool, base_url: str = None):
+
+    url = player_stats_url(url)
 
+    with metrics.span("extract_player_data.fetch"):
+        html = await fetch_page(url, base_url)
+    with metrics.span("extract_player_data.parse"):
+        return parse_player_data(html, url)
+
+def get_col_names(url: str) -> list:
     #class references the class in the URL .html?class=3;template=results;type=allround
     all_col_names = ["Heading" ,"Span", "Mat", "Runs", "HS", "Bat Av", "100", "Wkts", "BBI", "Bowl Av", "5", "Ct", "St", "Ave Diff"] #class=11
     T20_col_names = ["Heading" ,"Span", "Mat", "Runs", "HS", "Bat Av", "100", "Wkts", "BBI", "Bowl Av", "5", "Ct", "St", "Ave Diff"] #class=2 | T20 is same as "all" but god knows if that will ever change
@@ -24,7 +36,11 @@ async def extract_player_data(url: str, single_player: bool ):
     else:
         col_names = all_col_names
 
-    html = await fetch_page(url)
+    return col_names
+
+def parse_player_data(html: str, url: str) -> dict:
+    # Kept apart from extract_player_data so saved stats pages can be parsed without a browser
+    col_names = get_col_names(url)
     soup = BeautifulSoup(html, "html.parser")
 
     player_name_element = soup.find("a", href=re.compile(r"/ci/engine/player/\d+\.html"))
@@ -3,6 +3,8 @@ import time
 from playwright.async_api import async_playwright
 import re
 from src.progress_bar import print_progress_bar
+from src.utils import browser_context_options, dismiss_modal, rebase_url
+from src import metrics
 
 def get_team_id(URL: str) -> str:
     return URL.rstrip('/').split('/')[-1].split('?')[0].split('#')[0]
@@ -20,14 +22,15 @@ def get_team_uuid(URL: str) -> str:
     # Just more optimal reusing get_team_id
     return URL.split("-")[-1]
 
-async def extract_team_data(URL: str, output: str = "output") -> None:
+async def extract_team_data(URL: str, output: str = "output", base_url: str = None) -> None:
 
     XHR_PATTERN = re.compile(f"filterFormatLevel=ALL")
 
     async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False) # Needs to be non-headless otherwise doesnt get past bot detection
-        context = await browser.new_context()
-        page = await context.new_page()
+        with metrics.span("extract_team_data.browser_launch"):
+            browser = await p.chromium.launch(headless=bool(base_url)) # Needs to be non-headless otherwise doesnt get past bot detection (mock servers dont have any)
+            context = await browser.new_context(**browser_context_options())
+            page = await context.new_page()
 
         all_players = []
         total_players = None
@@ -36,6 +39,7 @@ async def extract_team_data(URL: str, output: str = "output") -> None:
             
             nonlocal total_players
             if XHR_PATTERN.search(response.url) and response.status == 200:
+                metrics.count("extract_team_data.xhr_responses")
                 try:
                     data = await response.json()
 
@@ -60,44 +64,42 @@ async def extract_team_data(URL: str, output: str = "output") -> None:
                     print(f"Failed to parse JSON: {e}")
 
         page.on("response", handle_response)
-        await page.goto(URL)
+        with metrics.span("extract_team_data.navigation"):
+            await page.goto(rebase_url(URL, base_url))
 
         #To bypass consent modals.
         #If one appears that hasnt been accounted for
         #please start an issue on: https://github.com/pxy05/sport-scraper/issues
 
         # Exit Disney Cookie Modal
-        try:
-            await page.wait_for_selector('button:has-text("Accept All")', timeout=2000)
-            await page.click('button:has-text("Accept All")')
-        except Exception:
-            pass
+        await dismiss_modal(page, 'button:has-text("Accept All")', "extract_team_data")
 
         # Exit Cookie Modal
 
-        try:
-            await page.wait_for_selector('button:has-text("ALL")', timeout=2000)
-            await page.click('button:has-text("ALL")')
-        except Exception:
-            pass
+        await dismiss_modal(page, 'button:has-text("ALL")', "extract_team_data")
 
         # Click on ALL players
+        # (not a modal, it picks what gets listed so it's clicked on every run)
         # TODO
         # Include flag for different Tournaments e.g. # ALL, INTL, T20...
 
-        try:
-            await page.wait_for_selector('text="ALL"', timeout=500)
-            await page.click('text="ALL"')
-        except Exception:
-            pass
+        with metrics.span("extract_team_data.filter_click"):
+            try:
+                await page.wait_for_selector('text="ALL"', timeout=500)
+                await page.click('text="ALL"')
+            except Exception:
+                metrics.count("extract_team_data.filter_timeouts")
 
 
 
-        while total_players is None or len(all_players) < total_players:
-            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            time.sleep(0.5)
+        with metrics.span("extract_team_data.scroll"):
+            while total_players is None or len(all_players) < total_players:
+                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                time.sleep(0.5)
 
-        await browser.close()
+        with metrics.span("extract_team_data.browser_close"):
+            await browser.close()
+        metrics.count("extract_team_data.players", len(all_players))
         sys.stdout.write("\n")
         return all_players
     
@@ -0,0 +1,249 @@
+import asyncio
+import hashlib
+import http.client
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+from src import codec
+from src import metrics
+from src.utils import rebase_url
+
+# Pillow is optional, only needed for thumbnails
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+'''
+--images: download the pictures of every player in a --team / --team_full output.
+
+The roster only has half of each link (imageUrl, headshotImageUrl), IMAGE_BASE is put in front of it.
+Every distinct URL is downloaded once, concurrently, over a pool of keep-alive connections. Files are
+named by the hash of their content so two URLs giving the same picture are only stored once:
+
+    <directory>/<hash>.png                   the pictures
+    <directory>/thumbnails/<size>/<hash>.png resized copies (--thumbnails <size>, needs Pillow)
+    <directory>/images.json                  url -> {"file", "hash", "etag", "last_modified", "size", "checked_at"}
+    <directory>/players.json                 objectId -> {"name", "image", "headshot"} (file names, null when there's none)
+
+Running it again sends If-None-Match / If-Modified-Since for every URL it already has, so pictures that
+haven't changed are answered with an empty 304 instead of being downloaded again.
+'''
+
+IMAGE_BASE = "https://img1.hscicdn.com/image/upload/f_auto,t_h_100_2x/"
+IMAGE_FIELDS = {"imageUrl": "image", "headshotImageUrl": "headshot"}
+CONCURRENCY = 16
+RETRIES = 3
+TIMEOUT = 30
+
+_EXTENSIONS = {"image/png": ".png", "image/jpeg": ".jpg", "image/webp": ".webp", "image/gif": ".gif", "image/avif": ".avif"}
+
+
+def image_url(path: str) -> str:
+    """Complete a roster image path, full URLs are kept"""
+    if path.startswith(("http://", "https://")):
+        return path
+    return IMAGE_BASE + path
+
+
+def player_image_urls(team_json: List[Dict[str, Any]]) -> Dict[str, Dict[str, Optional[str]]]:
+    """objectId -> {"image": url, "headshot": url} for every player in a team / team_full output"""
+    players = {}
+    for player in team_json:
+        if not player.get("objectId"):
+            continue
+        players[str(player["objectId"])] = {name: image_url(player[field]) if player.get(field) else None for field, name in IMAGE_FIELDS.items()}
+    return players
+
+
+class ConnectionPool:
+    """
+    Keep-alive HTTP(S) connections shared by the download threads. A connection goes back to the pool
+    after each response, so a run opens about as many connections as there are threads.
+    """
+    def __init__(self, timeout: float = TIMEOUT):
+        self.timeout = timeout
+        self.opened = 0
+        self.reused = 0
+        self._idle: Dict[Tuple[str, str], List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def _connection(self, scheme: str, host: str) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get((scheme, host))
+            if idle:
+                self.reused += 1
+                return idle.pop(), True
+            self.opened += 1
+        connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return connection_class(host, timeout=self.timeout), False
+
+    def _release(self, scheme: str, host: str, connection: http.client.HTTPConnection) -> None:
+        with self._lock:
+            self._idle.setdefault((scheme, host), []).append(connection)
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], bytes]:
+        """(status, headers with lower case names, body)"""
+        parts = urlsplit(url)
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        while True:
+            connection, reused = self._connection(parts.scheme, parts.netloc)
+            try:
+                connection.request("GET", path, headers=headers or {})
+                response = connection.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                # The server may have closed a connection while it sat in the pool, try a fresh one
+                if reused:
+                    continue
+                raise
+            if response.will_close:
+                connection.close()
+            else:
+                self._release(parts.scheme, parts.netloc, connection)
+            return response.status, {name.lower(): value for name, value in response.getheaders()}, body
+
+    def close(self) -> None:
+        with self._lock:
+            for connections in self._idle.values():
+                for connection in connections:
+                    connection.close()
+            self._idle.clear()
+
+
+def _write_file(filename: str, data: bytes) -> bool:
+    """Write data unless filename already exists, returns False if it did"""
+    if os.path.exists(filename):
+        return False
+    # Temporary name first so a half written picture never shows up (threads can race on the same hash)
+    temporary = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(data)
+    os.replace(temporary, filename)
+    return True
+
+
+def download(pool: ConnectionPool, url: str, entry: Optional[Dict[str, Any]], directory: str, base_url: str = None) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """
+    Fetch one picture into directory. entry is what images.json has for the url from the last run.
+    Returns (outcome, entry): outcome is downloaded, deduplicated (same content already stored), unchanged (304),
+    missing (404) or failed.
+    """
+    headers = {"User-Agent": "Mozilla/5.0", "Accept": "image/avif,image/webp,image/png,image/*"}
+    if entry and os.path.exists(os.path.join(directory, entry["file"])):
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    checked_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    for attempt in range(RETRIES + 1):
+        try:
+            status, response_headers, body = pool.get(rebase_url(url, base_url), headers)
+        except (http.client.HTTPException, OSError) as e:
+            status, response_headers, body = None, {}, str(e).encode()
+        if status == 429 or status is None or status >= 500:
+            if attempt < RETRIES:
+                retry_after = response_headers.get("retry-after", "")
+                time.sleep(float(retry_after) if retry_after.isdigit() else 2 ** attempt)
+                continue
+        break
+
+    if status == 304 and entry:
+        return "unchanged", {**entry, "checked_at": checked_at}
+    if status == 404:
+        return "missing", None
+    if status != 200:
+        print(f"\033[91mError: Could not download '{url}' ({status or body.decode(errors='replace')})\033[0m")
+        return "failed", entry
+
+    digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+    content_type = response_headers.get("content-type", "").split(";")[0].strip()
+    extension = _EXTENSIONS.get(content_type) or os.path.splitext(urlsplit(url).path)[1] or ".img"
+    filename = f"{digest}{extension}"
+    written = _write_file(os.path.join(directory, filename), body)
+    return ("downloaded" if written else "deduplicated"), {
+        "file": filename,
+        "hash": digest,
+        "etag": response_headers.get("etag"),
+        "last_modified": response_headers.get("last-modified"),
+        "size": len(body),
+        "checked_at": checked_at
+    }
+
+
+def make_thumbnail(source: str, target: str, size: int) -> str:
+    """Process pool worker: a copy of source no bigger than size x size (aspect ratio kept)"""
+    with Image.open(source) as image:
+        image.thumbnail((size, size))
+        temporary = f"{target}.{os.getpid()}.tmp{os.path.splitext(target)[1]}"
+        image.save(temporary)
+    os.replace(temporary, target)
+    return target
+
+
+def _make_thumbnails(directory: str, files: List[str], size: int, workers: Optional[int] = None) -> int:
+    thumbnail_dir = os.path.join(directory, "thumbnails", str(size))
+    os.makedirs(thumbnail_dir, exist_ok=True)
+    jobs = [(os.path.join(directory, filename), os.path.join(thumbnail_dir, filename)) for filename in sorted(set(files))]
+    jobs = [(source, target) for source, target in jobs if not os.path.exists(target)]
+    if not jobs:
+        return 0
+    made = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(make_thumbnail, source, target, size): source for source, target in jobs}
+        for future, source in futures.items():
+            try:
+                future.result()
+                made += 1
+            except Exception as e:
+                print(f"\033[91mError: Could not make a thumbnail of '{source}': {str(e)}\033[0m")
+    return made
+
+
+async def sync_images(team_json: List[Dict[str, Any]], directory: str, concurrency: int = CONCURRENCY, thumbnail_size: Optional[int] = None, base_url: str = None) -> Dict[str, int]:
+    """Download (or revalidate) every player picture in team_json into directory, returns counts per outcome"""
+    if thumbnail_size and Image is None:
+        raise RuntimeError("Thumbnails need the Pillow package (pip install Pillow).")
+    os.makedirs(directory, exist_ok=True)
+    manifest_file = os.path.join(directory, "images.json")
+    manifest = codec.load(manifest_file) if os.path.exists(manifest_file) else {}
+
+    players = player_image_urls(team_json)
+    # Each URL once however many players (or fields) point at it
+    urls = list(dict.fromkeys(url for images in players.values() for url in images.values() if url))
+    counts = {"players": len(players), "urls": len(urls), "downloaded": 0, "deduplicated": 0, "unchanged": 0, "missing": 0, "failed": 0, "thumbnails": 0}
+
+    loop = asyncio.get_running_loop()
+    pool = ConnectionPool()
+    try:
+        with metrics.span("images.download"), ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = await asyncio.gather(*(loop.run_in_executor(executor, download, pool, url, manifest.get(url), directory, base_url) for url in urls))
+    finally:
+        pool.close()
+    metrics.count("images.connections", pool.opened)
+
+    for url, (outcome, entry) in zip(urls, results):
+        counts[outcome] += 1
+        metrics.count(f"images.{outcome}")
+        if entry is None:
+            manifest.pop(url, None)
+        else:
+            manifest[url] = entry
+    codec.dump(manifest, manifest_file, pretty=True)
+
+    index = {}
+    names = {str(player["objectId"]): player.get("name", "") for player in team_json if player.get("objectId")}
+    for player_id, images in players.items():
+        index[player_id] = {"name": names[player_id], **{name: manifest[url]["file"] if url in manifest else None for name, url in images.items()}}
+    codec.dump(index, os.path.join(directory, "players.json"), pretty=True)
+
+    if thumbnail_size:
+        with metrics.span("images.thumbnails"):
+            counts["thumbnails"] = await asyncio.to_thread(_make_thumbnails, directory, [entry["file"] for entry in manifest.values()], thumbnail_size)
+    return counts
@@ -0,0 +1,184 @@
+import asyncio
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+from src import codec
+from src import metrics
+from src.match.extractor import CricketDataExtractor
+
+'''
+Per-ball deltas between consecutive polls of a live match, for the /live/<match_id> SSE feed.
+
+live_state() boils a match document down to what changes ball to ball (score per innings, batters
+and bowlers at the crease, fall of wickets, status and the balls bowled). diff_states() compares two
+of those and gives only what changed:
+
+    {"seq": 42, "balls": [...new balls...], "score": {"2": {...}}, "batting": {"74537": {...}, "1152829": null},
+     "bowling": {...}, "fow": [...new wickets...], "status": "..."}
+
+Keys are left out when nothing in them changed, null in batting/bowling means the player left.
+apply_delta() folds a delta into a snapshot, which is all a client has to do to stay up to date.
+
+A LiveFeed works each delta out once and encodes it once, every subscriber is sent the same bytes.
+New subscribers get a snapshot first, a reconnecting one (Last-Event-ID) only gets the deltas it
+missed as long as they are still in the backlog.
+'''
+
+BACKLOG = 256           # Deltas kept for reconnecting subscribers
+SNAPSHOT_BALLS = 12     # Most recent balls included in a snapshot
+SUBSCRIBER_QUEUE = 512  # A subscriber this far behind is dropped, it can reconnect with Last-Event-ID
+
+
+def live_state(match_data: Dict[str, Any]) -> Dict[str, Any]:
+    """The parts of a match document a live feed tracks. Runs in a worker thread."""
+    extractor = CricketDataExtractor(match_data)
+    live = match_data.get("live") or {}
+
+    score = {}
+    for innings in match_data.get("innings", []):
+        score[str(innings.get("innings_number", ""))] = {
+            "runs": innings.get("runs", 0),
+            "wickets": innings.get("wickets", 0),
+            "overs": innings.get("overs", ""),
+            "target": innings.get("target", 0)
+        }
+
+    fow = []
+    for wicket, partnership in zip(live.get("fow", []), extractor.extract_partnerships()):
+        if not partnership["current"]:
+            fow.append({"innings_number": wicket.get("innings_number", ""), **partnership})
+
+    balls = []
+    for record in extractor.timeline_records():
+        ball = record.to_dict()
+        ball["ordinal"] = record.ordinal
+        balls.append(ball)
+
+    return {
+        "status": live.get("status", ""),
+        "score": score,
+        "batting": {str(record.player_id): record.to_dict() for record in extractor.batting_records()},
+        "bowling": {str(record.player_id): record.to_dict() for record in extractor.bowling_records()},
+        "fow": fow,
+        "balls": balls
+    }
+
+
+def _changed(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    changes = {key: value for key, value in new.items() if old.get(key) != value}
+    changes.update({key: None for key in old if key not in new})
+    return changes
+
+
+def _fow_key(wicket: Dict[str, Any]) -> Tuple[str, str]:
+    return str(wicket["innings_number"]), str(wicket["wicket_number"])
+
+
+def diff_states(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """What changed from old to new, empty if nothing did"""
+    delta = {}
+    last_ball = old["balls"][-1]["ordinal"] if old["balls"] else -1
+    balls = [ball for ball in new["balls"] if ball["ordinal"] > last_ball]
+    if balls:
+        delta["balls"] = balls
+    for key in ("score", "batting", "bowling"):
+        changes = _changed(old[key], new[key])
+        if changes:
+            delta[key] = changes
+    seen = {_fow_key(wicket) for wicket in old["fow"]}
+    fow = [wicket for wicket in new["fow"] if _fow_key(wicket) not in seen]
+    if fow:
+        delta["fow"] = fow
+    if old["status"] != new["status"]:
+        delta["status"] = new["status"]
+    return delta
+
+
+def apply_delta(state: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """Fold a delta into a snapshot (or state), returns a new dict"""
+    state = {**state, "seq": delta.get("seq", state.get("seq"))}
+    for key in ("score", "batting", "bowling"):
+        if key in delta:
+            merged = {**state[key], **delta[key]}
+            state[key] = {item: value for item, value in merged.items() if value is not None}
+    if "fow" in delta:
+        state["fow"] = state["fow"] + delta["fow"]
+    if "balls" in delta:
+        state["balls"] = state["balls"] + delta["balls"]
+    if "status" in delta:
+        state["status"] = delta["status"]
+    return state
+
+
+def encode_event(seq: int, event: str, data: Any) -> bytes:
+    # Compact JSON never has a newline in it so it fits on one data: line
+    return f"id: {seq}\nevent: {event}\ndata: ".encode() + codec.dumps_bytes(data) + b"\n\n"
+
+
+class LiveFeed:
+    def __init__(self, match_id: str, backlog: int = BACKLOG):
+        self.match_id = match_id
+        self.state = None
+        self.seq = 0
+        self.backlog: "deque[Tuple[int, bytes]]" = deque(maxlen=backlog)
+        self.subscribers: List[asyncio.Queue] = []
+        self._snapshot = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        state = self.state or {"status": "", "score": {}, "batting": {}, "bowling": {}, "fow": [], "balls": []}
+        return {"match_id": self.match_id, "seq": self.seq, **state, "balls": state["balls"][-SNAPSHOT_BALLS:]}
+
+    def snapshot_event(self) -> bytes:
+        if self._snapshot is None or self._snapshot[0] != self.seq:
+            self._snapshot = (self.seq, encode_event(self.seq, "snapshot", self.snapshot()))
+        return self._snapshot[1]
+
+    def update(self, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Take the state of the latest poll, send subscribers what changed. Returns the delta, None if nothing did."""
+        if self.state is None:
+            self.state = state
+            return None
+        delta = diff_states(self.state, state)
+        self.state = state
+        if not delta:
+            return None
+
+        self.seq += 1
+        delta = {"seq": self.seq, **delta}
+        message = encode_event(self.seq, "delta", delta)
+        self.backlog.append((self.seq, message))
+        metrics.count("live.deltas")
+        for queue in list(self.subscribers):
+            if queue.qsize() >= SUBSCRIBER_QUEUE:
+                self.unsubscribe(queue)
+                queue.put_nowait(None)
+                metrics.count("live.dropped_subscribers")
+            else:
+                queue.put_nowait(message)
+        return delta
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Tuple[List[bytes], asyncio.Queue]:
+        """Messages to send straight away (a snapshot, or the deltas after last_event_id) and a queue of the ones to come"""
+        queue = asyncio.Queue()
+        self.subscribers.append(queue)
+        metrics.count("live.subscribers")
+        try:
+            last_seq = int(last_event_id)
+        except (TypeError, ValueError):
+            return [self.snapshot_event()], queue
+
+        if last_seq == self.seq:
+            return [], queue
+        missed = [message for seq, message in self.backlog if seq > last_seq]
+        if 0 <= last_seq < self.seq and self.backlog and self.backlog[0][0] <= last_seq + 1:
+            return missed, queue
+        return [self.snapshot_event()], queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        if queue in self.subscribers:
+            self.subscribers.remove(queue)
+
+    def close(self) -> None:
+        """End every subscriber's stream"""
+        for queue in list(self.subscribers):
+            self.unsubscribe(queue)
+            queue.put_nowait(None)
@@ -1,6 +1,8 @@
-import json
-from typing import Dict, List, Any
+import io
+from src import codec
+from typing import Dict, List, Any, Optional, TextIO
 import pandas as pd
+from src.match.records import BallRecord, BatterRecord, BowlerRecord
 
 class CricketMatchAnalyzer:
     def __init__(self, json_data: Dict[str, Any]):
@@ -66,23 +68,31 @@ class CricketMatchAnalyzer:
         
         return innings_data
     
+    def batting_records(self) -> List[BatterRecord]:
+        """Current batsmen as records"""
+        return [BatterRecord.from_live(batter) for batter in self.data.get('live', {}).get('batting', [])]
+    
+    def bowling_records(self) -> List[BowlerRecord]:
+        """Current bowlers as records"""
+        return [BowlerRecord.from_live(bowler) for bowler in self.data.get('live', {}).get('bowling', [])]
+    
     def get_current_batting_stats(self) -> pd.DataFrame:
         """Get current batsmen statistics as DataFrame"""
         batting_data = []
         
-        for batter in self.data.get('live', {}).get('batting', []):
+        for batter in self.batting_records():
             # Get player name from team data
-            player_name = self._get_player_name(batter['player_id'])
+            player_name = self._get_player_name(batter.player_id)
             
             batting_data.append({
                 'Player': player_name,
-                'Runs': batter['runs'],
-                'Balls': batter['balls_faced'], 
-                'Fours': batter['fours'],
-                'Sixes': batter['sixes'],
-                'Strike_Rate': self._safe_float(batter['strike_rate']),
-                'Status': batter['live_current_name'],
-                'Position': batter.get('batting_position', 0)
+                'Runs': batter.runs,
+                'Balls': batter.balls_faced, 
+                'Fours': batter.fours,
+                'Sixes': batter.sixes,
+                'Strike_Rate': self._safe_float(batter.strike_rate),
+                'Status': batter.position,
+                'Position': batter.batting_position
             })
         
         return pd.DataFrame(batting_data)
@@ -91,17 +101,17 @@ class CricketMatchAnalyzer:
         """Get current bowling statistics as DataFrame"""
         bowling_data = []
         
-        for bowler in self.data.get('live', {}).get('bowling', []):
-            player_name = self._get_player_name(bowler['player_id'])
+        for bowler in self.bowling_records():
+            player_name = self._get_player_name(bowler.player_id)
             
             bowling_data.append({
                 'Bowler': player_name,
-                'Overs': bowler['overs'],
-                'Maidens': bowler['maidens'],
-                'Runs': bowler['conceded'],
-                'Wickets': bowler['wickets'],
-                'Economy': self._safe_float(bowler['economy_rate']),
-                'Status': bowler['live_current_name']
+                'Overs': bowler.overs,
+                'Maidens': bowler.maidens,
+                'Runs': bowler.runs_conceded,
+                'Wickets': bowler.wickets,
+                'Economy': self._safe_float(bowler.economy_rate),
+                'Status': bowler.position
             })
         
         return pd.DataFrame(bowling_data)
@@ -163,23 +173,32 @@ class CricketMatchAnalyzer:
         
         return partnerships
     
-    def get_ball_by_ball_data(self) -> pd.DataFrame:
-        """Convert ball-by-ball data to DataFrame"""
+    def ball_records(self) -> List[BallRecord]:
+        """Every ball in the commentary as records, using each ball's own over and innings numbers"""
         ball_data = []
         
         for comm in self.data.get('comms', []):
             for ball in comm.get('ball', []):
-                ball_info = {
-                    'Over': ball['over_number'],
-                    'Ball': ball['overs_actual'],
-                    'Matchup': ball['players'],
-                    'Outcome': ball['event'],
-                    'Dismissal': ball.get('dismissal', ''),
-                    'Innings': ball['innings_number']
-                }
-                ball_data.append(ball_info)
+                ball_data.append(BallRecord.from_comms(ball, ball['over_number'], ball['innings_number']))
+        
+        return ball_data
+    
+    def get_ball_by_ball_data(self) -> pd.DataFrame:
+        """Convert ball-by-ball data to DataFrame"""
+        # Built column-wise straight from the records, no per-ball dict needed
+        balls = self.ball_records()
+        
+        if not balls:
+            return pd.DataFrame()
         
-        return pd.DataFrame(ball_data)
+        return pd.DataFrame({
+            'Over': [ball.over_number for ball in balls],
+            'Ball': [ball.over for ball in balls],
+            'Matchup': [ball.players for ball in balls],
+            'Outcome': [ball.event for ball in balls],
+            'Dismissal': [ball.dismissal for ball in balls],
+            'Innings': [ball.innings for ball in balls]
+        })
     
     def _get_player_name(self, player_id: str) -> str:
         """Get player name from player ID"""
@@ -191,13 +210,19 @@ class CricketMatchAnalyzer:
     
     def generate_human_readable_report(self) -> str:
         """Generate comprehensive human-readable match report"""
+        buffer = io.StringIO()
+        self.write_human_readable_report(buffer)
+        return buffer.getvalue()
+    
+    def write_human_readable_report(self, out: TextIO) -> None:
+        """Write the comprehensive human-readable match report to a text stream"""
         match_info = self.get_match_summary()
         innings = self.get_innings_summary()
         current_batting = self.get_current_batting_stats()
         current_bowling = self.get_current_bowling_stats()
         partnerships = self.get_partnerships_info()
         
-        report = f"""
+        out.write(f"""
 {'='*60}
 CRICKET MATCH REPORT
 {'='*60}
@@ -212,77 +237,76 @@ RESULT: {match_info['match_details']['result']}
 {'='*60}
 INNINGS SUMMARY
 {'='*60}
-"""
+""")
         
         for i, inn in enumerate(innings):
-            report += f"""
+            out.write(f"""
 Innings {inn['innings_number']}: {inn['batting_team']}
 Score: {inn['runs']}/{inn['wickets']} ({inn['overs']} overs)
 Run Rate: {inn['run_rate']}/over
 Extras: {inn['extras']}
 Status: {inn['status']}
-"""
+""")
             if inn['target'] > 0:
-                report += f"Target: {inn['target']}\n"
+                out.write(f"Target: {inn['target']}\n")
         
         # Current batting state
         if not current_batting.empty:
-            report += f"""
+            out.write(f"""
 {'='*60}
 CURRENT BATTING
 {'='*60}
-"""
+""")
             for _, batter in current_batting.iterrows():
                 if batter['Status'] in ['striker', 'non-striker']:
                     not_out = "*" if batter['Status'] in ['striker', 'non-striker'] else ""
-                    report += f"""
+                    out.write(f"""
 {batter['Player']}: {batter['Runs']}{not_out} ({batter['Balls']} balls, {batter['Fours']}x4, {batter['Sixes']}x6)
 Strike Rate: {batter['Strike_Rate']:.2f} | Status: {batter['Status']}
-"""
+""")
         
         # Current bowling
         if not current_bowling.empty:
-            report += f"""
+            out.write(f"""
 {'='*60}
 CURRENT BOWLING
 {'='*60}
-"""
+""")
             for _, bowler in current_bowling.iterrows():
-                report += f"""
+                out.write(f"""
 {bowler['Bowler']}: {bowler['Overs']} overs, {bowler['Runs']} runs, {bowler['Wickets']} wickets
 Economy: {bowler['Economy']:.2f} | Status: {bowler['Status']}
-"""
+""")
         
         # Partnership info
         current_partnership = [p for p in partnerships if p['status'] == 'current partnership']
         if current_partnership:
             cp = current_partnership[0]
-            report += f"""
+            out.write(f"""
 {'='*60}
 CURRENT PARTNERSHIP
 {'='*60}
 Partnership for {cp['wicket_number']} wicket: {cp['partnership_runs']} runs in {cp['partnership_overs']} overs
 Run Rate: {cp['run_rate']}/over
-"""
-        
-        return report
+""")
+
 
 # Example usage function
-def analyze_cricket_match(json_data: Dict[str, Any]):
-    """Main function to analyze cricket match data"""
+def analyze_cricket_match(json_data: Dict[str, Any], analyzer: Optional[CricketMatchAnalyzer] = None):
+    """Main function to analyze cricket match data (with analyzer if one was already made for it)"""
     
-    analyzer = CricketMatchAnalyzer(json_data)
+    analyzer = analyzer or CricketMatchAnalyzer(json_data)
     
     # Generate structured data
     print("=== STRUCTURED DATA EXTRACTION ===")
     
     # 1. Match summary
     match_summary = analyzer.get_match_summary()
-    print("Match Summary:", json.dumps(match_summary, indent=2))
+    print("Match Summary:", codec.dumps(match_summary, pretty=True))
     
     # 2. Innings data
     innings_data = analyzer.get_innings_summary()
-    print("\nInnings Data:", json.dumps(innings_data, indent=2))
+    print("\nInnings Data:", codec.dumps(innings_data, pretty=True))
     
     # 3. Current batting (as DataFrame)
     batting_df = analyzer.get_current_batting_stats()
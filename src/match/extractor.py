@@ -1,51 +1,35 @@
+import bisect
+import io
 import json
 from datetime import datetime
-from dataclasses import dataclass
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional, TextIO
+from src.match.records import ball_ordinal, split_overs, BallRecord, BatterRecord, BowlerRecord, PlayerStats, BowlerStats, InningsData, MatchSummary
 
-@dataclass
-class PlayerStats:
-    name: str
-    runs: int
-    balls_faced: int
-    fours: int
-    sixes: int
-    strike_rate: float
-    dismissal: Optional[str] = None
+def _chronological(records: List[BallRecord]) -> List[BallRecord]:
+    """
+    One innings' balls (feed order, newest first) in the order they were bowled, with sub-balls numbered.
+    The feed is already in order so this is a reverse, the sort only runs for feeds that aren't.
+    """
+    records = records[::-1]
+    if any(records[i].ordinal > records[i + 1].ordinal for i in range(len(records) - 1)):
+        records.sort(key=lambda record: record.ordinal)
 
-@dataclass
-class BowlerStats:
-    name: str
-    overs: str
-    maidens: int
-    runs_conceded: int
-    wickets: int
-    economy_rate: float
+    # Deliveries sharing an over.ball (wides, no balls then the legal ball) get sub-balls 0, 1, 2...
+    previous = None
+    sub_ball = 0
+    for record in records:
+        base = record.ordinal
+        sub_ball = sub_ball + 1 if base == previous else 0
+        previous = base
+        record.ordinal = base + sub_ball
+    return records
 
-@dataclass
-class InningsData:
-    team_name: str
-    total_runs: int
-    wickets: int
-    overs: str
-    run_rate: float
-    extras: int
-    batting_stats: List[PlayerStats]
-    bowling_stats: List[BowlerStats]
-
-@dataclass
-class MatchSummary:
-    description: str
-    date: str
-    venue: str
-    result: str
-    team1: str
-    team2: str
-    innings: List[InningsData]
 
 class CricketDataExtractor:
     def __init__(self, json_data: Dict[str, Any]):
         self.data = json_data
+        self._timeline = None
+        self._ordinals = None
     
     def extract_match_info(self) -> Dict[str, Any]:
         """Extract basic match information"""
@@ -107,40 +91,34 @@ class CricketDataExtractor:
         
         return innings_list
     
-    def extract_live_batting(self) -> List[Dict[str, Any]]:
-        """Extract current batting information"""
-        batting_stats = []
+    def batting_records(self) -> List[BatterRecord]:
+        """Current batting information as records"""
+        return [BatterRecord.from_live(batter) for batter in self.data.get('live', {}).get('batting', [])]
+    
+    def bowling_records(self) -> List[BowlerRecord]:
+        """Current bowling information as records"""
+        return [BowlerRecord.from_live(bowler) for bowler in self.data.get('live', {}).get('bowling', [])]
+    
+    def ball_records(self) -> List[BallRecord]:
+        """Every ball in the commentary as records, in feed order"""
+        balls = []
         
-        for batter in self.data.get('live', {}).get('batting', []):
-            batting_stats.append({
-                'player_id': batter['player_id'],
-                'runs': batter['runs'],
-                'balls_faced': batter['balls_faced'],
-                'fours': batter['fours'],
-                'sixes': batter['sixes'],
-                'strike_rate': batter['strike_rate'],
-                'position': batter['live_current_name'],
-                'batting_position': batter.get('batting_position', 0)
-            })
+        for comm in self.data.get('comms', []):
+            over_number = comm.get('over_number', 0)
+            innings_number = comm.get('innings_number', 0)
+            
+            for ball in comm.get('ball', []):
+                balls.append(BallRecord.from_comms(ball, over_number, innings_number))
         
-        return batting_stats
+        return balls
+    
+    def extract_live_batting(self) -> List[Dict[str, Any]]:
+        """Extract current batting information"""
+        return [record.to_dict() for record in self.batting_records()]
     
     def extract_live_bowling(self) -> List[Dict[str, Any]]:
         """Extract current bowling information"""
-        bowling_stats = []
-        
-        for bowler in self.data.get('live', {}).get('bowling', []):
-            bowling_stats.append({
-                'player_id': bowler['player_id'],
-                'overs': bowler['overs'],
-                'maidens': bowler['maidens'],
-                'runs_conceded': bowler['conceded'],
-                'wickets': bowler['wickets'],
-                'economy_rate': bowler['economy_rate'],
-                'position': bowler['live_current_name']
-            })
-        
-        return bowling_stats
+        return [record.to_dict() for record in self.bowling_records()]
     
     def extract_ball_by_ball(self) -> List[Dict[str, Any]]:
         """Extract ball-by-ball commentary"""
@@ -156,12 +134,13 @@ class CricketDataExtractor:
             }
             
             for ball in comm.get('ball', []):
+                record = BallRecord.from_comms(ball)
                 over_info['balls'].append({
-                    'over': ball['overs_actual'],
-                    'bowler_to_batter': ball['players'],
-                    'event': ball['event'],
-                    'dismissal': ball.get('dismissal', ''),
-                    'text': ball.get('text', '')
+                    'over': record.over,
+                    'bowler_to_batter': record.players,
+                    'event': record.event,
+                    'dismissal': record.dismissal,
+                    'text': record.text
                 })
             
             ball_data.append(over_info)
@@ -188,11 +167,17 @@ class CricketDataExtractor:
     
     def get_human_readable_summary(self) -> str:
         """Generate human-readable match summary"""
+        buffer = io.StringIO()
+        self.write_human_readable_summary(buffer)
+        return buffer.getvalue()
+    
+    def write_human_readable_summary(self, out: TextIO) -> None:
+        """Write the human-readable match summary to a text stream (file, sys.stdout, StringIO)"""
         match_info = self.extract_match_info()
         teams = self.extract_team_info()
         innings = self.extract_innings_data()
         
-        summary = f"""
+        out.write(f"""
 === CRICKET MATCH SUMMARY ===
 
 Match: {match_info['match_title']}
@@ -204,75 +189,92 @@ Format: {match_info['match_type']}
 RESULT: {match_info['result']}
 
 === INNINGS SUMMARY ===
-"""
-        
-        team_names = {team_data['name']: tid for tid, team_data in teams.items()}
+""")
         
         for i, inn in enumerate(innings, 1):
             batting_team = next((team_data['name'] for tid, team_data in teams.items() 
                                if tid == str(inn['batting_team_id'])), 'Unknown')
             
-            summary += f"""
+            out.write(f"""
 Innings {i}: {batting_team}
 Score: {inn['runs']}/{inn['wickets']} ({inn['overs']} overs)
 Run Rate: {inn['run_rate']:.2f}
 Extras: {inn['extras']}
-"""
+""")
         
         # Add current match state if live
         live_innings = self.data.get('live', {}).get('innings', {})
         if live_innings.get('live_current') == 1:
-            current_batters = self.extract_live_batting()
-            current_bowlers = self.extract_live_bowling()
+            current_batters = self.batting_records()
             
-            summary += f"""
+            out.write(f"""
 === CURRENT STATE ===
 Score: {live_innings['runs']}/{live_innings['wickets']} ({live_innings['overs']} overs)
 Target: {live_innings.get('target', 'N/A')}
 Required: {live_innings.get('required_run_rate', 'N/A')} per over
 
-Current Batsmen:"""
+Current Batsmen:""")
             
             for batter in current_batters:
-                if batter['position'] in ['striker', 'non-striker']:
-                    summary += f"""
-  {batter['position']}: {batter['runs']}* ({batter['balls_faced']}b, {batter['fours']}x4, {batter['sixes']}x6) SR: {batter['strike_rate']}"""
+                if batter.position in ['striker', 'non-striker']:
+                    out.write(f"""
+  {batter.position}: {batter.runs}* ({batter.balls_faced}b, {batter.fours}x4, {batter.sixes}x6) SR: {batter.strike_rate}""")
+    
+    def timeline_records(self) -> List[BallRecord]:
+        """Every ball as records in chronological order"""
+        if self._timeline is None:
+            # Split the feed per innings and put each one in order (linear), no sort over the whole match
+            by_innings = {}
+            for record in self.ball_records():
+                by_innings.setdefault(int(record.innings or 0), []).append(record)
+            
+            timeline = []
+            for innings in sorted(by_innings):
+                timeline.extend(_chronological(by_innings[innings]))
+            self._timeline = timeline
+            self._ordinals = [record.ordinal for record in timeline]
         
-        return summary
+        return list(self._timeline)
+    
+    def balls_between(self, innings, first: str = "0.1", last: Optional[str] = None) -> List[BallRecord]:
+        """
+        Balls first to last (inclusive, written like overs_actual) of one innings, in order, found by
+        binary search over the timeline's ordinals.
+            balls_between(1, "0.1", "5.6")     powerplay of a T20
+            balls_between(2, "15.1", "19.6")   death overs
+        """
+        self.timeline_records()
+        start = ball_ordinal(innings, *split_overs(first))
+        if last is None:
+            end = ball_ordinal(int(innings) + 1, 0, 0)
+        else:
+            over, ball = split_overs(last)
+            # Every sub-ball of the last ball is included
+            end = ball_ordinal(innings, over, ball + 1)
+        return self._timeline[bisect.bisect_left(self._ordinals, start):bisect.bisect_left(self._ordinals, end)]
     
     def extract_match_timeline(self) -> List[Dict[str, Any]]:
         """Extract chronological event-by-event timeline of the match"""
-        timeline_events = []
-        
-        for comm in self.data.get('comms', []):
-            over_number = comm.get('over_number', 0)
-            innings_number = comm.get('innings_number', 0)
-            
-            for ball in comm.get('ball', []):
-                event = {
-                    'over': ball.get('overs_actual', ''),
-                    'over_number': over_number,
-                    'innings': innings_number,
-                    'players': ball.get('players', ''),
-                    'event': ball.get('event', ''),
-                    'dismissal': ball.get('dismissal', ''),
-                    'text': ball.get('text', ''),
-                    'speed_kph': ball.get('speed_kph', ''),
-                    'speed_mph': ball.get('speed_mph', '')
-                }
-                timeline_events.append(event)
-        
-        # Sort by innings and then by over for proper chronological order
-        timeline_events.sort(key=lambda x: (int(x['innings']), float(x['over']) if x['over'] else 0))
-        
-        return timeline_events
+        return [record.to_dict() for record in self.timeline_records()]
     
     def generate_timeline_report(self) -> str:
         """Generate human-readable timeline report"""
-        timeline = self.extract_match_timeline()
-        match_info = self.extract_match_info()
+        buffer = io.StringIO()
+        self.write_timeline_report(buffer)
+        return buffer.getvalue()
+    
+    def write_timeline_report(self, out: TextIO, timeline: Optional[Iterable[BallRecord]] = None, match_info: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Write the timeline report to a text stream one line at a time.
+        timeline (any iterable of BallRecords in order) and match_info can be passed in when the
+        caller already has them, otherwise they're extracted here.
+        """
+        if timeline is None:
+            timeline = self.timeline_records()
+        if match_info is None:
+            match_info = self.extract_match_info()
         
-        report = f"""
+        out.write(f"""
 CRICKET MATCH TIMELINE
 {'='*60}
 
@@ -284,38 +286,36 @@ Result: {match_info['result']}
 {'='*60}
 EVENT-BY-EVENT TIMELINE
 {'='*60}
-"""
+""")
         
         current_innings = None
         current_over = None
         
         for event in timeline:
             # Add innings header when it changes
-            if current_innings != event['innings']:
-                current_innings = event['innings']
-                report += f"\nINNINGS {current_innings}\n"
-                report += "-" * 40 + "\n"
+            if current_innings != event.innings:
+                current_innings = event.innings
+                out.write(f"\nINNINGS {current_innings}\n")
+                out.write("-" * 40 + "\n")
                 current_over = None
             
             # Add over header when it changes
-            if current_over != event['over_number']:
-                current_over = event['over_number']
-                report += f"\nOver {current_over}:\n"
+            if current_over != event.over_number:
+                current_over = event.over_number
+                out.write(f"\nOver {current_over}:\n")
             
             # Format the event
-            event_text = f"  {event['over']}: {event['players']} - {event['event']}"
+            event_text = f"  {event.over}: {event.players} - {event.event}"
             
             # Add dismissal details if it's a wicket
-            if event['dismissal']:
-                event_text += f" ({event['dismissal']})"
+            if event.dismissal:
+                event_text += f" ({event.dismissal})"
             
             # Add speed if available
-            if event['speed_kph']:
-                event_text += f" [Speed: {event['speed_kph']} km/h]"
+            if event.speed_kph:
+                event_text += f" [Speed: {event.speed_kph} km/h]"
             
-            report += event_text + "\n"
-        
-        return report
+            out.write(event_text + "\n")
 
 def main():
     # Example usage - replace with your JSON data
@@ -0,0 +1,128 @@
+import codecs
+import re
+from typing import Any, Dict, Iterator
+from src.compression import open_binary
+from src.match.schema import decode_match
+
+'''
+Streaming loader for files holding many match documents.
+
+Supported layouts (optionally gzip or zstd compressed):
+    - a single match document (what --match / extract_match_data saves)
+    - a JSON array of match documents
+    - NDJSON / concatenated documents, one after another
+
+The file is read in chunks and each document is cut out of the text as soon as its closing
+brace arrives, so only one match is ever decoded and held in memory at a time.
+'''
+
+CHUNK_SIZE = 1 << 20
+
+_WHITESPACE = re.compile(r"[\s,]*")
+_STRUCTURAL = re.compile(r'[{}\[\]"]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+
+class _DocumentScanner:
+    """Finds where a JSON object/array ends, keeping its place between chunks"""
+
+    def __init__(self):
+        self.reset(0)
+
+    def reset(self, pos: int):
+        self.pos = pos
+        self.depth = 0
+        self.in_string = False
+
+    def find_end(self, buf: str) -> int:
+        """Index just past the end of the current document, or -1 if more text is needed"""
+        pos = self.pos
+        while True:
+            if self.in_string:
+                m = _STRING_SPECIAL.search(buf, pos)
+                if m is None:
+                    self.pos = len(buf)
+                    return -1
+                if m.group() == "\\":
+                    if m.end() >= len(buf):
+                        # Escaped char is in the next chunk, look at the backslash again then
+                        self.pos = m.start()
+                        return -1
+                    pos = m.end() + 1
+                    continue
+                self.in_string = False
+                pos = m.end()
+                continue
+
+            m = _STRUCTURAL.search(buf, pos)
+            if m is None:
+                self.pos = len(buf)
+                return -1
+            char = m.group()
+            pos = m.end()
+            if char == '"':
+                self.in_string = True
+            elif char in "{[":
+                self.depth += 1
+            else:
+                self.depth -= 1
+                if self.depth == 0:
+                    self.pos = pos
+                    return pos
+
+
+def iter_match_documents(filename: str, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Yield the raw JSON text of each match document in filename"""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    scanner = _DocumentScanner()
+    buf = ""
+    start = None
+    in_array = False
+    seen_first = False
+    eof = False
+
+    with open_binary(filename) as f:
+        while True:
+            if start is None:
+                # Between documents: skip whitespace/commas and find the next opening brace
+                pos = _WHITESPACE.match(buf).end()
+                buf = buf[pos:]
+                if buf:
+                    if not seen_first and buf[0] == "[":
+                        in_array = True
+                        buf = buf[1:]
+                        seen_first = True
+                        continue
+                    if in_array and buf[0] == "]":
+                        return
+                    if buf[0] != "{":
+                        raise ValueError(f"Unexpected character {buf[0]!r} between match documents in '{filename}'")
+                    seen_first = True
+                    start = 0
+                    scanner.reset(0)
+                    continue
+            else:
+                end = scanner.find_end(buf)
+                if end != -1:
+                    yield buf[:end]
+                    buf = buf[end:]
+                    start = None
+                    continue
+
+            if eof:
+                if start is not None:
+                    raise ValueError(f"'{filename}' ends in the middle of a match document")
+                return
+
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+                buf += decoder.decode(b"", final=True)
+            else:
+                buf += decoder.decode(chunk)
+
+
+def iter_matches(filename: str, full: bool = False) -> Iterator[Dict[str, Any]]:
+    """Yield each match in filename decoded with decode_match (projected unless full=True)"""
+    for document in iter_match_documents(filename):
+        yield decode_match(document, full)
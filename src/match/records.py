@@ -0,0 +1,217 @@
+import re
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+'''
+Slotted record types used by CricketDataExtractor and CricketMatchAnalyzer.
+
+A match has hundreds of balls (thousands for a Test) and building a fresh dict with the
+same string keys for each one adds up when many matches are held in memory at once.
+The records only store the values, to_dict() gives back the layout the JSON outputs have always used.
+'''
+
+def _intern(value):
+    # Event names and "Bowler to Batter" strings repeat for every ball, share one copy of each
+    return sys.intern(value) if isinstance(value, str) else value
+
+_EVENT_COUNT = re.compile(r"(\d+)\s+(RUNS?|WIDES?|LEG BYES?|BYES?|NO BALLS?)")
+
+def split_overs(overs) -> Tuple[int, int]:
+    """'15.3' -> (15, 3), anything unparseable -> (0, 0)"""
+    whole, _, part = str(overs).partition(".")
+    try:
+        return int(whole or 0), int(part or 0)
+    except ValueError:
+        return 0, 0
+
+def ball_ordinal(innings, over: int, ball: int, sub_ball: int = 0) -> int:
+    """
+    One integer that orders every delivery of a match: (innings, over, ball, sub-ball) packed into
+    decimal fields. sub_ball counts the extra deliveries (wides, no balls) that share an over.ball.
+    ball_ordinal(2, 15, 3) -> 2_015_03_00
+    """
+    return ((int(innings or 0) * 1000 + over) * 100 + ball) * 100 + sub_ball
+
+def parse_ball_event(event: str) -> Tuple[int, int, bool]:
+    """
+    (runs off the bat, extras, wicket) from a commentary event such as
+    "1 run", "no run", "FOUR", "SIX", "2 wides", "1 leg bye", "OUT"
+    """
+    text = (event or "").strip().upper()
+    wicket = "OUT" in text
+    if "FOUR" in text:
+        return 4, 0, wicket
+    if "SIX" in text:
+        return 6, 0, wicket
+
+    found = _EVENT_COUNT.search(text)
+    if found is None:
+        return 0, 0, wicket
+    count = int(found.group(1))
+    if found.group(2).startswith("RUN"):
+        return count, 0, wicket
+    return 0, count, wicket
+
+
+@dataclass(slots=True)
+class BallRecord:
+    innings: Any
+    over_number: Any
+    over: str
+    players: str
+    event: str
+    dismissal: str = ''
+    text: str = ''
+    speed_kph: Any = ''
+    speed_mph: Any = ''
+    ordinal: int = 0
+
+    @classmethod
+    def from_comms(cls, ball: Dict[str, Any], over_number=0, innings_number=0) -> "BallRecord":
+        """Build from a ball inside comms[].ball[], over/innings default to the enclosing over's"""
+        over, ball_number = split_overs(ball.get('overs_actual', ''))
+        try:
+            ordinal = ball_ordinal(innings_number, over, ball_number)
+        except ValueError:
+            ordinal = 0
+        return cls(
+            innings=innings_number,
+            over_number=over_number,
+            over=ball.get('overs_actual', ''),
+            players=_intern(ball.get('players', '')),
+            event=_intern(ball.get('event', '')),
+            dismissal=ball.get('dismissal', ''),
+            text=ball.get('text', ''),
+            speed_kph=ball.get('speed_kph', ''),
+            speed_mph=ball.get('speed_mph', ''),
+            ordinal=ordinal
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Timeline event layout"""
+        return {
+            'over': self.over,
+            'over_number': self.over_number,
+            'innings': self.innings,
+            'players': self.players,
+            'event': self.event,
+            'dismissal': self.dismissal,
+            'text': self.text,
+            'speed_kph': self.speed_kph,
+            'speed_mph': self.speed_mph
+        }
+
+
+@dataclass(slots=True)
+class BatterRecord:
+    player_id: Any
+    runs: int
+    balls_faced: int
+    fours: int
+    sixes: int
+    strike_rate: Any
+    position: str
+    batting_position: int = 0
+
+    @classmethod
+    def from_live(cls, batter: Dict[str, Any]) -> "BatterRecord":
+        """Build from an entry of live.batting"""
+        return cls(
+            player_id=batter['player_id'],
+            runs=batter['runs'],
+            balls_faced=batter['balls_faced'],
+            fours=batter['fours'],
+            sixes=batter['sixes'],
+            strike_rate=batter['strike_rate'],
+            position=_intern(batter['live_current_name']),
+            batting_position=batter.get('batting_position', 0)
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'player_id': self.player_id,
+            'runs': self.runs,
+            'balls_faced': self.balls_faced,
+            'fours': self.fours,
+            'sixes': self.sixes,
+            'strike_rate': self.strike_rate,
+            'position': self.position,
+            'batting_position': self.batting_position
+        }
+
+
+@dataclass(slots=True)
+class BowlerRecord:
+    player_id: Any
+    overs: str
+    maidens: int
+    runs_conceded: int
+    wickets: int
+    economy_rate: Any
+    position: str
+
+    @classmethod
+    def from_live(cls, bowler: Dict[str, Any]) -> "BowlerRecord":
+        """Build from an entry of live.bowling"""
+        return cls(
+            player_id=bowler['player_id'],
+            overs=bowler['overs'],
+            maidens=bowler['maidens'],
+            runs_conceded=bowler['conceded'],
+            wickets=bowler['wickets'],
+            economy_rate=bowler['economy_rate'],
+            position=_intern(bowler['live_current_name'])
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'player_id': self.player_id,
+            'overs': self.overs,
+            'maidens': self.maidens,
+            'runs_conceded': self.runs_conceded,
+            'wickets': self.wickets,
+            'economy_rate': self.economy_rate,
+            'position': self.position
+        }
+
+
+@dataclass(slots=True)
+class PlayerStats:
+    name: str
+    runs: int
+    balls_faced: int
+    fours: int
+    sixes: int
+    strike_rate: float
+    dismissal: Optional[str] = None
+
+@dataclass(slots=True)
+class BowlerStats:
+    name: str
+    overs: str
+    maidens: int
+    runs_conceded: int
+    wickets: int
+    economy_rate: float
+
+@dataclass(slots=True)
+class InningsData:
+    team_name: str
+    total_runs: int
+    wickets: int
+    overs: str
+    run_rate: float
+    extras: int
+    batting_stats: List[PlayerStats]
+    bowling_stats: List[BowlerStats]
+
+@dataclass(slots=True)
+class MatchSummary:
+    description: str
+    date: str
+    venue: str
+    result: str
+    team1: str
+    team2: str
+    innings: List[InningsData]
@@ -0,0 +1,107 @@
+from functools import cached_property
+from typing import Any, Dict, List, Union
+from src.match.extractor import CricketDataExtractor
+from src.match.records import BallRecord
+
+'''
+Everything the analysis types work out from one match, each part only the first time something asks for it.
+
+Asking for several analysis types at once (--analysis_type summary live timeline) loads the match once
+and hands the same MatchResults to each of them, so the parts they have in common (match info, live
+batting / bowling, partnerships, the analyser and its DataFrames...) are only worked out once.
+CricketMatchAnalyzer (and so pandas) is only created if comprehensive or structured asks for it.
+
+Results are shared between the outputs so they shouldn't be modified.
+'''
+
+ANALYSIS_TYPES = ("comprehensive", "summary", "live", "structured", "timeline")
+
+
+def analysis_types(value: Union[str, List[str]]) -> List[str]:
+    """
+    "summary,live" / ["summary", "live"] / "all" -> the analysis types to run, in ANALYSIS_TYPES order
+    without repeats. Raises ValueError for an unknown one.
+    """
+    names = value.split(",") if isinstance(value, str) else [name for item in value for name in item.split(",")]
+    names = [name.strip() for name in names if name.strip()]
+    if "all" in names:
+        return list(ANALYSIS_TYPES)
+    for name in names:
+        if name not in ANALYSIS_TYPES:
+            raise ValueError(f"Invalid analysis_type '{name}'. Valid options: {', '.join(ANALYSIS_TYPES)}, all")
+    return [name for name in ANALYSIS_TYPES if name in names]
+
+
+class MatchResults:
+    def __init__(self, match_data: Dict[str, Any]):
+        self.data = match_data
+        self.extractor = CricketDataExtractor(match_data)
+
+    @cached_property
+    def match_info(self) -> Dict[str, Any]:
+        return self.extractor.extract_match_info()
+
+    @cached_property
+    def team_info(self) -> Dict[str, Any]:
+        return self.extractor.extract_team_info()
+
+    @cached_property
+    def innings_data(self) -> List[Dict[str, Any]]:
+        return self.extractor.extract_innings_data()
+
+    @cached_property
+    def live_batting(self) -> List[Dict[str, Any]]:
+        return self.extractor.extract_live_batting()
+
+    @cached_property
+    def live_bowling(self) -> List[Dict[str, Any]]:
+        return self.extractor.extract_live_bowling()
+
+    @cached_property
+    def partnerships(self) -> List[Dict[str, Any]]:
+        return self.extractor.extract_partnerships()
+
+    @cached_property
+    def timeline(self) -> List[BallRecord]:
+        return self.extractor.timeline_records()
+
+    @cached_property
+    def timeline_events(self) -> List[Dict[str, Any]]:
+        return [record.to_dict() for record in self.timeline]
+
+    @cached_property
+    def analyzer(self):
+        # pandas is only imported when an analysis type needs the analyser
+        from src.match.analyser import CricketMatchAnalyzer
+        return CricketMatchAnalyzer(self.data)
+
+    @cached_property
+    def analysis(self) -> Dict[str, Any]:
+        """analyze_cricket_match() for the comprehensive output, prints its report as it goes"""
+        from src.match.analyser import analyze_cricket_match
+        return analyze_cricket_match(self.data, self.analyzer)
+
+    @cached_property
+    def structured(self) -> Dict[str, Any]:
+        """The analyser's summaries and DataFrames, taken from analysis when comprehensive already worked them out"""
+        if "analysis" in self.__dict__:
+            analysis = self.analysis
+            return {
+                "match_summary": analysis["match_summary"],
+                "innings_summary": analysis["innings_data"],
+                "batting_stats": analysis["batting_stats"],
+                "bowling_stats": analysis["bowling_stats"],
+                "ball_by_ball": analysis["ball_by_ball"]
+            }
+        return {
+            "match_summary": self.analyzer.get_match_summary(),
+            "innings_summary": self.analyzer.get_innings_summary(),
+            "batting_stats": self.analyzer.get_current_batting_stats(),
+            "bowling_stats": self.analyzer.get_current_bowling_stats(),
+            "ball_by_ball": self.analyzer.get_ball_by_ball_data()
+        }
+
+    @cached_property
+    def processed(self) -> Dict[str, Any]:
+        from src.match.processor import process_cricket_data
+        return process_cricket_data(self.data)
@@ -0,0 +1,242 @@
+import hashlib
+import re
+from typing import Any, Dict, List, TypedDict, get_args, get_origin, get_type_hints
+from src import codec
+from src.compression import read_bytes
+
+'''
+Typed schema for the parts of an ESPN Cricinfo match JSON that src/match/ actually reads.
+
+A match document is ~80 KB and most of it (match_card HTML, middle_column, other_scores,
+official, series, live_video...) is never looked at. decode_match() only keeps the fields
+declared here so the rest can be garbage collected straight away.
+
+ESPN is not consistent with value types (innings_number is "1" in one place and 2 in the next)
+so leaf values are left as Any, only the shape of the document is described.
+If a new field is needed by an analyser it has to be added here as well.
+'''
+
+class MatchInfo(TypedDict, total=False):
+    cms_match_title: Any
+    date: Any
+    ground_name: Any
+    town_name: Any
+    country_name: Any
+    series_name: Any
+    international_class_name: Any
+    toss_winner_team_id: Any
+    winner_team_id: Any
+    team1_id: Any
+    team1_name: Any
+    team2_id: Any
+    team2_name: Any
+    start_date_raw: Any
+    season: Any
+    match_path: Any
+    match_status: Any
+    live_state: Any
+
+class LiveInnings(TypedDict, total=False):
+    innings_number: Any
+    batting_team_id: Any
+    runs: Any
+    wickets: Any
+    overs: Any
+    target: Any
+    run_rate: Any
+    required_run_rate: Any
+    live_current: Any
+
+class LiveBatter(TypedDict, total=False):
+    player_id: Any
+    runs: Any
+    balls_faced: Any
+    fours: Any
+    sixes: Any
+    strike_rate: Any
+    live_current_name: Any
+    batting_position: Any
+
+class LiveBowler(TypedDict, total=False):
+    player_id: Any
+    overs: Any
+    maidens: Any
+    conceded: Any
+    wickets: Any
+    economy_rate: Any
+    live_current_name: Any
+
+class RecentBall(TypedDict, total=False):
+    over_number: Any
+    ball_number: Any
+    ball: Any
+    extras: Any
+
+class FallOfWicket(TypedDict, total=False):
+    innings_number: Any
+    fow_wickets: Any
+    fow_runs: Any
+    fow_overs: Any
+    partnership_runs: Any
+    partnership_overs: Any
+    partnership_rate: Any
+    live_current_name: Any
+    out_player: Dict[str, Any]
+
+# break is a keyword so it can't be declared in a class body
+_LiveBreak = TypedDict("_LiveBreak", {"break": Any}, total=False)
+
+class Live(_LiveBreak, total=False):
+    status: Any
+    timestamp: Any
+    innings: LiveInnings
+    batting: List[LiveBatter]
+    bowling: List[LiveBowler]
+    recent_overs: List[List[RecentBall]]
+    fow: List[FallOfWicket]
+
+class Innings(TypedDict, total=False):
+    innings_number: Any
+    batting_team_id: Any
+    bowling_team_id: Any
+    runs: Any
+    wickets: Any
+    overs: Any
+    run_rate: Any
+    extras: Any
+    target: Any
+    event_name: Any
+
+class Player(TypedDict, total=False):
+    player_id: Any
+    object_id: Any
+    known_as: Any
+    player_primary_role: Any
+    batting_style_long: Any
+    bowling_style_long: Any
+    captain: Any
+    keeper: Any
+
+class Team(TypedDict, total=False):
+    team_id: Any
+    team_name: Any
+    team_abbreviation: Any
+    player: List[Player]
+
+class Ball(TypedDict, total=False):
+    innings_number: Any
+    over_number: Any
+    overs_actual: Any
+    players: Any
+    event: Any
+    dismissal: Any
+    text: Any
+    speed_kph: Any
+    speed_mph: Any
+
+class Over(TypedDict, total=False):
+    innings_number: Any
+    over_number: Any
+    runs: Any
+    wickets: Any
+    ball: List[Ball]
+
+class MatchDocument(TypedDict, total=False):
+    description: Any
+    match: MatchInfo
+    live: Live
+    innings: List[Innings]
+    team: List[Team]
+    comms: List[Over]
+
+
+def _is_typed_dict(tp) -> bool:
+    return isinstance(tp, type) and issubclass(tp, dict) and hasattr(tp, "__total__")
+
+def _compile(tp):
+    """
+    Turn a schema type into a projection plan.
+    ("dict", leaf keys, {nested key: sub plan}) / ("list", sub plan) / None -> keep the value as is
+    """
+    if _is_typed_dict(tp):
+        leaves, nested = [], {}
+        for key, hint in get_type_hints(tp).items():
+            sub_plan = _compile(hint)
+            if sub_plan is None:
+                leaves.append(key)
+            else:
+                nested[key] = sub_plan
+        return ("dict", tuple(leaves), nested)
+    if get_origin(tp) in (list, List):
+        item_plan = _compile(get_args(tp)[0])
+        return ("list", item_plan) if item_plan is not None else None
+    return None
+
+_MATCH_PLAN = _compile(MatchDocument)
+
+def _project(value, plan):
+    if plan[0] == "list":
+        if not isinstance(value, list):
+            return value
+        return [_project(item, plan[1]) for item in value]
+
+    if not isinstance(value, dict):
+        return value
+    _, leaves, nested = plan
+    projected = {key: value[key] for key in leaves if key in value}
+    for key, sub_plan in nested.items():
+        if key in value:
+            projected[key] = _project(value[key], sub_plan)
+    return projected
+
+
+def project_match(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop everything from an already decoded match document that isnt in MatchDocument"""
+    return _project(data, _MATCH_PLAN)
+
+def decode_match(raw, full: bool = False) -> Dict[str, Any]:
+    """
+    Decode a match JSON document (str or bytes).
+
+    full=False (default) only keeps the fields in MatchDocument.
+    With msgspec installed the unused fields are skipped while parsing and never built at all,
+    otherwise the whole document is decoded with the codec and then projected.
+    """
+    if full:
+        return codec.loads(raw)
+
+    if codec.msgspec is not None:
+        try:
+            return codec.msgspec.json.decode(raw, type=MatchDocument)
+        except codec.msgspec.ValidationError:
+            # Shape doesnt match the schema (e.g. null where a list is expected), do it the slow way
+            pass
+        except codec.msgspec.DecodeError as e:
+            raise codec.JSONDecodeError(str(e), raw if isinstance(raw, str) else "", 0) from None
+
+    data = codec.loads(raw)
+    if not isinstance(data, dict):
+        return data
+    return project_match(data)
+
+def load_match(filename: str, full: bool = False) -> Dict[str, Any]:
+    """Read and decode a (possibly gzip/zstd compressed) match JSON file, see decode_match"""
+    return decode_match(read_bytes(filename), full)
+
+def get_match_id(data: Dict[str, Any], source: str = None) -> str:
+    """
+    Stable id for a match document.
+    The JSON itself has no match id so the number in the source URL/filename (.../1462642.json) is used,
+    then the scorecard path, then a hash of the description and date.
+    """
+    if source:
+        found = re.search(r"(?:^|/)(\d+)\.json", source)
+        if found:
+            return found.group(1)
+
+    match = data.get('match', {})
+    if match.get('match_path'):
+        return match['match_path'].rstrip('/').split('/')[-1]
+
+    key = f"{data.get('description', '')}|{match.get('date', '')}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
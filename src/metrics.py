@@ -0,0 +1,116 @@
+import bisect
+import functools
+import time
+from contextlib import contextmanager
+from typing import Any, Dict
+from src import codec
+
+'''
+Lightweight per-stage timing and counters.
+
+    with metrics.span("fetch_page.navigation"):
+        await page.goto(url)
+    metrics.count("fetch_page.consent_timeouts")
+
+Every span is folded into a histogram as soon as it ends (count, sum, min, max and bucket counts),
+nothing is kept per call so it can stay on for a 40 minute --team_full run.
+main.py --metrics <file> writes everything out when the program exits, as Prometheus text format
+if the file ends in .prom or .txt, otherwise as JSON.
+
+Only the current process is measured, --match_dir workers aren't included.
+'''
+
+# Upper bounds (seconds) of the histogram buckets, the last one catches everything
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, float("inf"))
+
+_histograms: Dict[str, Dict[str, Any]] = {}
+_counters: Dict[str, float] = {}
+
+
+def observe(name: str, seconds: float) -> None:
+    histogram = _histograms.get(name)
+    if histogram is None:
+        histogram = _histograms[name] = {"count": 0, "sum": 0.0, "min": seconds, "max": seconds, "buckets": [0] * len(BUCKETS)}
+    histogram["count"] += 1
+    histogram["sum"] += seconds
+    histogram["min"] = min(histogram["min"], seconds)
+    histogram["max"] = max(histogram["max"], seconds)
+    histogram["buckets"][bisect.bisect_left(BUCKETS, seconds)] += 1
+
+
+def count(name: str, value: float = 1) -> None:
+    _counters[name] = _counters.get(name, 0) + value
+
+
+@contextmanager
+def span(name: str):
+    """Time the block and add it to the name histogram (also when it raises)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
+
+
+def timed(name: str):
+    """Decorator version of span"""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def reset() -> None:
+    _histograms.clear()
+    _counters.clear()
+
+
+def snapshot() -> Dict[str, Any]:
+    """Everything recorded so far, bucket counts are cumulative like Prometheus'"""
+    stages = {}
+    for name, histogram in sorted(_histograms.items()):
+        cumulative = 0
+        buckets = {}
+        for bound, bucket_count in zip(BUCKETS, histogram["buckets"]):
+            cumulative += bucket_count
+            buckets["+Inf" if bound == float("inf") else str(bound)] = cumulative
+        stages[name] = {
+            "count": histogram["count"],
+            "sum": round(histogram["sum"], 6),
+            "mean": round(histogram["sum"] / histogram["count"], 6),
+            "min": round(histogram["min"], 6),
+            "max": round(histogram["max"], 6),
+            "buckets": buckets
+        }
+    return {"stages": stages, "counters": dict(sorted(_counters.items()))}
+
+
+def to_prometheus() -> str:
+    data = snapshot()
+    lines = [
+        "# HELP scraper_stage_seconds Time spent in each stage of a run.",
+        "# TYPE scraper_stage_seconds histogram"
+    ]
+    for name, stage in data["stages"].items():
+        for bound, cumulative in stage["buckets"].items():
+            lines.append(f'scraper_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+        lines.append(f'scraper_stage_seconds_sum{{stage="{name}"}} {stage["sum"]}')
+        lines.append(f'scraper_stage_seconds_count{{stage="{name}"}} {stage["count"]}')
+    lines += [
+        "# HELP scraper_events_total Things counted during a run.",
+        "# TYPE scraper_events_total counter"
+    ]
+    for name, value in data["counters"].items():
+        lines.append(f'scraper_events_total{{event="{name}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+def write(filename: str) -> None:
+    if filename.endswith((".prom", ".txt")):
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(to_prometheus())
+    else:
+        codec.dump(snapshot(), filename, pretty=True)
@@ -0,0 +1,240 @@
+import argparse
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from src import codec
+from src.synthetic import generate_match, player_image, player_stats_html, roster_payload
+
+'''
+Local stand-in for ESPN Cricinfo so crawls can be run and benchmarked without touching the real site.
+
+Routes (www.espncricinfo.com and stats.espncricinfo.com both map onto the one server):
+    /cricketers/team/<slug>-<id>        team page, its script pages through the roster XHR like the real one
+    /api/team/players?...filterFormatLevel=ALL&teamId=<id>&page=<n>   roster XHR ({"total", "results"})
+    /ci/engine/player/<id>.html         stats engine player page
+    .../<id>.json                       match JSON (?format=t20|odi|test)
+    .../<id>.png (.1.png, .jpg)         player picture, with an ETag (answers If-None-Match with a 304)
+    /__stats                            request / injected error counters
+
+Everything is synthetic (src/synthetic.py) and seeded by the ids in the URL, unless fixtures_dir
+has a recorded file at the same path, which is then served as is.
+
+Latency, 5xx errors and 429s are injected into the data requests (XHR, player pages, match JSON),
+never into the team page itself. Point the scraper at it with --base_url:
+
+    python -m src.mock_server --port 8000 --latency 0.05 --rate_limit_rate 0.05
+    python main.py --team_full https://www.espncricinfo.com/cricketers/team/nepal-33 --base_url http://127.0.0.1:8000
+'''
+
+_TEAM_PAGE = re.compile(r"^/(?:cricketers/)?team/[a-zA-Z0-9-]*?(\d+)$")
+_PLAYER_PAGE = re.compile(r"^/ci/engine/player/(\d+)\.html$")
+_MATCH_JSON = re.compile(r"(\d+)\.json$")
+# imageUrl and headshotImageUrl (<id>.1.png) get the same picture
+_IMAGE = re.compile(r"(\d+)(?:\.\d+)?\.(?:png|jpe?g)$")
+
+_TEAM_HTML = '''<html><head><title>Team {team_id} Players</title></head><body>
+<button>ALL</button>
+<div id="players"></div>
+<script>
+let page = 1, total = null, loading = false;
+async function load() {{
+    if (loading || (total !== null && (page - 1) * {page_size} >= total)) return;
+    loading = true;
+    try {{
+        const response = await fetch("/api/team/players?teamId={team_id}&filterFormatLevel=ALL&page=" + page);
+        // 429s and errors are retried on the next tick, like the site's own infinite scroll
+        if (response.ok) {{
+            const data = await response.json();
+            total = data.total;
+            page++;
+            document.getElementById("players").insertAdjacentHTML("beforeend", data.results.map(p => "<p>" + p.name + "</p>").join(""));
+        }}
+    }} finally {{
+        loading = false;
+    }}
+}}
+setInterval(load, 100);
+load();
+</script>
+</body></html>'''
+
+
+@dataclass
+class MockConfig:
+    latency: float = 0.0          # seconds added to every data request
+    jitter: float = 0.0           # plus up to this many seconds at random
+    error_rate: float = 0.0       # fraction of data requests answered with a 500
+    rate_limit_rate: float = 0.0  # fraction of data requests answered with a 429
+    retry_after: int = 1          # Retry-After header sent with a 429
+    team_size: int = 50           # players on every synthetic team
+    page_size: int = 20           # players per roster XHR page
+    stats_rows: int = 40          # engineTable rows on a player page
+    fixtures_dir: Optional[str] = None
+    seed: int = 0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "MockCricinfo/1.0"
+    # Keep-alive like the real site, every response has a Content-Length
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body, content_type: str = "text/html; charset=utf-8", headers: dict = None):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, str(value))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _inject(self) -> bool:
+        """Sleep and maybe answer with an error. True if a response has already been sent."""
+        config = self.server.config
+        with self.server.lock:
+            draw = self.server.rng.random()
+            delay = config.latency + self.server.rng.uniform(0, config.jitter)
+        if delay:
+            time.sleep(delay)
+        if draw < config.rate_limit_rate:
+            self.server.count("rate_limited")
+            self._send(429, "Too Many Requests", "text/plain", {"Retry-After": config.retry_after})
+            return True
+        if draw < config.rate_limit_rate + config.error_rate:
+            self.server.count("errors")
+            self._send(500, "Internal Server Error", "text/plain")
+            return True
+        return False
+
+    def _fixture(self, path: str) -> Optional[bytes]:
+        fixtures_dir = self.server.config.fixtures_dir
+        if not fixtures_dir:
+            return None
+        root = os.path.abspath(fixtures_dir)
+        filename = os.path.abspath(os.path.join(root, path.lstrip("/")))
+        # Dont let ../ escape the fixtures directory
+        if not filename.startswith(root + os.sep) or not os.path.isfile(filename):
+            return None
+        with open(filename, "rb") as f:
+            return f.read()
+
+    def do_GET(self):
+        config = self.server.config
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        self.server.count("requests")
+
+        if url.path == "/__stats":
+            return self._send(200, codec.dumps(self.server.stats), "application/json")
+
+        team = _TEAM_PAGE.match(url.path)
+        if team:
+            recorded = self._fixture(url.path)
+            return self._send(200, recorded or _TEAM_HTML.format(team_id=team.group(1), page_size=config.page_size))
+
+        if self._inject():
+            return
+
+        content_type = "application/json" if url.path.endswith(".json") or "filterFormatLevel" in url.query else "text/html; charset=utf-8"
+        recorded = self._fixture(url.path)
+        if recorded is not None:
+            return self._send(200, recorded, content_type)
+
+        image = _IMAGE.search(url.path)
+        if image:
+            self.server.count("images")
+            etag = f'"{image.group(1)}-{config.seed}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.server.count("not_modified")
+                return self._send(304, b"", "image/png", {"ETag": etag})
+            return self._send(200, player_image(config.seed + int(image.group(1))), "image/png", {"ETag": etag})
+
+        if "filterFormatLevel" in url.query:
+            team_id = int(query.get("teamId", 0))
+            page = int(query.get("page", 1))
+            payload = roster_payload(config.team_size, page, config.page_size, seed=config.seed + team_id)
+            return self._send(200, codec.dumps(payload), content_type)
+
+        player = _PLAYER_PAGE.match(url.path)
+        if player:
+            player_id = int(player.group(1))
+            return self._send(200, player_stats_html(config.stats_rows, config.seed + player_id, player_id))
+
+        match = _MATCH_JSON.search(url.path)
+        if match:
+            try:
+                document = generate_match(config.seed + int(match.group(1)), query.get("format", "t20"))
+            except ValueError as e:
+                return self._send(400, str(e), "text/plain")
+            return self._send(200, codec.dumps(document), content_type)
+
+        self._send(404, "Not Found", "text/plain")
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], config: MockConfig = None):
+        super().__init__(address, _Handler)
+        self.config = config or MockConfig()
+        self.lock = threading.Lock()
+        self.rng = random.Random(self.config.seed)
+        self.stats = {"requests": 0, "errors": 0, "rate_limited": 0, "images": 0, "not_modified": 0}
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, key: str) -> None:
+        with self.lock:
+            self.stats[key] += 1
+
+
+def start_server(config: MockConfig = None, host: str = "127.0.0.1", port: int = 0) -> MockServer:
+    """Start a MockServer on a background thread (port 0 picks a free one). Stop it with server.shutdown()"""
+    server = MockServer((host, port), config)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve synthetic (or recorded) ESPN Cricinfo pages locally.")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every data request.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many extra seconds at random.")
+    parser.add_argument("--error_rate", type=float, default=0.0, help="Fraction of data requests answered with a 500.")
+    parser.add_argument("--rate_limit_rate", type=float, default=0.0, help="Fraction of data requests answered with a 429.")
+    parser.add_argument("--team_size", type=int, default=50, help="Players on every team.")
+    parser.add_argument("--fixtures", type=str, default=None, help="Directory of recorded responses served in place of synthetic ones (same paths as the URLs).")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+        team_size=args.team_size, fixtures_dir=args.fixtures, seed=args.seed
+    )
+    server = MockServer((args.host, args.port), config)
+    print(f"Mock ESPN Cricinfo running on {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\n{server.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from src import codec
+from src import metrics
+from src.live_feed import diff_states, live_state
+from src.match.schema import get_match_id
+from src.snapshot_archive import ArchiveWriter
+
+'''
+--monitor: follow several live matches from one process.
+
+Every match is polled on its own schedule, depending on what the last poll said it was doing:
+
+    in_play    every interval seconds (--interval)
+    break      innings break, drinks, lunch, stumps... 4x less often
+    upcoming   not started yet, 20x less often
+    finished   polled one last time then dropped
+
+When more matches are due than can be fetched at once the in play ones go first, then the longest waiting.
+A failed poll is retried with a growing backoff instead of the normal interval.
+
+Each match keeps only its last live_state() so every poll is reduced to what changed (see src/live_feed.py).
+After every poll the status of all matches is written to <output>_monitor.json.
+With archive_dir every poll is also kept in <archive_dir>/<match_id>.snapshots.gz (see src/snapshot_archive.py).
+'''
+
+PHASES = ("in_play", "break", "upcoming", "finished")
+PHASE_FACTORS = {"in_play": 1, "break": 4, "upcoming": 20}
+MAX_BACKOFF = 300.0
+
+_UPCOMING = ("forthcoming", "dormant", "scheduled", "fixture")
+
+
+def match_phase(match_data: Dict[str, Any]) -> str:
+    match = match_data.get("match") or {}
+    live = match_data.get("live") or {}
+    status = str(match.get("match_status", "")).lower()
+    if status == "complete":
+        return "finished"
+    if status in _UPCOMING:
+        return "upcoming"
+    if live.get("break") or match.get("live_state"):
+        return "break"
+    return "in_play"
+
+
+def score_line(state: Dict[str, Any]) -> str:
+    """'131/2 (15.3)' for the latest innings"""
+    if not state or not state["score"]:
+        return ""
+    innings = list(state["score"].values())[-1]
+    return f"{innings['runs']}/{innings['wickets']} ({innings['overs']})"
+
+
+@dataclass
+class MatchWatch:
+    url: str
+    match_id: Optional[str] = None
+    phase: str = "upcoming"
+    state: Optional[Dict[str, Any]] = None
+    next_poll: float = 0.0
+    polls: int = 0
+    updates: int = 0
+    errors: int = 0
+    last_update: str = ""
+    last_error: str = ""
+    last_delta: Dict[str, Any] = field(default_factory=dict)
+
+    def status(self, now: float) -> Dict[str, Any]:
+        return {
+            "match_id": self.match_id,
+            "url": self.url,
+            "phase": self.phase,
+            "score": score_line(self.state),
+            "status": self.state["status"] if self.state else "",
+            "polls": self.polls,
+            "updates": self.updates,
+            "errors": self.errors,
+            "last_update": self.last_update,
+            "last_error": self.last_error,
+            "next_poll_in": None if self.phase == "finished" else round(max(self.next_poll - now, 0), 1)
+        }
+
+
+class Monitor:
+    def __init__(self, urls: List[str], fetch: Callable[[str], Awaitable[Dict[str, Any]]], output: str = "output", interval: float = 15, concurrency: int = 2, archive_dir: str = None):
+        """fetch(url) returns the match document, normally extract_match_data with a shared BrowserSession"""
+        self.watches = [MatchWatch(url) for url in dict.fromkeys(urls)]
+        self.fetch = fetch
+        self.output = output
+        self.interval = interval
+        self.concurrency = concurrency
+        self.archive_dir = archive_dir
+        self.archives: Dict[str, ArchiveWriter] = {}
+        self._wakeup = asyncio.Event()
+
+    def archive(self, match_id: str, match_data: Dict[str, Any], timestamp: float) -> None:
+        archive = self.archives.get(match_id)
+        if archive is None:
+            archive = self.archives[match_id] = ArchiveWriter(os.path.join(self.archive_dir, f"{match_id}.snapshots.gz"))
+        archive.append(match_data, timestamp)
+
+    def next_due(self, now: float) -> Optional[MatchWatch]:
+        """The watch to poll next out of the ones that are due: in play first, then the longest overdue"""
+        due = [watch for watch in self.watches if watch.phase != "finished" and watch.next_poll <= now and watch.next_poll >= 0]
+        if not due:
+            return None
+        return min(due, key=lambda watch: (PHASES.index(watch.phase), watch.next_poll))
+
+    async def poll(self, watch: MatchWatch) -> None:
+        watch.polls += 1
+        try:
+            with metrics.span("monitor.poll"):
+                polled_at = time.time()
+                match_data = await self.fetch(watch.url)
+                if not match_data:
+                    raise ValueError("no match data")
+                match_id = get_match_id(match_data, watch.url)
+                state = await asyncio.to_thread(live_state, match_data)
+                if self.archive_dir:
+                    await asyncio.to_thread(self.archive, match_id, match_data, polled_at)
+        except Exception as e:
+            watch.errors += 1
+            watch.last_error = str(e)
+            metrics.count("monitor.errors")
+            # Doubles for each failure in a row
+            backoff = min(self.interval * 2 ** min(watch.errors, 10), MAX_BACKOFF)
+            watch.next_poll = time.monotonic() + backoff
+            print(f"\033[91mError: Could not poll '{watch.url}' (retrying in {backoff:g}s): {str(e)}\033[0m")
+            return
+
+        watch.errors = 0
+        watch.match_id = match_id
+        watch.phase = match_phase(match_data)
+        delta = diff_states(watch.state, state) if watch.state is not None else None
+        watch.state = state
+        if delta is None or delta:
+            watch.updates += 1
+            watch.last_update = datetime.now().isoformat(timespec="seconds")
+            watch.last_delta = delta or {}
+            metrics.count("monitor.updates")
+            new_balls = f" (+{len(delta['balls'])} balls)" if delta and "balls" in delta else ""
+            print(f"[{watch.match_id}] {score_line(state)} {state['status']}{new_balls}")
+        if watch.phase != "finished":
+            watch.next_poll = time.monotonic() + self.interval * PHASE_FACTORS[watch.phase]
+
+    def status(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "updated": datetime.now().isoformat(timespec="seconds"),
+            "matches": [watch.status(now) for watch in self.watches]
+        }
+
+    def write_status(self) -> None:
+        # Written to a temporary file first so anything reading it never sees half a file
+        filename = f"{self.output}_monitor.json"
+        codec.dump(self.status(), f"{filename}.tmp", pretty=True)
+        os.replace(f"{filename}.tmp", filename)
+
+    async def _poll_and_report(self, watch: MatchWatch, slots: asyncio.Semaphore) -> None:
+        try:
+            await self.poll(watch)
+            self.write_status()
+        finally:
+            slots.release()
+            self._wakeup.set()
+
+    async def run(self) -> None:
+        """Poll until every match has finished"""
+        slots = asyncio.Semaphore(self.concurrency)
+        running = set()
+        while any(watch.phase != "finished" for watch in self.watches):
+            await slots.acquire()
+            self._wakeup.clear()
+            watch = self.next_due(time.monotonic())
+            if watch is None:
+                slots.release()
+                # Sleep until the next one is due, or until a poll finishing changes the schedule
+                waiting = [watch.next_poll for watch in self.watches if watch.phase != "finished" and watch.next_poll >= 0]
+                timeout = max(min(waiting) - time.monotonic(), 0) if waiting else None
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            # Marked as in flight so it isn't picked again before this poll finishes
+            watch.next_poll = -1
+            task = asyncio.create_task(self._poll_and_report(watch, slots))
+            running.add(task)
+            task.add_done_callback(running.discard)
+        await asyncio.gather(*running)
+
+    def close(self) -> None:
+        for archive in self.archives.values():
+            archive.close()
@@ -0,0 +1,175 @@
+import argparse
+import glob
+import gzip
+import hashlib
+import os
+import time
+from typing import Any, Dict, Optional, Union
+from src import codec
+from src.compression import GZIP_MAGIC, ZSTD_MAGIC, zstandard
+
+'''
+Content-addressed store of raw page bodies (--page_store <directory>).
+
+Every body is stored once, named by its hash, however many times it's fetched:
+
+    <directory>/objects/ab/ab12...ef       the body, zstd compressed (gzip if zstandard isn't installed)
+    <directory>/dictionaries/<id>.zstd     trained zstd dictionaries (python -m src.page_store train <directory>)
+    <directory>/pages.ndjson               one line per capture: {"t", "url", "hash", "size"}
+
+ESPN pages share most of their markup, so compressing against a dictionary trained on earlier pages
+makes new ones a lot smaller again. zstd writes the id of the dictionary into every frame, so objects
+compressed with an older dictionary can still be read after training a new one.
+
+Outputs point at a body with reference() instead of carrying a copy of it.
+'''
+
+ZSTD_LEVEL = 10
+GZIP_LEVEL = 9
+DICTIONARY_SIZE = 112_640  # zstd's own default
+TRAINING_SAMPLES = 2000
+
+
+def content_hash(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=32).hexdigest()
+
+
+class PageStore:
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+        self.dictionaries: Dict[int, Any] = {}
+        self.dictionary = None
+        self._compressor = None
+        self.stored = 0
+        self.deduplicated = 0
+        self.bytes_in = 0
+        self.bytes_written = 0
+        if zstandard is not None:
+            self._load_dictionaries()
+
+    def _load_dictionaries(self) -> None:
+        files = sorted(glob.glob(os.path.join(self.directory, "dictionaries", "*.zstd")), key=os.path.getmtime)
+        for filename in files:
+            with open(filename, "rb") as f:
+                dictionary = zstandard.ZstdCompressionDict(f.read())
+            self.dictionaries[dictionary.dict_id()] = dictionary
+            # New objects use the most recently trained one
+            self.dictionary = dictionary
+        self._compressor = None
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.directory, "objects", digest[:2], digest)
+
+    def _compress(self, data: bytes) -> bytes:
+        if zstandard is None:
+            return gzip.compress(data, compresslevel=GZIP_LEVEL)
+        if self._compressor is None:
+            self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=self.dictionary)
+        return self._compressor.compress(data)
+
+    def put(self, body: Union[str, bytes], url: Optional[str] = None) -> str:
+        """Store body (if it isn't already) and log the capture, returns its hash"""
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        digest = content_hash(data)
+        path = self.path(digest)
+        self.bytes_in += len(data)
+        if os.path.exists(path):
+            self.deduplicated += 1
+        else:
+            compressed = self._compress(data)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Written under a temporary name first so a reader (or another process) never sees half an object
+            temporary = f"{path}.{os.getpid()}.tmp"
+            with open(temporary, "wb") as f:
+                f.write(compressed)
+            os.replace(temporary, path)
+            self.stored += 1
+            self.bytes_written += len(compressed)
+
+        line = codec.dumps_bytes({"t": round(time.time(), 3), "url": url, "hash": digest, "size": len(data)}) + b"\n"
+        with open(os.path.join(self.directory, "pages.ndjson"), "ab") as f:
+            f.write(line)
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        with open(self.path(digest), "rb") as f:
+            data = f.read()
+        if data[:2] == GZIP_MAGIC:
+            return gzip.decompress(data)
+        if data[:4] == ZSTD_MAGIC:
+            if zstandard is None:
+                raise RuntimeError(f"Object {digest} is zstd compressed, install the zstandard package to read it.")
+            dict_id = zstandard.get_frame_parameters(data).dict_id
+            if dict_id and dict_id not in self.dictionaries:
+                raise RuntimeError(f"Object {digest} needs zstd dictionary {dict_id} which isn't in {self.directory}/dictionaries.")
+            return zstandard.ZstdDecompressor(dict_data=self.dictionaries.get(dict_id)).decompress(data)
+        return data
+
+    def get_text(self, digest: str) -> str:
+        return self.get(digest).decode("utf-8")
+
+    def reference(self, digest: str, url: Optional[str] = None) -> Dict[str, Any]:
+        """What an output carries instead of the body"""
+        reference = {"content": digest, "store": self.directory}
+        if url is not None:
+            reference = {"url": url, **reference}
+        return reference
+
+    def train(self, size: int = DICTIONARY_SIZE, samples: int = TRAINING_SAMPLES) -> int:
+        """Train a dictionary on the most recent objects, returns its id. New objects are compressed with it."""
+        if zstandard is None:
+            raise RuntimeError("Training a dictionary needs the zstandard package.")
+        objects = sorted(glob.glob(os.path.join(self.directory, "objects", "*", "*")), key=os.path.getmtime, reverse=True)
+        bodies = [self.get(os.path.basename(filename)) for filename in objects[:samples] if not filename.endswith(".tmp")]
+        dictionary = zstandard.train_dictionary(size, bodies)
+        os.makedirs(os.path.join(self.directory, "dictionaries"), exist_ok=True)
+        with open(os.path.join(self.directory, "dictionaries", f"{dictionary.dict_id()}.zstd"), "wb") as f:
+            f.write(dictionary.as_bytes())
+        self._load_dictionaries()
+        return dictionary.dict_id()
+
+    def stats(self) -> Dict[str, Any]:
+        objects = [filename for filename in glob.glob(os.path.join(self.directory, "objects", "*", "*")) if not filename.endswith(".tmp")]
+        captures = 0
+        raw_bytes = 0
+        manifest = os.path.join(self.directory, "pages.ndjson")
+        if os.path.exists(manifest):
+            with open(manifest, "rb") as f:
+                for line in f:
+                    if line.strip():
+                        captures += 1
+                        raw_bytes += codec.loads(line)["size"]
+        stored_bytes = sum(os.path.getsize(filename) for filename in objects)
+        return {
+            "captures": captures,
+            "objects": len(objects),
+            "captured_bytes": raw_bytes,
+            "stored_bytes": stored_bytes,
+            "ratio": round(raw_bytes / stored_bytes, 1) if stored_bytes else None,
+            "dictionaries": sorted(self.dictionaries),
+            "compression": "zstd" if zstandard is not None else "gzip"
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Look after a --page_store directory.")
+    parser.add_argument("command", choices=["stats", "train", "get"], help="stats: sizes and dedupe ratio, train: train a zstd dictionary on the stored pages, get: print a stored body.")
+    parser.add_argument("directory", type=str, help="The --page_store directory.")
+    parser.add_argument("hash", type=str, nargs="?", help="Content hash for get.")
+    parser.add_argument("--size", type=int, default=DICTIONARY_SIZE, help="Dictionary size in bytes for train.")
+    args = parser.parse_args()
+
+    store = PageStore(args.directory)
+    if args.command == "stats":
+        print(codec.dumps(store.stats(), pretty=True))
+    elif args.command == "train":
+        print(f"Trained dictionary {store.train(args.size)}, new pages will be compressed with it")
+    elif args.command == "get":
+        if not args.hash:
+            parser.error("get needs a content hash")
+        print(store.get_text(args.hash))
+
+
+if __name__ == "__main__":
+    main()
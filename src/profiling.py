@@ -0,0 +1,147 @@
+import cProfile
+import io
+import os
+import pstats
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+'''
+--profile support: wrap any command in cProfile (cpu) or tracemalloc (alloc).
+
+Files written next to the output (<output> is whatever --output is):
+    cpu     <output>.cpu.txt        functions sorted by cumulative and own time
+            <output>.cpu.prof       raw pstats dump (snakeviz, pstats.Stats...)
+            <output>.cpu.collapsed  collapsed stacks in microseconds for flamegraph.pl / speedscope
+    alloc   <output>.alloc.txt      peak memory and the lines holding the most memory at the end
+            <output>.alloc.collapsed  collapsed allocation stacks in bytes
+
+cProfile only records caller -> callee pairs, so the collapsed stacks share each function's time
+out between its callers by how much time each call edge took. Close enough to find the hot paths.
+Only this process is profiled, use --workers 1 with --match_dir.
+'''
+
+MODES = ("cpu", "alloc")
+ALLOC_FRAMES = 25
+TOP = 50
+_MAX_DEPTH = 128
+_MIN_SECONDS = 1e-5  # Paths below 10us aren't followed, otherwise the number of stacks explodes
+
+
+def _label(func: Tuple[str, int, str]) -> str:
+    filename, lineno, name = func
+    if filename == "~":
+        return name
+    return f"{name} ({os.path.basename(filename)}:{lineno})"
+
+
+def collapse_stats(stats: pstats.Stats) -> Dict[str, float]:
+    """cProfile stats -> {"root;caller;function": own seconds}"""
+    raw = stats.stats
+    children: Dict[tuple, List[Tuple[tuple, float]]] = {}
+    for func, (_, _, _, _, callers) in raw.items():
+        for caller, (_, _, _, edge_cumulative) in callers.items():
+            children.setdefault(caller, []).append((func, edge_cumulative))
+
+    stacks: Dict[str, float] = {}
+
+    def walk(func, seconds, stack, seen):
+        if seconds < _MIN_SECONDS:
+            return
+        total = raw[func][3]
+        share = seconds / total if total else 0
+        label = ";".join(stack)
+        own = raw[func][2] * share
+        if own:
+            stacks[label] = stacks.get(label, 0) + own
+        if len(stack) >= _MAX_DEPTH:
+            return
+        for child, edge in children.get(func, ()):
+            # Skip recursion, the time is already in the outer call
+            if child in seen or child not in raw:
+                continue
+            seen.add(child)
+            walk(child, edge * share, stack + [_label(child)], seen)
+            seen.discard(child)
+
+    for func, (_, _, _, cumulative, callers) in raw.items():
+        if not callers:
+            walk(func, cumulative, [_label(func)], {func})
+    return stacks
+
+
+def write_cpu(profiler: cProfile.Profile, output: str) -> List[str]:
+    stats = pstats.Stats(profiler)
+    stats.dump_stats(f"{output}.cpu.prof")
+
+    text = io.StringIO()
+    report = pstats.Stats(profiler, stream=text)
+    report.sort_stats("cumulative").print_stats(TOP)
+    report.sort_stats("tottime").print_stats(TOP)
+    with open(f"{output}.cpu.txt", "w", encoding="utf-8") as f:
+        f.write(text.getvalue())
+
+    with open(f"{output}.cpu.collapsed", "w", encoding="utf-8") as f:
+        for stack, seconds in sorted(collapse_stats(stats).items()):
+            microseconds = int(seconds * 1_000_000)
+            if microseconds:
+                f.write(f"{stack} {microseconds}\n")
+    return [f"{output}.cpu.txt", f"{output}.cpu.prof", f"{output}.cpu.collapsed"]
+
+
+def write_alloc(snapshot: tracemalloc.Snapshot, peak: int, output: str) -> List[str]:
+    # Leave out tracemalloc's and this module's own allocations
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ])
+    with open(f"{output}.alloc.txt", "w", encoding="utf-8") as f:
+        statistics = snapshot.statistics("lineno")
+        f.write(f"Peak traced memory: {peak / 1024 / 1024:.2f} MiB\n")
+        f.write(f"Still allocated at the end: {sum(stat.size for stat in statistics) / 1024 / 1024:.2f} MiB\n\n")
+        for stat in statistics[:TOP]:
+            frame = stat.traceback[0]
+            f.write(f"{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  {frame.filename}:{frame.lineno}\n")
+
+    stacks: Dict[str, int] = {}
+    for stat in snapshot.statistics("traceback"):
+        # Frames are oldest first, which is the order collapsed stacks want
+        stack = ";".join(f"{os.path.basename(frame.filename)}:{frame.lineno}" for frame in stat.traceback)
+        stacks[stack] = stacks.get(stack, 0) + stat.size
+    with open(f"{output}.alloc.collapsed", "w", encoding="utf-8") as f:
+        for stack, size in sorted(stacks.items()):
+            f.write(f"{stack} {size}\n")
+    return [f"{output}.alloc.txt", f"{output}.alloc.collapsed"]
+
+
+@contextmanager
+def profile(mode: str = None, output: str = "output"):
+    """Profile the block (mode "cpu" or "alloc", None does nothing) and write the reports for output"""
+    if mode is None:
+        yield
+        return
+    if mode not in MODES:
+        raise ValueError(f"Unknown profile mode '{mode}'. Valid options: {', '.join(MODES)}")
+
+    if mode == "cpu":
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            files = write_cpu(profiler, output)
+    else:
+        already_tracing = tracemalloc.is_tracing()
+        if not already_tracing:
+            tracemalloc.start(ALLOC_FRAMES)
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            if not already_tracing:
+                tracemalloc.stop()
+            files = write_alloc(snapshot, peak, output)
+    print(f"Profile written to: {', '.join(files)}")
@@ -0,0 +1,114 @@
+import asyncio
+import hashlib
+import re
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from src import metrics
+from src.database import ingest_player_stats
+from src.extract_player_data import parse_player_data, player_stats_url
+
+'''
+--refresh: bring the player stats of a team_full output up to date without redoing every player.
+
+Which players get fetched, most urgent first:
+    played   played a match (in the --db matches) on or after the day their page was last fetched
+    new      page never fetched (or no full_data yet)
+    stale    last fetched more than max_age_days ago
+Everyone else is skipped, and limit caps how many pages one run fetches.
+
+Each fetched page is hashed (only its stats tables, the rest of the page changes on every load) and only
+parsed when the hash differs from the last fetch. Only the changed players are written to the database
+and the team file is only rewritten when at least one player changed.
+The hashes and fetch times are kept in the player_pages table of the database.
+'''
+
+MAX_AGE_DAYS = 7
+
+_STATS_TABLE = re.compile(r'<table[^>]*class="engineTable".*?</table>', re.DOTALL)
+
+
+def page_hash(html: str) -> str:
+    tables = _STATS_TABLE.findall(html)
+    content = "".join(tables) if tables else html
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def plan_refresh(conn: sqlite3.Connection, player_ids: List[str], max_age_days: float = MAX_AGE_DAYS, now: Optional[datetime] = None) -> List[Tuple[str, str]]:
+    """(player_id, reason) for every player whose page should be fetched, most urgent first"""
+    now = now or datetime.now(timezone.utc)
+    stale_before = (now - timedelta(days=max_age_days)).isoformat(timespec="seconds")
+    fetched = {row["player_id"]: row["fetched_at"] for row in conn.execute("SELECT player_id, fetched_at FROM player_pages")}
+    last_played = {row["player_id"]: row["last_played"] for row in conn.execute(
+        "SELECT mp.player_id, MAX(m.start_date) AS last_played FROM match_players mp "
+        "JOIN matches m ON m.match_id = mp.match_id GROUP BY mp.player_id"
+    )}
+
+    played, new, stale = [], [], []
+    for player_id in player_ids:
+        fetched_at = fetched.get(player_id)
+        match_date = (last_played.get(player_id) or "")[:10]
+        if match_date and (fetched_at is None or match_date >= fetched_at[:10]):
+            played.append((match_date, player_id))
+        elif fetched_at is None:
+            new.append(player_id)
+        elif fetched_at < stale_before:
+            stale.append((fetched_at, player_id))
+
+    return ([(player_id, "played") for _, player_id in sorted(played, reverse=True)]
+            + [(player_id, "new") for player_id in new]
+            + [(player_id, "stale") for _, player_id in sorted(stale)])
+
+
+async def refresh_players(conn: sqlite3.Connection, team_json: List[Dict[str, Any]], fetch_html: Callable[[str], Awaitable[str]],
+                          limit: Optional[int] = None, max_age_days: float = MAX_AGE_DAYS, delay: float = 5, now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Refresh the full_data of the players in team_json (a team / team_full output, updated in place).
+    fetch_html(url) returns a stats page. Returns how many players were fetched, changed, skipped...
+    """
+    players = {str(player["objectId"]): player for player in team_json if player.get("objectId")}
+    # Players without full_data are fetched whatever player_pages says
+    with conn:
+        conn.executemany("DELETE FROM player_pages WHERE player_id = ?", [(player_id,) for player_id, player in players.items() if not player.get("full_data")])
+    plan = plan_refresh(conn, list(players), max_age_days, now)
+    if limit:
+        plan = plan[:limit]
+    hashes = {row["player_id"]: row["content_hash"] for row in conn.execute("SELECT player_id, content_hash FROM player_pages")}
+    counts = {"players": len(players), "fetched": 0, "changed": 0, "unchanged": 0, "failed": 0, "skipped": len(players) - len(plan)}
+
+    for number, (player_id, reason) in enumerate(plan, 1):
+        if number > 1 and delay:
+            with metrics.span("refresh.sleep"):
+                await asyncio.sleep(delay)
+        url = player_stats_url(player_id)
+        try:
+            with metrics.span("refresh.fetch"):
+                html = await fetch_html(url)
+        except Exception as e:
+            print(f"\033[91mError: Could not fetch player {player_id}: {str(e)}\033[0m")
+            counts["failed"] += 1
+            continue
+        counts["fetched"] += 1
+        fetched_at = (now or datetime.now(timezone.utc)).isoformat(timespec="seconds")
+        digest = page_hash(html)
+        changed = digest != hashes.get(player_id)
+
+        with conn:
+            if changed:
+                with metrics.span("refresh.parse"):
+                    data = parse_player_data(html, url)
+                players[player_id]["full_data"] = data
+                ingest_player_stats(conn, {**data, "player_id": player_id})
+                conn.execute(
+                    "INSERT INTO player_pages (player_id, content_hash, fetched_at, changed_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (player_id) DO UPDATE SET content_hash = excluded.content_hash, fetched_at = excluded.fetched_at, changed_at = excluded.changed_at",
+                    (player_id, digest, fetched_at, fetched_at)
+                )
+                counts["changed"] += 1
+                metrics.count("refresh.changed")
+            else:
+                conn.execute("UPDATE player_pages SET fetched_at = ? WHERE player_id = ?", (fetched_at, player_id))
+                counts["unchanged"] += 1
+                metrics.count("refresh.unchanged")
+        print(f"[{number}/{len(plan)}] {player_id} ({reason}): {'changed' if changed else 'unchanged'}")
+    return counts
@@ -0,0 +1,425 @@
+import asyncio
+import glob
+import gzip
+import hashlib
+import os
+import re
+from collections import OrderedDict
+from itertools import chain
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import unquote, urlsplit
+from src import codec
+from src import metrics
+from src.compression import COMPRESSED_EXTENSIONS
+from src.live_feed import LiveFeed, live_state
+from src.database import is_match_document
+from src.match.loader import iter_match_documents
+from src.match.schema import get_match_id
+
+'''
+Read API over the scraper's output files (--serve <directory>).
+
+    GET /teams               ids of every team output (file name, plus the number at the end of it)
+    GET /teams/<team_id>     a team / team_full output
+    GET /players             ids of every player
+    GET /players/<objectId>  the player's roster entry (with full_data from a player output if there is one)
+    GET /matches             ids of every match document (see get_match_id)
+    GET /matches/<match_id>  a saved match JSON document
+    GET /live/<match_id>     Server-Sent Events feed of the match's per-ball deltas (see src/live_feed.py)
+    GET /health              counts and cache stats
+
+Files are indexed once at startup and re-indexed when their size or modification time changes
+(checked every refresh_interval seconds). Responses are kept already encoded in an LRU cache,
+with an ETag (If-None-Match gives a 304) and a gzipped copy made on first request, so a cache hit
+never touches the disk or decodes JSON. Decoding and file scans run in a worker thread so a big
+archive being re-indexed doesn't hold up other requests.
+
+A live feed starts with the first subscriber and is updated whenever the match's file changes,
+or on every poll of poll_match() when the match is being fetched from ESPN (--live).
+'''
+
+DEFAULT_PORT = 8080
+CACHE_SIZE = 1024
+REFRESH_INTERVAL = 2.0
+GZIP_MIN_SIZE = 1024
+HEARTBEAT = 15.0
+KINDS = ("teams", "players", "matches")
+# Every JSON output, compressed or not
+DEFAULT_PATTERNS = ("**/*.json",) + tuple(f"**/*.json{extension}" for extension in COMPRESSED_EXTENSIONS)
+
+_TEAM_NUMBER = re.compile(r"[_-](\d+)$")
+
+# Where a response comes from: (kind, filename, document number in the file or None for the whole file)
+Locator = Tuple[str, str, Optional[int]]
+
+
+class Entry:
+    """An encoded response body, its ETag and (once asked for) its gzipped copy"""
+    __slots__ = ("body", "etag", "gzipped")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        self.gzipped = None
+
+    def gzip_body(self) -> bytes:
+        if self.gzipped is None:
+            self.gzipped = gzip.compress(self.body, compresslevel=6)
+        return self.gzipped
+
+
+def scan_file(filename: str) -> Dict[str, Dict[str, Locator]]:
+    """Work out what an output file holds: {kind: {id: locator}}. Runs in a worker thread."""
+    found = {kind: {} for kind in KINDS}
+    found["player_stats"] = {}
+    matches = []
+    roster = False
+
+    for number, text in enumerate(iter_match_documents(filename)):
+        document = codec.loads(text)
+        if is_match_document(document):
+            matches.append((number, document))
+        elif isinstance(document, dict) and "stats" in document and "player_id" in document:
+            found["player_stats"][str(document["player_id"])] = ("player_stats", filename, number)
+        elif isinstance(document, dict) and "objectId" in document:
+            found["players"][str(document["objectId"])] = ("players", filename, number)
+            roster = True
+
+    # Same source naming as --ingest: the file name for a single match, file#n inside an archive
+    for index, (number, document) in enumerate(matches, 1):
+        source = filename if len(matches) == 1 else f"{filename}#{index}"
+        found["matches"][get_match_id(document, source)] = ("matches", filename, number)
+
+    if roster:
+        stem = os.path.basename(filename).split(".")[0]
+        found["teams"][stem] = ("teams", filename, None)
+        number = _TEAM_NUMBER.search(stem)
+        if number:
+            found["teams"].setdefault(number.group(1), ("teams", filename, None))
+    return found
+
+
+def load_document(filename: str, number: Optional[int]):
+    """Decode one document of a file (or all of them as a list when number is None). Runs in a worker thread."""
+    documents = []
+    for index, text in enumerate(iter_match_documents(filename)):
+        if number is None:
+            documents.append(codec.loads(text))
+        elif index == number:
+            return codec.loads(text)
+    return documents if number is None else None
+
+
+class OutputCache:
+    def __init__(self, directory: str, pattern: Union[str, Tuple[str, ...]] = DEFAULT_PATTERNS, max_entries: int = CACHE_SIZE):
+        self.directory = directory
+        self.patterns = (pattern,) if isinstance(pattern, str) else tuple(pattern)
+        self.max_entries = max_entries
+        self.files: Dict[str, Tuple[int, int]] = {}
+        self.by_file: Dict[str, Dict[str, Dict[str, Locator]]] = {}
+        self.index: Dict[str, Dict[str, Locator]] = {kind: {} for kind in KINDS + ("player_stats",)}
+        self.entries: "OrderedDict[Tuple[str, str], Entry]" = OrderedDict()
+        # Which files each cached response was built from, to drop it when one changes
+        self._sources: Dict[Tuple[str, str], set] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _stat_files(self) -> Dict[str, Tuple[int, int]]:
+        files = {}
+        filenames = chain.from_iterable(glob.iglob(os.path.join(self.directory, pattern), recursive=True) for pattern in self.patterns)
+        for filename in filenames:
+            try:
+                stat = os.stat(filename)
+            except OSError:
+                continue
+            files[filename] = (stat.st_mtime_ns, stat.st_size)
+        return files
+
+    def _rebuild_index(self) -> None:
+        index = {kind: {} for kind in self.index}
+        # Sorted so when two files claim the same id the result doesnt depend on scan order
+        for filename in sorted(self.by_file):
+            for kind, ids in self.by_file[filename].items():
+                index[kind].update(ids)
+        self.index = index
+
+    async def refresh(self) -> List[str]:
+        """Re-index new, changed and deleted files. Returns the files that changed."""
+        files = await asyncio.to_thread(self._stat_files)
+        changed = [filename for filename, stat in files.items() if self.files.get(filename) != stat]
+        removed = [filename for filename in self.files if filename not in files]
+        if not changed and not removed:
+            return []
+
+        for filename in removed:
+            self.by_file.pop(filename, None)
+        for filename in changed:
+            try:
+                self.by_file[filename] = await asyncio.to_thread(scan_file, filename)
+            except (OSError, ValueError, codec.JSONDecodeError) as e:
+                # Probably still being written, try again on the next refresh
+                print(f"\033[91mError: Could not index '{filename}': {str(e)}\033[0m")
+                files.pop(filename)
+                self.by_file.pop(filename, None)
+        self.files = files
+        self._rebuild_index()
+
+        # Drop cached responses built from files that changed, or for ids a changed file now has
+        stale = set(changed) | set(removed)
+        stale_keys = {key for key, filenames in self._sources.items() if stale & filenames}
+        for filename in changed:
+            for kind, ids in self.by_file.get(filename, {}).items():
+                stale_keys.update(("players" if kind == "player_stats" else kind, item_id) for item_id in ids)
+        for key in stale_keys:
+            self.entries.pop(key, None)
+            self._sources.pop(key, None)
+        for kind in KINDS:
+            self.entries.pop(("listing", kind), None)
+        return changed + removed
+
+    def _remember(self, key: Tuple[str, str], entry: Entry, filenames: set) -> Entry:
+        self.entries[key] = entry
+        self._sources[key] = filenames
+        while len(self.entries) > self.max_entries:
+            old_key, _ = self.entries.popitem(last=False)
+            self._sources.pop(old_key, None)
+        return entry
+
+    async def get(self, kind: str, item_id: str) -> Optional[Entry]:
+        """Encoded response for one team, player or match, None if there isn't one"""
+        key = (kind, item_id)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            metrics.count("serve.cache_hits")
+            return entry
+
+        locator = self.index[kind].get(item_id)
+        stats_locator = self.index["player_stats"].get(item_id) if kind == "players" else None
+        if locator is None and stats_locator is None:
+            return None
+        self.misses += 1
+        metrics.count("serve.cache_misses")
+
+        with metrics.span("serve.load"):
+            data = None
+            if locator is not None:
+                data = await asyncio.to_thread(load_document, locator[1], locator[2])
+            if stats_locator is not None:
+                stats = await asyncio.to_thread(load_document, stats_locator[1], stats_locator[2])
+                if data is None:
+                    data = stats
+                elif isinstance(data, dict) and not data.get("full_data"):
+                    data = {**data, "full_data": stats}
+            if data is None:
+                return None
+            entry = Entry(codec.dumps_bytes(data))
+
+        filenames = {found[1] for found in (locator, stats_locator) if found is not None}
+        return self._remember(key, entry, filenames)
+
+    def listing(self, kind: str) -> Entry:
+        key = ("listing", kind)
+        entry = self.entries.get(key)
+        if entry is None:
+            ids = set(self.index[kind])
+            if kind == "players":
+                ids |= set(self.index["player_stats"])
+            entry = self._remember(key, Entry(codec.dumps_bytes(sorted(ids))), set())
+        return entry
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "files": len(self.files),
+            "teams": len({locator[1] for locator in self.index["teams"].values()}),
+            "players": len(set(self.index["players"]) | set(self.index["player_stats"])),
+            "matches": len(self.index["matches"]),
+            "cache": {"entries": len(self.entries), "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses}
+        }
+
+
+_REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+class ApiServer:
+    def __init__(self, cache: Optional[OutputCache] = None, refresh_interval: float = REFRESH_INTERVAL):
+        # cache is None when only live feeds are served
+        self.cache = cache
+        self.refresh_interval = refresh_interval
+        self.feeds: Dict[str, LiveFeed] = {}
+        self.server = None
+        self._refresher = None
+
+    async def route(self, method: str, path: str) -> Tuple[int, Optional[Entry]]:
+        if method not in ("GET", "HEAD"):
+            return 405, Entry(codec.dumps_bytes({"error": "only GET and HEAD are supported"}))
+
+        parts = [unquote(part) for part in path.strip("/").split("/") if part]
+        if parts == ["health"]:
+            feeds = {match_id: {"seq": feed.seq, "subscribers": len(feed.subscribers)} for match_id, feed in self.feeds.items()}
+            return 200, Entry(codec.dumps_bytes({"status": "ok", **(self.cache.stats() if self.cache else {}), "live": feeds}))
+        if self.cache is not None and len(parts) == 1 and parts[0] in KINDS:
+            return 200, self.cache.listing(parts[0])
+        if self.cache is not None and len(parts) == 2 and parts[0] in KINDS:
+            entry = await self.cache.get(parts[0], parts[1])
+            if entry is not None:
+                return 200, entry
+        return 404, Entry(codec.dumps_bytes({"error": f"nothing at {path}"}))
+
+    async def respond(self, method: str, target: str, headers: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        with metrics.span("serve.request"):
+            status, entry = await self.route(method, urlsplit(target).path)
+            response_headers = {"Content-Type": "application/json", "Vary": "Accept-Encoding"}
+            if status == 200:
+                response_headers["ETag"] = entry.etag
+                response_headers["Cache-Control"] = "no-cache"
+                if entry.etag in [tag.strip() for tag in headers.get("if-none-match", "").split(",")]:
+                    metrics.count("serve.not_modified")
+                    return 304, {"ETag": entry.etag}, b""
+
+            body = entry.body
+            if len(body) >= GZIP_MIN_SIZE and "gzip" in headers.get("accept-encoding", ""):
+                body = entry.gzip_body()
+                response_headers["Content-Encoding"] = "gzip"
+            response_headers["Content-Length"] = str(len(body))
+            return status, response_headers, b"" if method == "HEAD" else body
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                if headers.get("content-length"):
+                    await reader.readexactly(int(headers["content-length"]))
+
+                path = urlsplit(target).path
+                if method == "GET" and path.startswith("/live/"):
+                    feed = await self.live_feed(unquote(path[len("/live/"):].strip("/")))
+                    if feed is not None:
+                        # The stream holds the connection until the client or the server goes away
+                        await self.stream(feed, headers, writer)
+                        break
+
+                status, response_headers, body = await self.respond(method, target, headers)
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                response_headers["Connection"] = "keep-alive" if keep_alive else "close"
+                head = f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n" + "".join(f"{name}: {value}\r\n" for name, value in response_headers.items())
+                writer.write(head.encode("latin-1") + b"\r\n" + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def stream(self, feed: LiveFeed, headers: Dict[str, str], writer: asyncio.StreamWriter) -> None:
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\nConnection: close\r\n\r\nretry: 2000\n\n")
+        messages, queue = feed.subscribe(headers.get("last-event-id"))
+        try:
+            for message in messages:
+                writer.write(message)
+            await writer.drain()
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), HEARTBEAT)
+                except asyncio.TimeoutError:
+                    # Comment line, stops proxies closing an idle stream between overs
+                    message = b": keep-alive\n\n"
+                if message is None:
+                    break
+                writer.write(message)
+                await writer.drain()
+        finally:
+            feed.unsubscribe(queue)
+
+    async def publish(self, match_id: str, match_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Update (or start) the live feed of a match from a freshly loaded document. Returns the delta sent out."""
+        with metrics.span("live.diff"):
+            state = await asyncio.to_thread(live_state, match_data)
+            feed = self.feeds.get(match_id)
+            if feed is None:
+                feed = self.feeds[match_id] = LiveFeed(match_id)
+            return feed.update(state)
+
+    async def live_feed(self, match_id: str) -> Optional[LiveFeed]:
+        """The match's feed, started from its file the first time it is asked for"""
+        feed = self.feeds.get(match_id)
+        if feed is None and self.cache is not None:
+            locator = self.cache.index["matches"].get(match_id)
+            if locator is not None:
+                await self.publish(match_id, await asyncio.to_thread(load_document, locator[1], locator[2]))
+                feed = self.feeds[match_id]
+        return feed
+
+    async def refresh(self) -> List[str]:
+        """Re-index the cache and push deltas for live matches whose file changed"""
+        changed = await self.cache.refresh()
+        for match_id in list(self.feeds):
+            locator = self.cache.index["matches"].get(match_id)
+            if locator is not None and locator[1] in changed:
+                try:
+                    await self.publish(match_id, await asyncio.to_thread(load_document, locator[1], locator[2]))
+                except (OSError, ValueError, codec.JSONDecodeError) as e:
+                    print(f"\033[91mError: Could not update live match '{match_id}': {str(e)}\033[0m")
+        return changed
+
+    async def _refresh_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            changed = await self.refresh()
+            if changed:
+                print(f"Re-indexed {len(changed)} changed file(s)")
+
+    async def start(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> None:
+        if self.cache is not None:
+            await self.cache.refresh()
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        if self.refresh_interval and self.cache is not None:
+            self._refresher = asyncio.create_task(self._refresh_forever())
+
+    @property
+    def port(self) -> int:
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        if self._refresher:
+            self._refresher.cancel()
+        for feed in self.feeds.values():
+            feed.close()
+        self.server.close()
+        await self.server.wait_closed()
+
+
+async def poll_match(api: ApiServer, fetch, source: str, interval: float) -> None:
+    """
+    Call fetch() (an async function returning a match document, or None when there's nothing new)
+    every interval seconds and publish each result to the match's live feed. Runs until cancelled.
+    """
+    while True:
+        try:
+            with metrics.span("live.poll"):
+                match_data = await fetch()
+            if match_data:
+                delta = await api.publish(get_match_id(match_data, source), match_data)
+                if delta:
+                    print(f"Live update {delta['seq']}: {len(delta.get('balls', []))} new ball(s)")
+        except Exception as e:
+            # A failed poll shouldn't end the feed, the next one will probably work
+            print(f"\033[91mError: Could not poll '{source}': {str(e)}\033[0m")
+        await asyncio.sleep(interval)
@@ -0,0 +1,294 @@
+import bisect
+import gzip
+import os
+import time
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from src import codec
+
+'''
+Archive of every poll of a live match: the first poll in full, then only what changed (--archive, --replay).
+
+The archive is NDJSON where each line is its own gzip member, so `zcat match.snapshots.gz` shows it
+and a reader can start decompressing at any line:
+
+    {"t": 1732958400.12, "snapshot": {...whole match document...}}
+    {"t": 1732958415.30, "patch": [["s", ["comms"], 0, 0, [{...new over...}]], ["r", ["live", "status"], "..."]]}
+
+Patch operations, applied in order (path is a list of keys and list indexes, [] is the whole document):
+    ["r", path, value]                          set / replace
+    ["d", path]                                 delete a key
+    ["s", path, start, delete_count, items]     splice the list at path
+
+A full snapshot (keyframe) is written again every KEYFRAME_EVERY polls, and <archive>.idx lists the time
+and byte offset of each one, so getting the document at a time only has to replay the patches since the
+keyframe before it. Polls where nothing changed aren't stored.
+'''
+
+KEYFRAME_EVERY = 50
+
+
+def diff(old: Any, new: Any, path: Tuple = ()) -> List[list]:
+    """Patch operations that turn old into new"""
+    if old == new:
+        return []
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = [["d", [*path, key]] for key in old if key not in new]
+        for key, value in new.items():
+            if key in old:
+                ops += diff(old[key], value, (*path, key))
+            else:
+                ops.append(["r", [*path, key], value])
+        return ops
+    if isinstance(old, list) and isinstance(new, list):
+        return _diff_list(old, new, path)
+    return [["r", list(path), new]]
+
+
+def _diff_list(old: list, new: list, path: Tuple) -> List[list]:
+    # Skip the unchanged start and end, then only the middle has to be described
+    shortest = min(len(old), len(new))
+    prefix = 0
+    while prefix < shortest and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < shortest - prefix and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+    old_middle = old[prefix:len(old) - suffix]
+    new_middle = new[prefix:len(new) - suffix]
+    extra = len(new_middle) - len(old_middle)
+
+    def pairs(offset_old, offset_new, count, at):
+        ops = []
+        for i in range(count):
+            ops += diff(old_middle[offset_old + i], new_middle[offset_new + i], (*path, at + i))
+        return ops
+
+    if extra == 0:
+        # A list kept at a fixed length (only the latest comms) slides: k new items at one end push k old
+        # ones off the other, which would otherwise show up as every item in between having changed
+        in_place = pairs(0, 0, len(old_middle), prefix)
+        shift = _shift(old_middle, new_middle)
+        if shift > 0:
+            shifted = [["s", list(path), prefix, 0, new_middle[:shift]], ["s", list(path), prefix + len(old_middle), shift, []]]
+        elif shift < 0:
+            shifted = [["s", list(path), prefix, -shift, []], ["s", list(path), prefix + len(old_middle) + shift, 0, new_middle[shift:]]]
+        else:
+            return in_place
+        return min(shifted, in_place, key=lambda ops: len(codec.dumps_bytes(ops)))
+
+    # Items were added or removed somewhere in the middle. Try them at its start (new overs go at
+    # the front of comms) and at its end (new wickets go at the back of fow), keep the smaller patch.
+    if extra > 0:
+        at_start = [["s", list(path), prefix, 0, new_middle[:extra]]] + pairs(0, extra, len(old_middle), prefix + extra)
+        at_end = pairs(0, 0, len(old_middle), prefix) + [["s", list(path), prefix + len(old_middle), 0, new_middle[len(old_middle):]]]
+    else:
+        at_start = [["s", list(path), prefix, -extra, []]] + pairs(-extra, 0, len(new_middle), prefix)
+        at_end = pairs(0, 0, len(new_middle), prefix) + [["s", list(path), prefix + len(new_middle), -extra, []]]
+    return min(at_start, at_end, key=lambda ops: len(codec.dumps_bytes(ops)))
+
+
+def _shift(old: list, new: list) -> int:
+    """
+    k > 0 when new is old with k items added at the front and its last k dropped, -k when they were
+    added at the back and dropped from the front, 0 when it's neither. The smallest k is taken.
+    """
+    if len(old) < 2:
+        return 0
+    # The item that was first in old can only be at k in new, so only those positions are tried
+    for k in range(1, len(new)):
+        if new[k] == old[0] and new[k:] == old[:-k]:
+            return k
+        if old[k] == new[0] and old[k:] == new[:-k]:
+            return -k
+    return 0
+
+
+def _apply(node: Any, path: list, op: list) -> Any:
+    if not path:
+        if op[0] == "r":
+            return op[2]
+        start, count, items = op[2:]
+        return node[:start] + items + node[start + count:]
+
+    # Copy only the containers along the path, the rest is shared with the previous document
+    copy = node.copy()
+    key = path[0]
+    if len(path) == 1 and op[0] == "d":
+        del copy[key]
+    elif len(path) == 1 and op[0] == "r":
+        copy[key] = op[2]
+    else:
+        copy[key] = _apply(node[key], path[1:], op)
+    return copy
+
+
+def apply_patch(document: Any, ops: List[list]) -> Any:
+    """
+    The document with the patch applied. document itself isn't changed but the result shares every
+    part the patch didn't touch with it, so neither should be modified afterwards.
+    """
+    for op in ops:
+        document = _apply(document, op[1], op)
+    return document
+
+
+def _read_index(filename: str) -> List[Tuple[float, int]]:
+    index = []
+    if os.path.exists(f"{filename}.idx"):
+        with open(f"{filename}.idx", "rb") as f:
+            for line in f:
+                # A line cut off by a crash (no newline yet) belongs to a keyframe that was never written
+                if line.strip() and line.endswith(b"\n"):
+                    entry = codec.loads(line)
+                    index.append((entry["t"], entry["offset"]))
+    return index
+
+
+def _complete_length(filename: str, offset: int = 0) -> int:
+    """Where the last complete gzip member ends, reading the members from offset (the start of one)"""
+    end = position = offset
+    decompressor = zlib.decompressobj(wbits=31)
+    with open(filename, "rb") as f:
+        f.seek(offset)
+        while chunk := f.read(1 << 16):
+            while chunk:
+                try:
+                    decompressor.decompress(chunk)
+                except zlib.error:
+                    return end
+                if not decompressor.eof:
+                    position += len(chunk)
+                    break
+                # The member ended inside this chunk, what's left of it starts the next one
+                position += len(chunk) - len(decompressor.unused_data)
+                end = position
+                chunk = decompressor.unused_data
+                decompressor = zlib.decompressobj(wbits=31)
+    return end
+
+
+def _records(filename: str, offset: int = 0) -> Iterator[Dict[str, Any]]:
+    with open(filename, "rb") as f:
+        f.seek(offset)
+        # GzipFile carries on through every member after the one at offset
+        with gzip.GzipFile(fileobj=f, mode="rb") as lines:
+            for line in lines:
+                if line.strip():
+                    yield codec.loads(line)
+
+
+def iter_snapshots(filename: str, start: Optional[float] = None, end: Optional[float] = None) -> Iterator[Tuple[float, Dict[str, Any]]]:
+    """(time, document) for every poll in the archive between start and end (epoch seconds)"""
+    offset = 0
+    if start is not None:
+        index = _read_index(filename)
+        position = bisect.bisect_right([t for t, _ in index], start) - 1
+        if position >= 0:
+            offset = index[position][1]
+
+    document = None
+    for record in _records(filename, offset):
+        if "snapshot" in record:
+            document = record["snapshot"]
+        elif document is None:
+            raise ValueError(f"'{filename}' has a patch before any snapshot")
+        else:
+            document = apply_patch(document, record["patch"])
+        if end is not None and record["t"] > end:
+            return
+        if start is None or record["t"] >= start:
+            yield record["t"], document
+
+
+def snapshot_at(filename: str, timestamp: float) -> Optional[Tuple[float, Dict[str, Any]]]:
+    """The last poll at or before timestamp, None if the archive starts after it"""
+    offset = 0
+    index = _read_index(filename)
+    position = bisect.bisect_right([t for t, _ in index], timestamp) - 1
+    if position >= 0:
+        offset = index[position][1]
+
+    found = None
+    document = None
+    for record in _records(filename, offset):
+        if record["t"] > timestamp:
+            break
+        document = record["snapshot"] if "snapshot" in record else apply_patch(document, record["patch"])
+        found = (record["t"], document)
+    return found
+
+
+class ArchiveWriter:
+    """
+    Append polls of one match to an archive. An existing archive is carried on from its last poll.
+
+        with ArchiveWriter("1462642.snapshots.gz") as archive:
+            archive.append(match_data)
+    """
+    def __init__(self, filename: str, keyframe_every: int = KEYFRAME_EVERY):
+        self.filename = filename
+        self.keyframe_every = keyframe_every
+        self.last = None
+        self.since_keyframe = 0
+        if os.path.exists(filename) and os.path.getsize(filename):
+            index = self._recover()
+            # Only the polls since the last keyframe have to be read to get back to where it was
+            for _, document in iter_snapshots(filename, start=index[-1][0] if index else None):
+                self.last = document
+                self.since_keyframe += 1
+        self._file = open(filename, "ab")
+        self._index = open(f"{filename}.idx", "ab")
+
+    def _recover(self) -> List[Tuple[float, int]]:
+        """
+        Cut off a poll that was only half written when the last run was killed, so the next one isn't
+        appended after it (where no reader could get to it), and drop index entries past the end.
+        """
+        size = os.path.getsize(self.filename)
+        index = _read_index(self.filename)
+        keyframes = [offset for _, offset in index if offset < size]
+        end = _complete_length(self.filename, keyframes[-1] if keyframes else 0)
+        if end < size:
+            print(f"\033[91mError: '{self.filename}' ends in a half written poll, cutting it off.\033[0m")
+            os.truncate(self.filename, end)
+        index = [(t, offset) for t, offset in index if offset < end]
+        lines = b"".join(codec.dumps_bytes({"t": t, "offset": offset}) + b"\n" for t, offset in index)
+        index_file = f"{self.filename}.idx"
+        written = b""
+        if os.path.exists(index_file):
+            with open(index_file, "rb") as f:
+                written = f.read()
+        if written != lines:
+            with open(index_file, "wb") as f:
+                f.write(lines)
+        return index
+
+    def append(self, document: Dict[str, Any], timestamp: Optional[float] = None) -> bool:
+        """Store a poll, returns False if nothing changed since the last one (and nothing was written)"""
+        timestamp = round(time.time() if timestamp is None else timestamp, 3)
+        if self.last is None or self.since_keyframe >= self.keyframe_every:
+            record = {"t": timestamp, "snapshot": document}
+            self._index.write(codec.dumps_bytes({"t": timestamp, "offset": self._file.tell()}) + b"\n")
+            self._index.flush()
+            self.since_keyframe = 0
+        else:
+            ops = diff(self.last, document)
+            if not ops:
+                return False
+            record = {"t": timestamp, "patch": ops}
+        self._file.write(gzip.compress(codec.dumps_bytes(record) + b"\n", compresslevel=6))
+        self._file.flush()
+        self.last = document
+        self.since_keyframe += 1
+        return True
+
+    def close(self) -> None:
+        self._file.close()
+        self._index.close()
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,419 @@
+import argparse
+import copy
+import gzip
+import os
+import random
+import struct
+import zlib
+from typing import Any, Dict, Iterator
+from src import codec
+
+'''
+Deterministic, seeded generator of synthetic ESPN Cricinfo data for scale testing without a network.
+
+    generate_match()       a match JSON document shaped like example_data/example_match_data.json
+                           (everything the example has, including the big unused parts) of any length
+    player_stats_html()    a stats engine player page with as many engineTable rows as asked for
+    roster_payload()       one page of the filterFormatLevel=ALL XHR a team page makes
+    player_image()         a small PNG standing in for a player picture
+
+The same seed always gives the same output. Run as a module to write an archive of matches:
+
+    python -m src.synthetic --matches 1000 --format odi --seed 1 --output odi_archive.ndjson.gz
+'''
+
+EXAMPLE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "example_data", "example_match_data.json")
+
+FORMATS = {
+    # overs per innings, innings per match, international_class_name
+    "t20": (20, 2, "Twenty20"),
+    "odi": (50, 2, "ODI"),
+    "test": (90, 4, "Test"),
+}
+
+# (event, runs off the bat, extras, weight)
+BALL_OUTCOMES = [
+    ("no run", 0, 0, 36),
+    ("1 run", 1, 0, 33),
+    ("2 runs", 2, 0, 8),
+    ("3 runs", 3, 0, 1),
+    ("FOUR", 4, 0, 11),
+    ("SIX", 6, 0, 3),
+    ("OUT", 0, 0, 3),
+    ("1 wide", 0, 1, 2),
+    ("1 no ball", 0, 1, 1),
+    ("1 leg bye", 0, 1, 1),
+]
+_EVENTS = [outcome[:3] for outcome in BALL_OUTCOMES]
+_WEIGHTS = [outcome[3] for outcome in BALL_OUTCOMES]
+
+_SYLLABLES = ["ka", "ra", "mi", "lo", "shan", "de", "vi", "ton", "ba", "ne", "sh", "ar", "jo", "kir", "ma", "pa", "tel", "su", "an", "ri"]
+_DISMISSALS = ["c {fielder} b {bowler}", "b {bowler}", "lbw b {bowler}", "run out ({fielder})", "st {fielder} b {bowler}"]
+
+_template = None
+
+
+def _load_template() -> Dict[str, Any]:
+    global _template
+    if _template is None:
+        _template = codec.load(EXAMPLE_FILE)
+    return _template
+
+
+def _name(rng: random.Random) -> str:
+    first = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+    last = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+    return f"{first} {last}"
+
+
+def _overs(balls: int) -> str:
+    return f"{balls // 6}.{balls % 6}"
+
+
+def _team(rng: random.Random, template_team: Dict[str, Any], team_id: int, name: str, first_player_id: int) -> Dict[str, Any]:
+    team = copy.deepcopy(template_team)
+    template_player = template_team["player"][0]
+    team.update({
+        "team_id": str(team_id),
+        "content_id": team_id,
+        "object_id": team_id * 10,
+        "team_name": name,
+        "team_short_name": name,
+        "team_general_name": name,
+        "team_abbreviation": name[:3].upper(),
+        "player": []
+    })
+    used = set()
+    for i in range(11):
+        known_as = _name(rng)
+        while known_as.split()[-1] in used:
+            known_as = _name(rng)
+        used.add(known_as.split()[-1])
+        player = copy.deepcopy(template_player)
+        player.update({
+            "player_id": str(first_player_id + i),
+            "object_id": (first_player_id + i) * 10,
+            "known_as": known_as,
+            "card_long": known_as,
+            "card_short": known_as,
+            "mobile_name": known_as,
+            "alpha_name": known_as.upper().replace(" ", "_"),
+            "captain": int(i == 0),
+            "keeper": int(i == 5),
+            "player_primary_role": ["batter", "batter", "batter", "allrounder", "allrounder", "wicketkeeper batter",
+                                    "allrounder", "bowler", "bowler", "bowler", "bowler"][i],
+        })
+        team["player"].append(player)
+    return team
+
+
+def _play_innings(rng, innings_number, batting, bowling, over_limit, target):
+    """Simulate one innings ball by ball. Returns the innings summary, its comms overs (newest first) and per player figures."""
+    batters = batting["player"]
+    bowlers = bowling["player"][6:]
+    surname = lambda player: player["known_as"].split()[-1]
+
+    batter_stats = {p["player_id"]: {"runs": 0, "balls": 0, "fours": 0, "sixes": 0, "out": False} for p in batters}
+    bowler_stats = {p["player_id"]: {"balls": 0, "conceded": 0, "wickets": 0, "maidens": 0} for p in bowlers}
+    striker, non_striker, next_batter = 0, 1, 2
+    runs = wickets = legal_balls = extras = 0
+    fow = []
+    partnership_start = (0, 0)
+    overs = []
+
+    for over_index in range(over_limit):
+        bowler = bowlers[over_index % len(bowlers) if over_index % 2 == 0 else (over_index + 2) % len(bowlers)]
+        over_balls = []
+        legal_in_over = 0
+        runs_in_over = 0
+        while legal_in_over < 6:
+            event, bat_runs, extra_runs = rng.choices(_EVENTS, _WEIGHTS)[0]
+            legal = event not in ("1 wide", "1 no ball")
+            if legal:
+                legal_in_over += 1
+                legal_balls += 1
+            # ESPN numbers a wide / no ball with the ball still to come, e.g. a wide first up is X.1 like the legal ball after it
+            ball_number = legal_in_over if legal else legal_in_over + 1
+            over_actual = f"{over_index}.{ball_number}"
+
+            striker_player = batters[striker]
+            stats = batter_stats[striker_player["player_id"]]
+            if event != "1 wide":
+                stats["balls"] += 1
+            stats["runs"] += bat_runs
+            stats["fours"] += bat_runs == 4
+            stats["sixes"] += bat_runs == 6
+            runs += bat_runs + extra_runs
+            extras += extra_runs
+            runs_in_over += bat_runs + extra_runs
+            bowler_stats[bowler["player_id"]]["balls"] += legal
+            bowler_stats[bowler["player_id"]]["conceded"] += bat_runs + (extra_runs if event != "1 leg bye" else 0)
+
+            dismissal = ""
+            if event == "OUT":
+                wickets += 1
+                stats["out"] = True
+                fielder = surname(rng.choice(bowling["player"]))
+                dismissal = rng.choice(_DISMISSALS).format(fielder=fielder, bowler=surname(bowler))
+                if not dismissal.startswith("run out"):
+                    bowler_stats[bowler["player_id"]]["wickets"] += 1
+                fow.append({
+                    "fow_order": wickets, "fow_overs": _overs(legal_balls), "fow_runs": runs, "fow_wickets": wickets,
+                    "innings_number": innings_number, "live_current": 0, "live_current_name": None,
+                    "opposition_id": int(bowling["team_id"]), "out_player": {
+                        "player_id": striker_player["player_id"], "runs": stats["runs"], "balls_faced": stats["balls"],
+                        "dismissal_string": dismissal
+                    },
+                    "partnership_overs": _overs(legal_balls - partnership_start[1]), "partnership_rate": 0,
+                    "partnership_runs": runs - partnership_start[0], "partnership_wicket": wickets,
+                    "partnership_wicket_name": f"{wickets}", "player": [], "player_id": striker_player["player_id"],
+                    "team_id": int(batting["team_id"])
+                })
+                partnership_start = (runs, legal_balls)
+
+            over_balls.append({
+                "comms_id": "", "dismissal": dismissal, "event": event, "innings_number": str(innings_number),
+                "is_tweet": "", "over_number": str(over_index + 1), "overs_actual": over_actual,
+                "overs_unique": f"{over_index}.{ball_number:02d}",
+                "players": f"{surname(bowler)} to {surname(striker_player)}",
+                "speed_kph": str(rng.randint(115, 150)) if rng.random() < 0.5 else "",
+                "speed_mph": "", "text": ""
+            })
+
+            if event == "OUT":
+                if wickets == 10:
+                    break
+                striker = next_batter
+                next_batter += 1
+            elif (bat_runs + (extra_runs if event == "1 leg bye" else 0)) % 2 == 1:
+                striker, non_striker = non_striker, striker
+
+            if target and runs >= target:
+                break
+
+        bowler_stats[bowler["player_id"]]["maidens"] += runs_in_over == 0 and legal_in_over == 6
+        over_balls.reverse()
+        overs.append({"ball": over_balls, "innings_number": innings_number, "over_number": over_index + 1})
+        striker, non_striker = non_striker, striker
+        if wickets == 10 or (target and runs >= target):
+            break
+
+    overs.reverse()
+    summary = {
+        "runs": runs, "wickets": wickets, "balls": legal_balls, "extras": extras, "fow": fow,
+        "current": (batters[non_striker]["player_id"], batters[striker]["player_id"]) if wickets < 10 else (),
+        "last_bowler": bowler["player_id"],
+        "recent": overs[:1]
+    }
+    return summary, overs, batter_stats, bowler_stats
+
+
+def generate_match(seed: int = 0, format: str = "t20") -> Dict[str, Any]:
+    """A complete, schema-faithful match document. Same seed and format -> same document."""
+    if format not in FORMATS:
+        raise ValueError(f"Unknown format '{format}'. Valid options: {', '.join(FORMATS)}")
+    over_limit, innings_count, class_name = FORMATS[format]
+    rng = random.Random(f"{seed}-{format}")
+    template = _load_template()
+
+    data = {key: copy.deepcopy(value) for key, value in template.items() if key not in ("comms", "innings", "live", "team", "match", "description")}
+    team_ids = (10000 + seed * 2, 10001 + seed * 2)
+    names = [f"{_name(rng).split()[0]} XI" for _ in range(2)]
+    teams = [
+        _team(rng, template["team"][0], team_ids[0], names[0], 1000000 + seed * 100),
+        _team(rng, template["team"][1], team_ids[1], names[1], 1000000 + seed * 100 + 50),
+    ]
+
+    year = 2000 + seed % 26
+    month = seed % 12 + 1
+    day = seed % 28 + 1
+    match = copy.deepcopy(template["match"])
+    match.update({
+        "cms_match_title": f"Synthetic Match {seed}",
+        "team1_id": type(template["match"]["team1_id"])(team_ids[0]), "team1_name": names[0],
+        "team2_id": type(template["match"]["team2_id"])(team_ids[1]), "team2_name": names[1],
+        "international_class_name": class_name,
+        "start_date_raw": f"{year}-{month:02d}-{day:02d}",
+        "date": f"{year}-{month:02d}-{day:02d}",
+        "season": str(year),
+        "match_path": f"/db/ARCHIVE/SYNTHETIC/{format.upper()}/MATCH_{seed}",
+    })
+
+    comms = []
+    innings_list = []
+    batting_figures = {}
+    bowling_figures = {}
+    target = 0
+    summary = None
+    for number in range(1, innings_count + 1):
+        batting, bowling = (teams[0], teams[1]) if number % 2 else (teams[1], teams[0])
+        chasing = number == innings_count
+        summary, overs, batter_stats, bowler_stats = _play_innings(rng, number, batting, bowling, over_limit, target if chasing else 0)
+        comms = overs + comms
+        batting_figures.update(batter_stats)
+        bowling_figures.update(bowler_stats)
+        innings_list.append({
+            "ball_limit": over_limit * 6, "balls": summary["balls"], "batted": 1,
+            "batting_team_id": int(batting["team_id"]), "bowling_team_id": int(bowling["team_id"]), "bpo": 6,
+            "extras": summary["extras"], "event_name": "all out" if summary["wickets"] == 10 else "complete",
+            "innings_number": str(number), "live_current": int(number == innings_count), "live_current_name": None,
+            "over_limit": f"{over_limit}.0", "overs": _overs(summary["balls"]),
+            "run_rate": round(summary["runs"] * 6 / summary["balls"], 2) if summary["balls"] else 0,
+            "runs": summary["runs"], "target": target if chasing else 0, "wickets": summary["wickets"],
+        })
+        if number == innings_count - 1:
+            first_team_total = sum(i["runs"] for i in innings_list if i["batting_team_id"] == int(teams[0]["team_id"]))
+            second_team_total = sum(i["runs"] for i in innings_list if i["batting_team_id"] == int(teams[1]["team_id"]))
+            # Tests: the team batting last chases whatever lead the other side has (at least a run)
+            target = max(first_team_total - second_team_total, 0) + 1 if innings_count == 4 else summary["runs"] + 1
+
+    last = innings_list[-1]
+    live_batting = []
+    for position, player_id in zip(["non-striker", "striker"], summary["current"]):
+        stats = batting_figures[player_id]
+        live_batting.append({
+            "balls_faced": str(stats["balls"]), "batting_position": 0, "fours": str(stats["fours"]),
+            "innings_number": innings_count, "live_current": 1, "live_current_name": position, "minutes": "",
+            "player_id": player_id, "runs": stats["runs"], "sixes": str(stats["sixes"]),
+            "strike_rate": f"{stats['runs'] * 100 / stats['balls']:.2f}" if stats["balls"] else "0.00",
+            "team_id": last["batting_team_id"]
+        })
+    live_bowling = []
+    for player_id, stats in bowling_figures.items():
+        if player_id == summary["last_bowler"]:
+            live_bowling.append({
+                "conceded": stats["conceded"], "economy_rate": f"{stats['conceded'] * 6 / stats['balls']:.2f}" if stats["balls"] else "0.00",
+                "innings_number": innings_count, "live_current": 1, "live_current_name": "current bowler",
+                "maidens": stats["maidens"], "noballs": 0, "overs": _overs(stats["balls"]), "player_id": player_id,
+                "team_id": last["bowling_team_id"], "wickets": stats["wickets"], "wides": 0
+            })
+
+    chasing_team = names[0] if last["batting_team_id"] == int(teams[0]["team_id"]) else names[1]
+    defending_team = names[1] if chasing_team == names[0] else names[0]
+    if last["target"] and last["runs"] >= last["target"]:
+        status = f"{chasing_team} won by {10 - last['wickets']} wickets"
+    else:
+        status = f"{defending_team} won by {max(last['target'] - 1 - last['runs'], 0)} runs"
+
+    data.update({
+        "description": f"Synthetic Series, Match {seed}: {names[0]} v {names[1]} at Nowhere, {match['date']}",
+        "match": match,
+        "team": teams,
+        "innings": innings_list,
+        "comms": comms,
+        "live": {
+            "batting": live_batting,
+            "bowling": live_bowling,
+            "break": "",
+            "field_restrict": [],
+            "fow": summary["fow"],
+            "innings": {**last, "live_current": 1, "live_current_name": "current innings", "required_run_rate": None, "team_id": last["batting_team_id"]},
+            "innings_recent": [],
+            "recent_overs": [[{"ball": ball["event"], "ball_number": i + 1, "extras": "", "over_number": ball["over_number"]}
+                              for i, ball in enumerate(reversed(over["ball"]))] for over in summary["recent"]],
+            "review": [],
+            "status": status
+        }
+    })
+    return data
+
+
+def generate_matches(count: int, format: str = "t20", seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """count matches, one at a time (seeds seed, seed + 1, ...)"""
+    for i in range(count):
+        yield generate_match(seed + i, format)
+
+
+def write_archive(filename: str, count: int, format: str = "t20", seed: int = 0) -> None:
+    """
+    Write count matches to filename. .ndjson gives one match per line, anything else a JSON array.
+    A .gz extension gzip compresses the file.
+    """
+    opener = gzip.open if filename.endswith(".gz") else open
+    ndjson = ".ndjson" in filename
+    with opener(filename, "wb") as f:
+        if not ndjson:
+            f.write(b"[")
+        for i, match in enumerate(generate_matches(count, format, seed)):
+            if i and not ndjson:
+                f.write(b",")
+            f.write(codec.dumps_bytes(match))
+            if ndjson:
+                f.write(b"\n")
+        if not ndjson:
+            f.write(b"]")
+
+
+def player_stats_html(rows: int = 200, seed: int = 0, player_id: int = 1090625) -> str:
+    """A stats engine player page (https://stats.espncricinfo.com/ci/engine/player/<id>.html) with one big engineTable"""
+    rng = random.Random(f"stats-{seed}")
+    name = _name(rng)
+    table_rows = []
+    for i in range(rows):
+        matches = rng.randint(1, 60)
+        cells = [
+            f"v {_name(rng).split()[0]}", f"{2000 + rng.randint(0, 15)}-{2016 + rng.randint(0, 9)}", str(matches),
+            str(rng.randint(0, matches * 40)), f"{rng.randint(0, 150)}{rng.choice(['', '*'])}", f"{rng.uniform(5, 60):.2f}",
+            str(rng.randint(0, 5)), str(rng.randint(0, matches * 2)), f"{rng.randint(0, 6)}/{rng.randint(5, 60)}",
+            f"{rng.uniform(15, 50):.2f}", str(rng.randint(0, 3)), str(rng.randint(0, matches)), "0", f"{rng.uniform(-20, 20):.2f}"
+        ]
+        table_rows.append(f'<tr class="data{i % 2 + 1}">' + "".join(f"<td>{cell}</td>" for cell in cells) + "</tr>")
+    return (
+        f'<html><head><title>{name} - Statsguru</title></head><body>'
+        f'<div><a href="/ci/engine/player/{player_id}.html">Statsguru / Players / {name}</a></div>'
+        '<table class="engineTable"><tr class="head"><th>Grouping</th><th>Span</th><th>Mat</th></tr>'
+        + "".join(table_rows) + "</table></body></html>"
+    )
+
+
+def roster_payload(total: int = 50, page: int = 1, page_size: int = 20, seed: int = 0) -> Dict[str, Any]:
+    """One page of the team page XHR (filterFormatLevel=ALL): {"total": ..., "results": [...]}"""
+    results = []
+    for object_id in range(1000000 + seed * 1000 + (page - 1) * page_size, 1000000 + seed * 1000 + min(page * page_size, total)):
+        rng = random.Random(f"roster-{seed}-{object_id}")
+        name = _name(rng)
+        slug = name.lower().replace(" ", "-")
+        folder = object_id // 100 * 100
+        results.append({
+            "id": object_id - 900000,
+            "objectId": object_id,
+            "name": name,
+            "longName": name,
+            "slug": slug,
+            "imageUrl": f"/lsci/db/PICTURES/CMS/{folder}/{object_id}.png" if rng.random() < 0.8 else None,
+            "headshotImageUrl": f"/lsci/db/PICTURES/CMS/{folder}/{object_id}.1.png" if rng.random() < 0.6 else None,
+            "gender": "M",
+            "playingRoles": [rng.choice(["batter", "bowler", "allrounder", "wicketkeeper batter"])],
+        })
+    return {"total": total, "results": results}
+
+
+def player_image(seed: int = 0, size: int = 64) -> bytes:
+    """A size x size RGB PNG (two coloured halves), the same seed always gives the same bytes"""
+    rng = random.Random(f"image-{seed}")
+    top = bytes(rng.randrange(256) for _ in range(3))
+    bottom = bytes(rng.randrange(256) for _ in range(3))
+    # Every row starts with filter type 0
+    rows = b"".join(b"\x00" + (top if y < size // 2 else bottom) * size for y in range(size))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(rows, 9)) + chunk(b"IEND", b""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write an archive of synthetic match documents.")
+    parser.add_argument("--matches", type=int, default=100, help="Number of matches to generate.")
+    parser.add_argument("--format", type=str, default="t20", choices=list(FORMATS), help="Match length.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first match.")
+    parser.add_argument("--output", type=str, default="synthetic_matches.ndjson", help="Output file (.ndjson for one match per line, otherwise a JSON array, add .gz to compress).")
+    args = parser.parse_args()
+
+    write_archive(args.output, args.matches, args.format, args.seed)
+    print(f"Wrote {args.matches} {args.format} matches to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
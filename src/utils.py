@@ -1,8 +1,68 @@
+import asyncio
 import time
-import json
-from playwright.async_api import async_playwright
+from src import codec
+from src import metrics
+from src.compression import COMPRESSED_EXTENSIONS, write_bytes
 import re
 
+# The last one serves the player pictures (--images)
+ESPN_HOSTS = ("https://www.espncricinfo.com", "https://stats.espncricinfo.com", "https://img1.hscicdn.com")
+
+# Set by capture_pages() (--page_store), every fetched page is kept in it
+_page_store = None
+
+def capture_pages(directory: str = None) -> None:
+    """Keep every page fetched from now on in a src.page_store.PageStore at directory (None stops)"""
+    global _page_store
+    if directory is None:
+        _page_store = None
+        return
+    from src.page_store import PageStore
+    _page_store = PageStore(directory)
+
+def page_store():
+    return _page_store
+
+# Set by use_browser_state() (--browser_state), new browser contexts start from its saved cookies
+_browser_state = None
+
+def use_browser_state(filename: str = None) -> None:
+    """Reuse (and keep up to date) the cookies and consent probes saved in filename, see src/browser_state.py (None stops)"""
+    global _browser_state
+    if filename is None:
+        _browser_state = None
+        return
+    from src.browser_state import BrowserState
+    _browser_state = BrowserState(filename)
+
+def browser_state():
+    return _browser_state
+
+def browser_context_options() -> dict:
+    # Keyword arguments for browser.new_context()
+    return _browser_state.context_options() if _browser_state is not None else {}
+
+async def dismiss_modal(page, selector: str, metric: str, timeout: int = 2000) -> None:
+    """
+    Click selector if it shows up within timeout ms, recorded under the <metric>.consent_wait span.
+    With a browser state the wait is skipped when an earlier probe already dealt with it for this host.
+    """
+    url = page.url
+    if _browser_state is not None and not _browser_state.needs_probe(url, selector):
+        _browser_state.skip(url, selector)
+        return
+    start = time.perf_counter()
+    clicked = False
+    with metrics.span(f"{metric}.consent_wait"):
+        try:
+            await page.wait_for_selector(selector, timeout=timeout)
+            await page.click(selector)
+            clicked = True
+        except Exception:
+            metrics.count(f"{metric}.consent_timeouts")
+    if _browser_state is not None:
+        await _browser_state.record(page.context, url, selector, time.perf_counter() - start, clicked)
+
 def verify_link(url: str, type: str) -> bool:
     #dissected_url has array structure like ['https:', '', 'www.espncricinfo.com', 'team', 'united-arab-emirates-27']
 
@@ -18,6 +78,15 @@ def verify_link(url: str, type: str) -> bool:
         case _:
             return False
 
+def rebase_url(url: str, base_url: str = None) -> str:
+    # Swap the ESPN host for base_url (e.g. the local mock server, see src/mock_server.py) keeping the path and query
+    if not base_url:
+        return url
+    for host in ESPN_HOSTS:
+        if url.startswith(host):
+            return base_url.rstrip("/") + url[len(host):]
+    return url
+
 def process_player(player: dict) -> dict:
             slug = player.get("slug")
             id = player.get("objectId")
@@ -26,54 +95,138 @@ def process_player(player: dict) -> dict:
 
 
 
+# Set by main.py from --output (e.g. --output nepal.json.gz), added to every output file name
+_output_compression = ""
+
+def set_output_compression(extension: str) -> None:
+    """"", ".gz" or ".zst" """
+    global _output_compression
+    _output_compression = extension
+
+def output_filename(filename: str, filetype: str) -> str:
+    # "nepal", "json" -> nepal.json (nepal.json.gz when compressing), names that already end in .json.gz etc. are kept
+    if filename.endswith(tuple(f".{filetype}{extension}" for extension in COMPRESSED_EXTENSIONS)):
+        return filename
+    return f"{filename}.{filetype}{_output_compression}"
+
 def write_to_file(data, filetype: str, filename: str = "output") -> bool:
 
     if filetype == "json":
         try:
-            with open(f"{filename}.json", 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-                return True
+            with metrics.span("write_to_file.json"):
+                codec.dump(data, output_filename(filename, "json"), pretty=True)
+            return True
         except Exception as e:
             print(f"Error writing JSON to {filename}: {e}")
             return False
 
     if filetype == "html":
         try:
-            with open(f"{filename}.html", 'w', encoding='utf-8') as f:
-                f.write(data)
+            with metrics.span("write_to_file.html"):
+                write_bytes(output_filename(filename, "html"), data.encode("utf-8"))
                 return True
         except Exception as e:
             print(f"Error writing HTML to {filename}: {e}")
             return False
     return False
 
-async def fetch_page(url: str) -> str:
+async def fetch_page(url: str, base_url: str = None) -> str:
+    url = rebase_url(url, base_url)
+    # Imported here, playwright is slow to import and most commands never open a browser
+    from playwright.async_api import async_playwright
     async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False)
-        context = await browser.new_context()
-        page = await context.new_page()
-        await page.goto(url)
+        with metrics.span("fetch_page.browser_launch"):
+            # No bot detection on a base_url (mock server) so it can run without a display e.g. in CI
+            browser = await p.chromium.launch(headless=bool(base_url))
+            context = await browser.new_context(**browser_context_options())
+            page = await context.new_page()
+        with metrics.span("fetch_page.navigation"):
+            await page.goto(url)
 
         #To bypass consent modals.
         #If one appears that hasnt been accounted for
         #please start an issue on: https://github.com/pxy05/sport-scraper/issues
 
-        try:
-            await page.wait_for_selector('button:has-text("Consent")', timeout=2000)
-            await page.click('button:has-text("Consent")')
-        except Exception:
-            pass
+        await dismiss_modal(page, 'button:has-text("Consent")', "fetch_page")
 
 
 
         scrolls = 3
-        for _ in range(scrolls):
-            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            time.sleep(0.5)
+        with metrics.span("fetch_page.scroll"):
+            for _ in range(scrolls):
+                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                time.sleep(0.5)
 
         html_content = await page.content()
 
-        await browser.close()
+        with metrics.span("fetch_page.browser_close"):
+            await browser.close()
+        metrics.count("fetch_page.pages")
+        if _page_store is not None:
+            _page_store.put(html_content, url)
         
         return html_content
 
+
+
+class BrowserSession:
+    """
+    One browser shared by many fetches (e.g. --monitor), instead of launching Chromium for every page.
+    Pages open in the same context so the consent cookie from the first page carries over, at most
+    max_pages are open at once and requests start at least min_interval seconds apart.
+
+        async with BrowserSession() as session:
+            html = await session.fetch(url)
+    """
+    def __init__(self, base_url: str = None, min_interval: float = 1.0, max_pages: int = 2):
+        self.base_url = base_url
+        self.min_interval = min_interval
+        self.consent_checked = False
+        self._pages = asyncio.Semaphore(max_pages)
+        self._pacing = asyncio.Lock()
+        self._next_request = 0.0
+        self._playwright = None
+        self._browser = None
+        self._context = None
+
+    async def __aenter__(self) -> "BrowserSession":
+        from playwright.async_api import async_playwright
+        with metrics.span("fetch_page.browser_launch"):
+            self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(headless=bool(self.base_url))
+            self._context = await self._browser.new_context(**browser_context_options())
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        with metrics.span("fetch_page.browser_close"):
+            await self._browser.close()
+            await self._playwright.stop()
+
+    async def fetch(self, url: str, scrolls: int = 0) -> str:
+        url = rebase_url(url, self.base_url)
+        async with self._pages:
+            async with self._pacing:
+                wait = self._next_request - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._next_request = time.monotonic() + self.min_interval
+
+            page = await self._context.new_page()
+            try:
+                with metrics.span("fetch_page.navigation"):
+                    await page.goto(url)
+                # The modal only shows once per context, don't wait 2 seconds for it on every page
+                if not self.consent_checked:
+                    self.consent_checked = True
+                    await dismiss_modal(page, 'button:has-text("Consent")', "fetch_page")
+                with metrics.span("fetch_page.scroll"):
+                    for _ in range(scrolls):
+                        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                        await asyncio.sleep(0.5)
+                html_content = await page.content()
+            finally:
+                await page.close()
+        metrics.count("fetch_page.pages")
+        if _page_store is not None:
+            _page_store.put(html_content, url)
+        return html_content
@@ -0,0 +1,100 @@
+import copy
+import pytest
+from src.ball_store import BallStore
+from src.match.schema import load_match
+from src.synthetic import generate_match
+
+EXAMPLE_FILE = "example_data/example_match_data.json"
+
+@pytest.fixture(scope="module")
+def match():
+    return load_match(EXAMPLE_FILE)
+
+def test_append_and_scan(tmp_path, match):
+    store = BallStore(str(tmp_path / "store"))
+    added = store.append_match(match, "1462642.json")
+    assert added == sum(len(comm["ball"]) for comm in match["comms"])
+    assert store.append_match(match, "1462642.json") == 0
+    # Nothing is visible to other readers until the sidecars are written
+    assert BallStore(str(tmp_path / "store")).rows == 0
+    store.flush()
+
+    reopened = BallStore(str(tmp_path / "store"))
+    assert reopened.rows == added
+    assert reopened.matches == ["1462642"]
+    runs = reopened.column("runs")
+    extras = reopened.column("extras")
+    # Balls are stored in the order bowled, the feed's newest ball (15.3, a FOUR) comes last
+    assert (reopened.column("over")[-1], reopened.column("ball")[-1], runs[-1]) == (15, 3, 4)
+    assert int(extras.sum()) == 1
+
+def test_columns_are_memory_mapped(tmp_path, match):
+    store = BallStore(str(tmp_path / "store"))
+    store.append_match(match, "1.json")
+    column = store.column("bowler_id")
+    assert column.base is not None
+    assert not column.flags.writeable
+
+def test_player_totals_across_matches(tmp_path, match):
+    store = BallStore(str(tmp_path / "store"))
+    store.append_match(match, "1.json")
+    store.append_match(copy.deepcopy(match), "2.json")
+    totals = {total["name"]: total for total in store.player_totals("batter")}
+    assert totals["Harsh Thaker"]["runs"] % 2 == 0
+    assert totals["Harsh Thaker"]["player_id"] == "914503"
+    # The example's one wide (in each copy) isn't a ball faced
+    assert sum(total["balls"] for total in totals.values()) == store.rows - 2
+
+def test_interrupted_append_is_trimmed(tmp_path, match):
+    store = BallStore(str(tmp_path / "store"))
+    store.append_match(match, "1.json")
+    with open(tmp_path / "store" / "runs.bin", "ab") as f:
+        f.write(b"\x00\x00\x00")
+    store.append_match(match, "2.json")
+    assert len(store.column("runs")) == store.rows
+    assert (tmp_path / "store" / "runs.bin").stat().st_size == store.rows * 2
+
+def test_players_sharing_a_surname_are_kept_apart(tmp_path, match):
+    match = copy.deepcopy(match)
+    # Give Thaker (batting in the second innings) the surname of Kirton (bowling at him)
+    for team in match["team"]:
+        for player in team["player"]:
+            if player["known_as"].endswith("Thaker"):
+                player["known_as"] = player["known_as"].replace("Thaker", "Kirton")
+                batter_id = str(player.get("object_id") or player["player_id"])
+            elif player["known_as"].endswith("Kirton"):
+                bowler_id = str(player.get("object_id") or player["player_id"])
+    for comm in match["comms"]:
+        for ball in comm["ball"]:
+            ball["players"] = ball["players"].replace("to Thaker", "to Kirton")
+
+    with BallStore(str(tmp_path / "store")) as store:
+        store.append_match(match, "1.json")
+    store = BallStore(str(tmp_path / "store"))
+    batters = {total["player_id"]: total for total in store.player_totals("batter")}
+    bowlers = {total["player_id"]: total for total in store.player_totals("bowler")}
+    assert batter_id != bowler_id
+    assert batter_id in batters and bowler_id in bowlers
+    assert batter_id not in bowlers
+
+def test_run_outs_are_not_the_bowlers(tmp_path):
+    match = generate_match(0)
+    # 9.3 "Maba to Bama" is run out (Pane), make it the non-striker who was out: a batter not out otherwise
+    fow = next(entry for entry in match["live"]["fow"] if entry["fow_overs"] == "9.3")
+    out_ids = {entry["out_player"]["player_id"] for entry in match["live"]["fow"]}
+    batting = next(team for team in match["team"] if str(team["team_id"]) == str(fow["team_id"]))
+    striker = next(player for player in batting["player"] if player["known_as"].endswith("Bama"))
+    non_striker = next(player for player in batting["player"] if str(player["player_id"]) not in out_ids)
+    fow["out_player"]["player_id"] = str(non_striker["player_id"])
+
+    store = BallStore(str(tmp_path / "store"))
+    store.append_match(match, "1.json")
+    balls = [ball for comm in match["comms"] for ball in comm["ball"]]
+    outs = [ball["dismissal"] for ball in balls if ball["dismissal"]]
+    bowlers = store.player_totals("bowler")
+    assert sum(total["wickets"] for total in bowlers) == len([out for out in outs if not out.startswith("run out")])
+    assert sum(total["balls"] for total in bowlers) == len([ball for ball in balls if ball["event"] not in ("1 wide", "1 no ball")])
+
+    batters_out = {total["name"]: total["wickets"] for total in store.player_totals("batter")}
+    assert batters_out[non_striker["known_as"]] == 1
+    assert batters_out[striker["known_as"]] == 0
@@ -0,0 +1,68 @@
+import asyncio
+import time
+from src import metrics
+from src import utils
+from src.browser_state import BrowserState
+
+URL = "https://www.espncricinfo.com/cricketers/player/x-1"
+CONSENT = 'button:has-text("Consent")'
+
+class FakeContext:
+    def __init__(self, cookies):
+        self.cookies = cookies
+
+    async def storage_state(self):
+        return {"cookies": self.cookies, "origins": []}
+
+class FakePage:
+    def __init__(self, modal=True, cookies=()):
+        self.url = URL
+        self.context = FakeContext(list(cookies))
+        self.modal = modal
+        self.waits = 0
+        self.clicks = 0
+
+    async def wait_for_selector(self, selector, timeout):
+        self.waits += 1
+        if not self.modal:
+            raise TimeoutError(selector)
+
+    async def click(self, selector):
+        self.clicks += 1
+
+def _dismiss(page):
+    asyncio.run(utils.dismiss_modal(page, CONSENT, "fetch_page"))
+
+def test_probe_is_skipped_once_saved(tmp_path):
+    filename = str(tmp_path / "state.json")
+    metrics.reset()
+    utils.use_browser_state(filename)
+    try:
+        first = FakePage(cookies=[{"name": "OptanonAlertBoxClosed", "domain": ".espncricinfo.com", "expires": time.time() + 86400}])
+        _dismiss(first)
+        assert (first.waits, first.clicks) == (1, 1)
+
+        # A later run starts from the saved cookies and doesn't wait at all
+        utils.use_browser_state(filename)
+        assert utils.browser_context_options()["storage_state"]["cookies"][0]["name"] == "OptanonAlertBoxClosed"
+        second = FakePage()
+        _dismiss(second)
+        assert second.waits == 0
+        assert utils.browser_state().skipped == 1
+        assert metrics.snapshot()["counters"]["browser_state.probes_skipped"] == 1
+    finally:
+        utils.use_browser_state(None)
+
+def test_stale_state_probes_again(tmp_path):
+    state = BrowserState(str(tmp_path / "state.json"), max_age_days=1)
+    now = time.time()
+    state.probes[f"www.espncricinfo.com {CONSENT}"] = {"t": now, "waited": 2.0, "clicked": True}
+    assert not state.needs_probe(URL, CONSENT, now)
+    assert state.needs_probe(URL, 'button:has-text("Accept All")', now)
+    assert state.needs_probe("https://stats.espncricinfo.com/ci/engine/player/1.html", CONSENT, now)
+    assert state.needs_probe(URL, CONSENT, now + 2 * 86400)
+
+    # The consent cookie running out makes it stale too
+    state.storage_state = {"cookies": [{"name": "consent", "domain": ".espncricinfo.com", "expires": now + 60}], "origins": []}
+    assert not state.needs_probe(URL, CONSENT, now)
+    assert state.needs_probe(URL, CONSENT, now + 120)
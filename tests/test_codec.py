@@ -0,0 +1,72 @@
+import gzip
+import json
+import pytest
+from src import codec
+
+EXAMPLE_FILE = "example_data/example_match_data.json"
+
+samples = [
+    {"a": [], "b": {}, "c": None, "d": True},
+    [1, 2.5, "three", {"four": [4]}],
+    {"unicode": "Népél ✓", "escapes": "line\nbreak \"quoted\" \\ tab\t"},
+    {"int_keys_become_strings": {1: "one"}},
+]
+
+@pytest.mark.parametrize("data", samples)
+def test_pretty_matches_stdlib(data):
+    assert codec.dumps(data, pretty=True) == json.dumps(data, indent=2, ensure_ascii=False)
+
+# Where orjson differs from json (see codec.dumps)
+@pytest.mark.parametrize("data, orjson_pretty", [
+    ({"nan": float("nan")}, '{\n  "nan": null\n}'),
+    ({"small": 1e-07}, '{\n  "small": 1e-7\n}'),
+])
+def test_pretty_float_differences(data, orjson_pretty):
+    expected = orjson_pretty if codec.BACKEND == "orjson" else json.dumps(data, indent=2, ensure_ascii=False)
+    assert codec.dumps(data, pretty=True) == expected
+
+@pytest.mark.parametrize("data", samples)
+def test_round_trip(data):
+    assert codec.loads(codec.dumps(data)) == json.loads(json.dumps(data))
+
+def test_pretty_matches_stdlib_on_example_match():
+    with open(EXAMPLE_FILE, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    assert codec.dumps(data, pretty=True) == json.dumps(data, indent=2, ensure_ascii=False)
+
+def test_big_ints_fall_back_to_stdlib():
+    assert codec.dumps({"n": 2 ** 70}) == '{"n":1180591620717411303424}'
+
+def test_invalid_json_raises_json_decode_error():
+    with pytest.raises(codec.JSONDecodeError):
+        codec.loads("{not json")
+
+@pytest.mark.parametrize("data", samples)
+def test_stdlib_fallback_matches(monkeypatch, data):
+    expected = codec.dumps(data, pretty=True)
+    monkeypatch.setattr(codec, "orjson", None)
+    monkeypatch.setattr(codec, "msgspec", None)
+    assert codec.dumps(data, pretty=True) == expected
+    assert codec.loads(expected) == codec.loads(codec.dumps(data))
+
+@pytest.mark.parametrize("extension", [".gz", ".zst"])
+def test_dump_compresses_by_extension(tmp_path, extension):
+    if extension == ".zst":
+        pytest.importorskip("zstandard")
+    data = codec.load(EXAMPLE_FILE)
+    filename = str(tmp_path / f"match.json{extension}")
+    codec.dump(data, filename)
+    with open(filename, "rb") as f:
+        assert f.read(2) != b"{\n"
+    assert codec.load(filename) == data
+
+def test_write_to_file_follows_output_compression(tmp_path):
+    from src import utils
+    utils.set_output_compression(".gz")
+    try:
+        assert utils.write_to_file({"a": 1}, "json", str(tmp_path / "out"))
+        assert utils.write_to_file("<html></html>", "html", str(tmp_path / "page"))
+    finally:
+        utils.set_output_compression("")
+    assert codec.load(str(tmp_path / "out.json.gz")) == {"a": 1}
+    assert gzip.decompress((tmp_path / "page.html.gz").read_bytes()) == b"<html></html>"
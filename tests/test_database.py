@@ -0,0 +1,55 @@
+import json
+import pytest
+from src import database
+
+EXAMPLE_FILE = "example_data/example_match_data.json"
+
+roster = [
+    {"objectId": 1090625, "name": "Lokesh Bam", "longName": "Lokesh Bam", "slug": "lokesh-bam", "imageUrl": "/lsci/a.png",
+     "full_data": {"player_name": "Lokesh Bam", "player_id": "1090625", "stats": {"Career": [{"Span": "2020-2024", "Mat": "30", "Runs": "512", "Wkts": "-"}]}}},
+    {"objectId": 1090626, "name": "Someone Else", "slug": "someone-else"},
+]
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = database.connect(str(tmp_path / "test.db"))
+    yield conn
+    conn.close()
+
+def test_ingest_match(conn):
+    counts = database.ingest_file(conn, EXAMPLE_FILE)
+    assert counts["matches"] == 1
+    balls = conn.execute("SELECT COUNT(*) FROM balls").fetchone()[0]
+    with open(EXAMPLE_FILE, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    assert balls == sum(len(comm["ball"]) for comm in data["comms"])
+    assert conn.execute("SELECT COUNT(*) FROM innings").fetchone()[0] == 2
+
+def test_reingest_is_an_upsert(conn):
+    database.ingest_file(conn, EXAMPLE_FILE)
+    database.ingest_file(conn, EXAMPLE_FILE)
+    assert conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0] == 1
+    # 14.1 is bowled twice (a wide then the legal ball), both are kept
+    assert conn.execute("SELECT COUNT(*) FROM balls WHERE over = '14.1'").fetchone()[0] == 2
+
+def test_ingest_team_full(conn, tmp_path):
+    filename = tmp_path / "team.json"
+    filename.write_text(json.dumps(roster), encoding="utf-8")
+    counts = database.ingest_file(conn, str(filename))
+    assert counts["players"] == 2
+    rows = database.run_query(conn, "stats", {"name": "lokesh%"})
+    assert rows == [{"name": "Lokesh Bam", "player_id": "1090625", "heading": "Career", "span": "2020-2024", "matches": 30, "runs": 512, "wickets": None}]
+
+def test_query_balls_by_bowler_and_year(conn):
+    database.ingest_file(conn, EXAMPLE_FILE)
+    rows = database.run_query(conn, "balls", {"bowler": "kirton", "year": "2024"})
+    assert rows and all(row["bowler"] == "Kirton" for row in rows)
+    assert database.run_query(conn, "balls", {"bowler": "kirton", "year": "2025"}) == []
+
+def test_bowler_lookup_uses_index(conn):
+    plan = conn.execute("EXPLAIN QUERY PLAN SELECT * FROM balls WHERE bowler LIKE 'kirton' AND is_wicket = 1").fetchall()
+    assert "idx_balls_bowler" in " ".join(row[3] for row in plan)
+
+def test_unknown_filter_raises(conn):
+    with pytest.raises(ValueError):
+        database.run_query(conn, "wickets", {"colour": "red"})
@@ -0,0 +1,33 @@
+import pytest
+from src.extract_player_data import get_col_names, parse_player_data
+
+URL = "https://stats.espncricinfo.com/ci/engine/player/1090625.html?class=11;template=results;type=allround"
+
+def _row(cells, css_class="data1"):
+    return f'<tr class="{css_class}">' + "".join(f"<td>{cell}</td>" for cell in cells) + "</tr>"
+
+HTML = (
+    '<html><body><a href="/ci/engine/player/1090625.html">Statsguru / Players / Lokesh Bam</a>'
+    '<table class="engineTable">'
+    + _row(["Career", "2020-2024", "30", "512", "77*", "21.33", "0", "-", "-", "-", "0", "12", "3", "-"])
+    + _row(["v Namibia", "2022-2023", "4", "50", "20", "12.50", "0", "-", "-", "-", "0", "1", "0", "-"], "data2")
+    + _row(["short", "1", "2"])
+    + "</table></body></html>"
+)
+
+@pytest.mark.parametrize("url, first_columns", [
+    (URL, ["Heading", "Span", "Mat"]),
+    (URL.replace("class=11", "class=3"), ["Heading", "Mat", "Runs"]),
+])
+def test_get_col_names(url, first_columns):
+    assert get_col_names(url)[:3] == first_columns
+
+def test_parse_player_data():
+    result = parse_player_data(HTML, URL)
+    assert result["player_name"] == "Lokesh Bam"
+    assert result["player_id"] == "1090625"
+    assert result["stats"]["Career"] == [{"Span": "2020-2024", "Mat": "30", "Runs": "512", "HS": "77*", "Bat Av": "21.33", "100": "0",
+                                          "Wkts": "-", "BBI": "-", "Bowl Av": "-", "5": "0", "Ct": "12", "St": "3", "Ave Diff": "-"}]
+    assert "v Namibia" in result["stats"]
+    # Rows with fewer than 7 values are dropped
+    assert "short" not in result["stats"]
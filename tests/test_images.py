@@ -0,0 +1,57 @@
+import asyncio
+import os
+import pytest
+from src import codec
+from src.images import ConnectionPool, image_url, sync_images
+from src.mock_server import start_server
+from src.synthetic import roster_payload
+
+@pytest.fixture
+def server():
+    server = start_server()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.mark.parametrize("path, expected", [
+    ("/lsci/db/PICTURES/CMS/349200/349282.png", "https://img1.hscicdn.com/image/upload/f_auto,t_h_100_2x//lsci/db/PICTURES/CMS/349200/349282.png"),
+    ("https://example.com/a.png", "https://example.com/a.png"),
+])
+def test_image_url(path, expected):
+    assert image_url(path) == expected
+
+def test_sync_downloads_once_then_revalidates(server, tmp_path):
+    team = roster_payload(40, 1, 40, seed=5)["results"]
+    directory = str(tmp_path / "images")
+
+    first = asyncio.run(sync_images(team, directory, concurrency=4, base_url=server.base_url))
+    # A player's imageUrl and headshotImageUrl give the same picture, it's only stored once
+    assert first["downloaded"] + first["deduplicated"] == first["urls"]
+    assert first["deduplicated"] > 0
+    files = [name for name in os.listdir(directory) if name.endswith(".png")]
+    assert len(files) == first["downloaded"]
+
+    players = codec.load(os.path.join(directory, "players.json"))
+    assert set(players) == {str(player["objectId"]) for player in team}
+    assert all(players[str(player["objectId"])]["image"] for player in team if player["imageUrl"])
+
+    second = asyncio.run(sync_images(team, directory, concurrency=4, base_url=server.base_url))
+    assert second["unchanged"] == first["urls"]
+    assert server.stats["not_modified"] == first["urls"]
+
+def test_connections_are_reused(server):
+    pool = ConnectionPool()
+    for seed in range(5):
+        status, headers, body = pool.get(f"{server.base_url}/lsci/db/PICTURES/CMS/1000/{seed}.png")
+        assert status == 200 and body.startswith(b"\x89PNG")
+    pool.close()
+    assert (pool.opened, pool.reused) == (1, 4)
+
+def test_thumbnails(server, tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    team = roster_payload(10, 1, 10, seed=5)["results"]
+    counts = asyncio.run(sync_images(team, str(tmp_path), thumbnail_size=16, base_url=server.base_url))
+    thumbnails = os.listdir(tmp_path / "thumbnails" / "16")
+    assert len(thumbnails) == counts["thumbnails"] == counts["downloaded"]
+    with Image.open(tmp_path / "thumbnails" / "16" / thumbnails[0]) as image:
+        assert max(image.size) <= 16
@@ -0,0 +1,84 @@
+import asyncio
+import copy
+import os
+from src import codec
+from src.live_feed import LiveFeed, apply_delta, diff_states, live_state
+from src.server import ApiServer, OutputCache
+from src.synthetic import generate_match
+
+def _earlier(match):
+    """The same match a poll earlier: newest over not bowled yet, last wicket not fallen"""
+    earlier = copy.deepcopy(match)
+    earlier["comms"] = earlier["comms"][1:]
+    earlier["live"]["fow"] = earlier["live"]["fow"][:-1]
+    earlier["live"]["batting"][0]["runs"] -= 1
+    earlier["innings"][-1]["runs"] -= 5
+    earlier["live"]["status"] = "In progress"
+    return earlier
+
+def test_delta_brings_state_up_to_date():
+    match = generate_match(7)
+    old, new = live_state(_earlier(match)), live_state(match)
+    delta = diff_states(old, new)
+
+    assert [ball["over"] for ball in delta["balls"]] == [ball["overs_actual"] for ball in reversed(match["comms"][0]["ball"])]
+    assert list(delta["score"]) == [str(match["innings"][-1]["innings_number"])]
+    assert list(delta["batting"]) == [str(match["live"]["batting"][0]["player_id"])]
+    assert "bowling" not in delta
+    assert len(delta["fow"]) == 1
+    assert apply_delta(old, delta) == {**new, "seq": None}
+    assert diff_states(new, new) == {}
+
+def test_reconnect_gets_missed_deltas_only():
+    match = generate_match(7)
+    feed = LiveFeed("MATCH_7", backlog=2)
+    feed.update(live_state(_earlier(_earlier(match))))
+    messages, _ = feed.subscribe()
+    assert messages[0].startswith(b"id: 0\nevent: snapshot\n")
+
+    feed.update(live_state(_earlier(match)))
+    feed.update(live_state(match))
+    assert feed.subscribe("1")[0] == [feed.backlog[-1][1]]
+    assert feed.subscribe("2")[0] == []
+    # Older than the backlog goes back to a snapshot
+    feed.update(live_state(_earlier(match)))
+    assert b"event: snapshot" in feed.subscribe("0")[0][0]
+
+async def _read_event(reader):
+    event = {}
+    while True:
+        line = (await reader.readline()).decode().rstrip("\n")
+        if not line:
+            if "data" in event:
+                return event
+            continue
+        name, _, value = line.partition(": ")
+        event[name] = value
+
+def test_sse_stream_pushes_file_changes(tmp_path):
+    match = generate_match(7)
+    filename = str(tmp_path / "match.json")
+    codec.dump(_earlier(match), filename)
+
+    async def main():
+        api = ApiServer(OutputCache(str(tmp_path)), refresh_interval=0)
+        await api.start("127.0.0.1", 0)
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", api.port)
+            writer.write(b"GET /live/MATCH_7 HTTP/1.1\r\nHost: test\r\n\r\n")
+            assert (await reader.readline()).startswith(b"HTTP/1.1 200")
+            snapshot = await _read_event(reader)
+            assert snapshot["event"] == "snapshot"
+
+            codec.dump(match, filename)
+            os.utime(filename, ns=(1, 1))
+            await api.refresh()
+            delta = await _read_event(reader)
+            assert (delta["id"], delta["event"]) == ("1", "delta")
+            state = apply_delta(codec.loads(snapshot["data"]), codec.loads(delta["data"]))
+            assert state["status"] == match["live"]["status"]
+            assert state["balls"][-1]["over"] == match["comms"][0]["ball"][0]["overs_actual"]
+            writer.close()
+        finally:
+            await api.close()
+    asyncio.run(main())
@@ -0,0 +1,60 @@
+import asyncio
+import json
+import shutil
+import pytest
+from src.end_point_functions import match_dir_data, _match_file_stem
+
+EXAMPLE_FILE = "example_data/example_match_data.json"
+
+@pytest.mark.parametrize("filename, stem", [
+    ("matches/final.json", "final"),
+    ("matches/2025/final.json.gz", "final"),
+    ("archive.ndjson.zst", "archive"),
+])
+def test_match_file_stem(filename, stem):
+    assert _match_file_stem(filename) == stem
+
+def test_same_name_in_different_subdirectories(tmp_path):
+    match_dir = tmp_path / "matches"
+    for year in ("2024", "2025"):
+        (match_dir / year).mkdir(parents=True)
+        shutil.copy(EXAMPLE_FILE, match_dir / year / "final.json")
+    output = tmp_path / "out"
+
+    asyncio.run(match_dir_data(str(match_dir), str(output), "summary", "**/*.json", workers=1))
+
+    assert (output / "2024" / "final_summary.json").exists()
+    assert (output / "2025" / "final_summary.json").exists()
+    index = json.loads((output / "index.json").read_text(encoding="utf-8"))
+    assert len({m["output"] for m in index["matches"]}) == 2
+
+def test_match_dir_writes_outputs_and_index(tmp_path):
+    match_dir = tmp_path / "matches"
+    match_dir.mkdir()
+    shutil.copy(EXAMPLE_FILE, match_dir / "first.json")
+    shutil.copy(EXAMPLE_FILE, match_dir / "second.json")
+    (match_dir / "player.json").write_text('{"player_name": "Not A Match"}', encoding="utf-8")
+    output = tmp_path / "out"
+
+    asyncio.run(match_dir_data(str(match_dir), str(output), "summary", workers=1))
+
+    assert (output / "first_summary.json").exists()
+    assert (output / "second_summary.json").exists()
+    index = json.loads((output / "index.json").read_text(encoding="utf-8"))
+    assert index["total_files"] == 3
+    assert index["matches_analysed"] == 2
+    assert [m["ok"] for m in index["matches"]] == [True, False, True]
+    assert index["matches"][0]["innings"] == ["127/10 (19.0 ov)", "131/2 (15.3 ov)"]
+
+@pytest.mark.parametrize("output", ["matches", "matches/out"])
+def test_output_inside_match_dir_is_refused(tmp_path, capsys, output):
+    match_dir = tmp_path / "matches"
+    match_dir.mkdir()
+    shutil.copy(EXAMPLE_FILE, match_dir / "m.json")
+    original = (match_dir / "m.json").read_bytes()
+
+    asyncio.run(match_dir_data(str(match_dir), str(tmp_path / output), "timeline", workers=1))
+
+    assert "would overwrite the match files" in capsys.readouterr().out
+    assert (match_dir / "m.json").read_bytes() == original
+    assert sorted(path.name for path in match_dir.iterdir()) == ["m.json"]
@@ -0,0 +1,52 @@
+import gzip
+import json
+import pytest
+from src.match.loader import iter_match_documents, iter_matches
+from src.match.schema import load_match
+
+EXAMPLE_FILE = "example_data/example_match_data.json"
+
+tricky = {"description": "braces { [ in \"strings\" ] } and a backslash \\", "comms": [], "live": {"status": "é"}}
+
+@pytest.fixture(scope="module")
+def example():
+    with open(EXAMPLE_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _write(path, text, compress=False):
+    if compress:
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        path.write_text(text, encoding="utf-8")
+    return str(path)
+
+def test_single_document(tmp_path, example):
+    filename = _write(tmp_path / "match.json", json.dumps(example, indent=2))
+    matches = list(iter_matches(filename))
+    assert matches == [load_match(EXAMPLE_FILE)]
+
+def test_json_array(tmp_path, example):
+    filename = _write(tmp_path / "matches.json", json.dumps([example, tricky, example], indent=2))
+    assert [m.get("description") for m in iter_matches(filename)] == [example["description"], tricky["description"], example["description"]]
+
+def test_ndjson(tmp_path, example):
+    filename = _write(tmp_path / "matches.ndjson", "\n".join(json.dumps(m) for m in [tricky, example, tricky]) + "\n")
+    assert len(list(iter_matches(filename))) == 3
+
+def test_gzip(tmp_path, example):
+    filename = _write(tmp_path / "matches.json.gz", json.dumps([example, example]), compress=True)
+    assert len(list(iter_matches(filename, full=True))) == 2
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64])
+def test_documents_split_across_chunks(tmp_path, chunk_size):
+    docs = [tricky, {"a": [1, {"b": "\\\""}]}, tricky]
+    filename = _write(tmp_path / "matches.json", json.dumps(docs))
+    assert [json.loads(d) for d in iter_match_documents(filename, chunk_size)] == docs
+
+def test_empty_array(tmp_path):
+    assert list(iter_matches(_write(tmp_path / "empty.json", "[ ]"))) == []
+
+def test_truncated_file_raises(tmp_path):
+    with pytest.raises(ValueError):
+        list(iter_matches(_write(tmp_path / "broken.json", '[{"a": 1}, {"b": ')))
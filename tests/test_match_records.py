@@ -0,0 +1,71 @@
+import pytest
+from src.match.records import BallRecord, BatterRecord, BowlerRecord, ball_ordinal, parse_ball_event, split_overs
+from src.match.extractor import CricketDataExtractor
+from src.match.schema import load_match
+from src.synthetic import generate_match
+
+EXAMPLE_FILE = "example_data/example_match_data.json"
+
+@pytest.fixture(scope="module")
+def extractor():
+    return CricketDataExtractor(load_match(EXAMPLE_FILE))
+
+@pytest.mark.parametrize("record_type", [BallRecord, BatterRecord, BowlerRecord])
+def test_records_are_slotted(record_type):
+    assert "__slots__" in record_type.__dict__
+    assert "__dict__" not in dir(record_type)
+
+def test_batting_records_match_dicts(extractor):
+    live_batting = extractor.data["live"]["batting"]
+    assert [r.to_dict() for r in extractor.batting_records()] == extractor.extract_live_batting()
+    assert extractor.extract_live_batting()[0]["runs"] == live_batting[0]["runs"]
+    assert extractor.extract_live_batting()[0]["position"] == live_batting[0]["live_current_name"]
+
+def test_bowling_records_rename_conceded(extractor):
+    live_bowling = extractor.data["live"]["bowling"]
+    assert [b["runs_conceded"] for b in extractor.extract_live_bowling()] == [b["conceded"] for b in live_bowling]
+
+def test_ball_records_cover_every_ball(extractor):
+    balls = extractor.ball_records()
+    assert len(balls) == sum(len(comm["ball"]) for comm in extractor.data["comms"])
+    assert set(balls[0].to_dict()) == {"over", "over_number", "innings", "players", "event", "dismissal", "text", "speed_kph", "speed_mph"}
+
+def test_repeated_strings_are_shared(extractor):
+    fours = [ball.event for ball in extractor.ball_records() if ball.event == "FOUR"]
+    assert len(fours) > 1
+    assert all(event is fours[0] for event in fours)
+
+@pytest.mark.parametrize("event, expected", [
+    ("1 run", (1, 0, False)),
+    ("no run", (0, 0, False)),
+    ("FOUR", (4, 0, False)),
+    ("SIX", (6, 0, False)),
+    ("2 wides", (0, 2, False)),
+    ("1 leg bye", (0, 1, False)),
+    ("OUT", (0, 0, True)),
+])
+def test_parse_ball_event(event, expected):
+    assert parse_ball_event(event) == expected
+
+@pytest.mark.parametrize("overs, expected", [("15.3", (15, 3)), ("10.10", (10, 10)), ("0", (0, 0)), ("", (0, 0))])
+def test_split_overs(overs, expected):
+    assert split_overs(overs) == expected
+
+def test_ordinals_order_10_10_after_10_9():
+    assert ball_ordinal(1, *split_overs("10.9")) < ball_ordinal(1, *split_overs("10.10")) < ball_ordinal(1, *split_overs("11.1"))
+    assert ball_ordinal(1, 49, 6, 3) < ball_ordinal(2, 0, 1)
+
+def test_timeline_puts_extras_before_the_ball_they_share(extractor):
+    # In the example a wide was bowled at 14.1 before the legal 14.1
+    balls = [ball for ball in extractor.timeline_records() if ball.over == "14.1"]
+    assert [ball.event for ball in balls] == ["1 wide", "no run"]
+    assert balls[1].ordinal == balls[0].ordinal + 1
+    ordinals = [ball.ordinal for ball in extractor.timeline_records()]
+    assert ordinals == sorted(set(ordinals))
+
+def test_balls_between():
+    extractor = CricketDataExtractor(generate_match(3, "odi"))
+    powerplay = extractor.balls_between(1, "0.1", "9.6")
+    assert powerplay == [ball for ball in extractor.timeline_records() if ball.innings == 1 and split_overs(ball.over)[0] < 10]
+    assert {ball.over for ball in extractor.balls_between(2, "15.1", "15.6")} <= {f"15.{i}" for i in range(1, 7)}
+    assert len(extractor.balls_between(2)) == sum(1 for ball in extractor.timeline_records() if ball.innings == 2)
@@ -0,0 +1,24 @@
+import io
+from src.match.analyser import CricketMatchAnalyzer
+from src.match.extractor import CricketDataExtractor
+from src.synthetic import generate_match
+
+match = generate_match(4, "test")
+
+def test_timeline_report_streams_from_an_iterator():
+    extractor = CricketDataExtractor(match)
+    out = io.StringIO()
+    # A generator is enough, the renderer never needs the whole timeline at once
+    extractor.write_timeline_report(out, (record for record in extractor.timeline_records()), extractor.extract_match_info())
+    assert out.getvalue() == extractor.generate_timeline_report()
+    assert out.getvalue().count("\nINNINGS ") == 4
+
+def test_reports_write_to_a_stream():
+    extractor = CricketDataExtractor(match)
+    analyzer = CricketMatchAnalyzer(match)
+    summary, report = io.StringIO(), io.StringIO()
+    extractor.write_human_readable_summary(summary)
+    analyzer.write_human_readable_report(report)
+    assert summary.getvalue() == extractor.get_human_readable_summary()
+    assert report.getvalue() == analyzer.generate_human_readable_report()
+    assert "CRICKET MATCH REPORT" in report.getvalue()
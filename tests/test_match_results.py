@@ -0,0 +1,36 @@
+import os
+import pytest
+from src.end_point_functions import _analyse_match
+from src.match.results import ANALYSIS_TYPES, MatchResults, analysis_types
+from src.synthetic import generate_match
+
+@pytest.mark.parametrize("value, expected", [
+    ("summary", ["summary"]),
+    ("timeline,summary", ["summary", "timeline"]),
+    (["live", "summary", "live"], ["summary", "live"]),
+    (["summary", "all"], list(ANALYSIS_TYPES)),
+])
+def test_analysis_types(value, expected):
+    assert analysis_types(value) == expected
+
+def test_unknown_analysis_type():
+    with pytest.raises(ValueError, match="bogus"):
+        analysis_types("summary,bogus")
+
+def test_structured_reuses_comprehensive_analysis(capsys):
+    results = MatchResults(generate_match(2))
+    analysis = results.analysis
+    assert results.structured["batting_stats"] is analysis["batting_stats"]
+    assert results.live_batting is results.live_batting
+
+def test_all_types_in_one_pass_match_separate_runs(tmp_path, capsys):
+    match = generate_match(4)
+    for directory in ("all", *ANALYSIS_TYPES):
+        (tmp_path / directory).mkdir()
+    assert _analyse_match(match, str(tmp_path / "all" / "out"), "all", "match.json")
+    for analysis_type in ANALYSIS_TYPES:
+        assert _analyse_match(match, str(tmp_path / analysis_type / "out"), analysis_type, "match.json")
+    for analysis_type in ANALYSIS_TYPES:
+        for filename in os.listdir(tmp_path / analysis_type):
+            with open(tmp_path / analysis_type / filename, "rb") as expected, open(tmp_path / "all" / filename, "rb") as written:
+                assert written.read() == expected.read(), filename
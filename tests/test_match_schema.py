@@ -0,0 +1,47 @@
+import pytest
+from src import codec
+from src.match.schema import decode_match, load_match, project_match
+from src.match.extractor import CricketDataExtractor
+
+EXAMPLE_FILE = "example_data/example_match_data.json"
+
+extractor_methods = [
+    "extract_match_info",
+    "extract_team_info",
+    "extract_innings_data",
+    "extract_live_batting",
+    "extract_live_bowling",
+    "extract_ball_by_ball",
+    "extract_partnerships",
+    "get_human_readable_summary",
+    "extract_match_timeline",
+    "generate_timeline_report",
+]
+
+@pytest.fixture(scope="module")
+def full_match():
+    return load_match(EXAMPLE_FILE, full=True)
+
+@pytest.fixture(scope="module")
+def projected_match():
+    return load_match(EXAMPLE_FILE)
+
+def test_unused_fields_are_dropped(projected_match):
+    for key in ["match_card", "middle_column", "other_scores", "live_video", "official", "series"]:
+        assert key not in projected_match
+    assert "logo_path" not in projected_match["team"][0]
+    assert "overs_unique" not in projected_match["comms"][0]["ball"][0]
+
+def test_projected_is_much_smaller(full_match, projected_match):
+    assert len(codec.dumps(projected_match)) < len(codec.dumps(full_match)) / 2
+
+@pytest.mark.parametrize("method", extractor_methods)
+def test_extractor_output_unchanged(full_match, projected_match, method):
+    assert getattr(CricketDataExtractor(projected_match), method)() == getattr(CricketDataExtractor(full_match), method)()
+
+def test_out_player_kept_whole(full_match, projected_match):
+    assert [f["out_player"] for f in projected_match["live"]["fow"]] == [f["out_player"] for f in full_match["live"]["fow"]]
+
+def test_non_dict_documents_pass_through():
+    assert decode_match('[{"player_name": "x"}]') == [{"player_name": "x"}]
+    assert project_match({"player_name": "x"}) == {}
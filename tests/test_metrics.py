@@ -0,0 +1,53 @@
+import pytest
+from src import codec, metrics
+
+@pytest.fixture(autouse=True)
+def clean():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+def test_span_and_count():
+    for seconds in (0.002, 0.02, 3):
+        metrics.observe("stage", seconds)
+    with pytest.raises(RuntimeError):
+        with metrics.span("failing"):
+            raise RuntimeError
+    metrics.count("pages")
+    metrics.count("pages", 2)
+
+    data = metrics.snapshot()
+    stage = data["stages"]["stage"]
+    assert (stage["count"], stage["min"], stage["max"]) == (3, 0.002, 3)
+    assert stage["buckets"]["0.001"] == 0
+    assert stage["buckets"]["0.005"] == 1
+    assert stage["buckets"]["5"] == 3
+    assert stage["buckets"]["+Inf"] == 3
+    assert data["stages"]["failing"]["count"] == 1
+    assert data["counters"] == {"pages": 3}
+
+def test_timed():
+    @metrics.timed("work")
+    def work(x):
+        return x * 2
+    assert work(2) == 4
+    assert metrics.snapshot()["stages"]["work"]["count"] == 1
+
+@pytest.mark.parametrize("filename", ["metrics.json", "metrics.prom"])
+def test_write(tmp_path, filename):
+    metrics.observe("fetch_page.navigation", 0.3)
+    metrics.count("fetch_page.consent_timeouts")
+    metrics.count("images.bytes", 1234567)
+    metrics.count("browser_state.seconds_saved", 2.01)
+    path = str(tmp_path / filename)
+    metrics.write(path)
+    if filename.endswith(".json"):
+        assert codec.load(path)["counters"] == {"fetch_page.consent_timeouts": 1, "images.bytes": 1234567, "browser_state.seconds_saved": 2.01}
+    else:
+        text = open(path, encoding="utf-8").read()
+        assert 'scraper_stage_seconds_bucket{stage="fetch_page.navigation",le="0.5"} 1' in text
+        assert 'scraper_stage_seconds_count{stage="fetch_page.navigation"} 1' in text
+        assert 'scraper_events_total{event="fetch_page.consent_timeouts"} 1\n' in text
+        # Counters keep every digit, 1.23457e+06 would lose some
+        assert 'scraper_events_total{event="images.bytes"} 1234567\n' in text
+        assert 'scraper_events_total{event="browser_state.seconds_saved"} 2.01\n' in text
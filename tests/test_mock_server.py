@@ -0,0 +1,68 @@
+import urllib.error
+import urllib.request
+import pytest
+from src import codec
+from src.extract_player_data import parse_player_data
+from src.match.schema import decode_match
+from src.mock_server import MockConfig, start_server
+from src.utils import rebase_url
+
+@pytest.fixture
+def server(request):
+    server = start_server(getattr(request, "param", None))
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def _get(server, path):
+    with urllib.request.urlopen(server.base_url + path) as response:
+        return response.read().decode("utf-8")
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://www.espncricinfo.com/cricketers/team/nepal-33", "http://127.0.0.1:9/cricketers/team/nepal-33"),
+    ("https://stats.espncricinfo.com/ci/engine/player/1.html?class=11", "http://127.0.0.1:9/ci/engine/player/1.html?class=11"),
+    ("https://example.com/page", "https://example.com/page"),
+])
+def test_rebase_url(url, expected):
+    assert rebase_url(url, "http://127.0.0.1:9/") == expected
+    assert rebase_url(url) == url
+
+def test_roster_pages(server):
+    pages = [codec.loads(_get(server, f"/api/team/players?teamId=33&filterFormatLevel=ALL&page={page}")) for page in (1, 2, 3)]
+    assert pages[0]["total"] == 50
+    assert sum(len(page["results"]) for page in pages) == 50
+    assert "filterFormatLevel=ALL" in _get(server, "/cricketers/team/nepal-33")
+
+def test_player_page_parses(server):
+    url = "https://stats.espncricinfo.com/ci/engine/player/1033001.html?class=11;template=results;type=allround"
+    result = parse_player_data(_get(server, "/ci/engine/player/1033001.html?class=11;template=results;type=allround"), url)
+    assert result["player_id"] == "1033001"
+    assert result["stats"]
+
+def test_match_json(server):
+    match = decode_match(_get(server, "/ci/engine/match/42.json?format=odi"))
+    assert match["match"]["international_class_name"] == "ODI"
+    assert _get(server, "/ci/engine/match/42.json") == _get(server, "/ci/engine/match/42.json")
+
+@pytest.mark.parametrize("server, status, key", [
+    (MockConfig(rate_limit_rate=1.0), 429, "rate_limited"),
+    (MockConfig(error_rate=1.0), 500, "errors"),
+], indirect=["server"])
+def test_injected_errors(server, status, key):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        _get(server, "/ci/engine/player/1.html")
+    assert error.value.code == status
+    # The team page itself is never failed
+    assert "filterFormatLevel" in _get(server, "/team/nepal-33")
+    assert codec.loads(_get(server, "/__stats"))[key] == 1
+
+def test_fixtures(tmp_path):
+    (tmp_path / "ci" / "engine" / "player").mkdir(parents=True)
+    (tmp_path / "ci" / "engine" / "player" / "7.html").write_text("recorded", encoding="utf-8")
+    server = start_server(MockConfig(fixtures_dir=str(tmp_path)))
+    try:
+        assert _get(server, "/ci/engine/player/7.html") == "recorded"
+        assert _get(server, "/ci/engine/player/8.html") != "recorded"
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,54 @@
+import asyncio
+import copy
+from src import codec
+from src.monitor import Monitor, match_phase
+from src.synthetic import generate_match
+
+def _poll(match, status="current", brk="", drop_overs=0):
+    data = copy.deepcopy(match)
+    data["match"]["match_status"] = status
+    data["live"]["break"] = brk
+    data["comms"] = data["comms"][drop_overs:]
+    return data
+
+def test_match_phase():
+    match = generate_match(1)
+    assert match_phase(_poll(match)) == "in_play"
+    assert match_phase(_poll(match, brk="Innings break")) == "break"
+    assert match_phase(_poll(match, status="forthcoming")) == "upcoming"
+    assert match_phase(_poll(match, status="complete")) == "finished"
+
+def test_in_play_matches_are_polled_first():
+    monitor = Monitor(["a", "b", "c"], fetch=None)
+    a, b, c = monitor.watches
+    a.phase, a.next_poll = "upcoming", 1.0
+    b.phase, b.next_poll = "in_play", 5.0
+    c.phase, c.next_poll = "break", 2.0
+    assert monitor.next_due(10.0) is b
+    b.next_poll = 11.0
+    assert monitor.next_due(10.0) is c
+    assert monitor.next_due(0.5) is None
+
+def test_run_until_every_match_finishes(tmp_path):
+    first, second = generate_match(1), generate_match(2)
+    polls = {
+        "first": [_poll(first, drop_overs=2), _poll(first, drop_overs=1), _poll(first, status="complete")],
+        "second": [ValueError("timed out"), _poll(second, brk="Innings break"), _poll(second, status="complete")]
+    }
+
+    async def fetch(url):
+        result = polls[url].pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    output = str(tmp_path / "live")
+    monitor = Monitor(["first", "second", "first"], fetch, output, interval=0.01)
+    asyncio.run(asyncio.wait_for(monitor.run(), 10))
+
+    status = codec.load(f"{output}_monitor.json")
+    assert [match["match_id"] for match in status["matches"]] == ["MATCH_1", "MATCH_2"]
+    assert [match["phase"] for match in status["matches"]] == ["finished", "finished"]
+    assert [match["polls"] for match in status["matches"]] == [3, 3]
+    assert status["matches"][1]["last_error"] == "timed out"
+    assert len(monitor.watches[0].last_delta.get("balls", [])) == len(first["comms"][0]["ball"])
@@ -0,0 +1,42 @@
+import pytest
+from src import codec
+from src import utils
+from src.end_point_functions import _analyse_match
+from src.page_store import PageStore, content_hash
+from src.synthetic import generate_match, player_stats_html
+
+def test_bodies_are_stored_once(tmp_path):
+    store = PageStore(str(tmp_path))
+    html = player_stats_html(50, seed=1)
+    first = store.put(html, "https://stats.espncricinfo.com/ci/engine/player/1.html")
+    second = store.put(html, "https://stats.espncricinfo.com/ci/engine/player/1.html?again")
+    assert first == second == content_hash(html.encode("utf-8"))
+    assert store.get_text(first) == html
+    assert (store.stored, store.deduplicated) == (1, 1)
+
+    stats = store.stats()
+    assert (stats["captures"], stats["objects"]) == (2, 1)
+    assert stats["stored_bytes"] < len(html) / 3
+
+def test_dictionary_keeps_old_objects_readable(tmp_path):
+    pytest.importorskip("zstandard")
+    store = PageStore(str(tmp_path))
+    before = store.put(player_stats_html(20, seed=0))
+    for seed in range(1, 60):
+        store.put(player_stats_html(20, seed=seed))
+    store.train(size=16_384)
+    after = store.put(player_stats_html(20, seed=99))
+    reopened = PageStore(str(tmp_path))
+    assert reopened.get_text(before) == player_stats_html(20, seed=0)
+    assert reopened.get_text(after) == player_stats_html(20, seed=99)
+
+def test_comprehensive_output_references_raw_match(tmp_path):
+    match = generate_match(3)
+    utils.capture_pages(str(tmp_path / "store"))
+    try:
+        assert _analyse_match(match, str(tmp_path / "out"), "comprehensive", "match.json", full_data=True)
+    finally:
+        utils.capture_pages(None)
+    raw_data = codec.load(str(tmp_path / "out_comprehensive.json"))["raw_data"]
+    assert raw_data["source"] == "match.json"
+    assert codec.loads(PageStore(raw_data["store"]).get(raw_data["content"])) == match
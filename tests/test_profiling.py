@@ -0,0 +1,28 @@
+import pytest
+from src import profiling
+from src.match.extractor import CricketDataExtractor
+from src.synthetic import generate_match
+
+def _work():
+    return CricketDataExtractor(generate_match(1, "odi")).extract_match_timeline()
+
+@pytest.mark.parametrize("mode, suffixes", [
+    ("cpu", [".cpu.txt", ".cpu.prof", ".cpu.collapsed"]),
+    ("alloc", [".alloc.txt", ".alloc.collapsed"]),
+])
+def test_profile_writes_reports(tmp_path, mode, suffixes):
+    output = str(tmp_path / "output")
+    with profiling.profile(mode, output):
+        _work()
+    for suffix in suffixes:
+        assert (tmp_path / f"output{suffix}").stat().st_size > 0
+
+    collapsed = (tmp_path / f"output.{mode}.collapsed").read_text(encoding="utf-8").splitlines()
+    stack, value = collapsed[0].rsplit(" ", 1)
+    assert int(value) > 0
+    assert any("extract_match_timeline" in line or "extractor.py" in line for line in collapsed)
+
+def test_no_profile(tmp_path):
+    with profiling.profile(None, str(tmp_path / "output")):
+        _work()
+    assert list(tmp_path.iterdir()) == []
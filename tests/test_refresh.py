@@ -0,0 +1,91 @@
+import asyncio
+import re
+from datetime import datetime, timezone
+import pytest
+from src import database
+from src.refresh import page_hash, plan_refresh, refresh_players
+from src.synthetic import player_stats_html
+
+NOW = datetime(2025, 6, 10, tzinfo=timezone.utc)
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = database.connect(str(tmp_path / "test.db"))
+    yield conn
+    conn.close()
+
+def _fetched(conn, player_id, fetched_at):
+    conn.execute("INSERT INTO player_pages (player_id, content_hash, fetched_at) VALUES (?, 'x', ?)", (player_id, fetched_at))
+
+def _played(conn, player_id, start_date):
+    match_id = f"match-{player_id}"
+    conn.execute("INSERT INTO matches (match_id, start_date) VALUES (?, ?)", (match_id, start_date))
+    conn.execute("INSERT INTO match_players (match_id, player_id) VALUES (?, ?)", (match_id, player_id))
+
+def test_plan_puts_recent_players_first(conn):
+    _fetched(conn, "1", "2025-06-01T00:00:00+00:00")   # played since
+    _played(conn, "1", "2025-06-05")
+    _fetched(conn, "2", "2025-05-01T00:00:00+00:00")   # stale
+    _fetched(conn, "3", "2025-06-09T00:00:00+00:00")   # fresh
+    _fetched(conn, "4", "2025-06-08T00:00:00+00:00")   # played before the fetch
+    _played(conn, "4", "2025-06-07")
+    _played(conn, "6", "2025-06-09")                   # played, never fetched
+    assert plan_refresh(conn, ["1", "2", "3", "4", "5", "6"], now=NOW) == [("6", "played"), ("1", "played"), ("5", "new"), ("2", "stale")]
+
+def test_page_hash_only_looks_at_the_stats():
+    html = player_stats_html(5, seed=1)
+    assert page_hash(html) == page_hash(html.replace("Statsguru</title>", "Statsguru | ad 123</title>"))
+    assert page_hash(html) != page_hash(player_stats_html(5, seed=2))
+
+def test_only_changed_pages_are_parsed_and_written(conn):
+    team = [{"objectId": 1000 + i, "name": f"Player {i}"} for i in range(3)]
+    pages = {str(1000 + i): player_stats_html(5, seed=i, player_id=1000 + i) for i in range(3)}
+
+    async def fetch(url):
+        return pages[re.search(r"/player/(\d+)\.html", url).group(1)]
+
+    counts = asyncio.run(refresh_players(conn, team, fetch, delay=0, now=NOW))
+    assert (counts["fetched"], counts["changed"]) == (3, 3)
+    assert all(player["full_data"]["stats"] for player in team)
+
+    # A week later only player 1001 has a different page
+    later = datetime(2025, 6, 20, tzinfo=timezone.utc)
+    pages["1001"] = player_stats_html(5, seed=9, player_id=1001)
+    untouched = team[0]["full_data"]
+    counts = asyncio.run(refresh_players(conn, team, fetch, delay=0, now=later))
+    assert (counts["fetched"], counts["changed"], counts["unchanged"]) == (3, 1, 2)
+    assert team[0]["full_data"] is untouched
+    assert conn.execute("SELECT changed_at FROM player_pages WHERE player_id = '1000'").fetchone()[0] == NOW.isoformat(timespec="seconds")
+
+    # Nothing is due straight after
+    counts = asyncio.run(refresh_players(conn, team, fetch, delay=0, now=later))
+    assert (counts["fetched"], counts["skipped"]) == (0, 3)
+
+def test_compressed_team_file_is_written_back_in_place(tmp_path, monkeypatch, capsys):
+    from src import codec, utils
+    from src.end_point_functions import refresh_data
+
+    class FakeSession:
+        def __init__(self, base_url=None):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc_info):
+            pass
+
+        async def fetch(self, url):
+            player_id = int(re.search(r"/player/(\d+)\.html", url).group(1))
+            return player_stats_html(5, seed=player_id, player_id=player_id)
+
+    monkeypatch.setattr(utils, "BrowserSession", FakeSession)
+    utils.set_output_compression(".zst")
+    team_file = tmp_path / "nepal.json.gz"
+    codec.dump([{"objectId": 1000, "name": "Player 0"}], str(team_file))
+    try:
+        asyncio.run(refresh_data(str(team_file), str(tmp_path / "test.db"), delay=0))
+    finally:
+        utils.set_output_compression("")
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["nepal.json.gz", "test.db"]
+    assert codec.load(str(team_file))[0]["full_data"]["stats"]
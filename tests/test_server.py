@@ -0,0 +1,93 @@
+import asyncio
+import gzip
+import os
+from src import codec
+from src.server import ApiServer, OutputCache
+from src.synthetic import generate_match, player_stats_html, roster_payload
+from src.extract_player_data import parse_player_data
+
+def _write_outputs(directory):
+    roster = roster_payload(total=5, seed=33)["results"]
+    codec.dump(roster, str(directory / "nepal_33.json"))
+    object_id = roster[0]["objectId"]
+    url = f"https://stats.espncricinfo.com/ci/engine/player/{object_id}.html?class=11;template=results;type=allround"
+    codec.dump(parse_player_data(player_stats_html(10, player_id=object_id), url), str(directory / f"{object_id}.json"))
+    codec.dump(generate_match(7), str(directory / "1462642.json"))
+    return roster
+
+async def _get(port, path, headers=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    lines = [f"GET {path} HTTP/1.1", "Host: test", "Connection: close"] + [f"{key}: {value}" for key, value in (headers or {}).items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode())
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    status_line, *header_lines = head.decode().split("\r\n")
+    response_headers = {name.lower(): value.strip() for name, _, value in (line.partition(":") for line in header_lines)}
+    return int(status_line.split()[1]), response_headers, body
+
+def _run(tmp_path, test):
+    async def main():
+        api = ApiServer(OutputCache(str(tmp_path), max_entries=2), refresh_interval=0)
+        await api.start("127.0.0.1", 0)
+        try:
+            await test(api)
+        finally:
+            await api.close()
+    asyncio.run(main())
+
+def test_lookup_by_id(tmp_path):
+    roster = _write_outputs(tmp_path)
+    object_id = str(roster[0]["objectId"])
+
+    async def test(api):
+        status, _, body = await _get(api.port, "/teams/33")
+        assert status == 200 and codec.loads(body) == roster
+        status, _, body = await _get(api.port, f"/players/{object_id}")
+        assert codec.loads(body)["full_data"]["player_id"] == object_id
+        status, _, body = await _get(api.port, "/matches/1462642")
+        assert codec.loads(body)["match"]["cms_match_title"] == "Synthetic Match 7"
+        status, _, body = await _get(api.port, "/matches")
+        assert codec.loads(body) == ["1462642"]
+        assert (await _get(api.port, "/matches/404"))[0] == 404
+    _run(tmp_path, test)
+
+def test_etag_gzip_and_lru(tmp_path):
+    _write_outputs(tmp_path)
+
+    async def test(api):
+        status, headers, body = await _get(api.port, "/matches/1462642", {"Accept-Encoding": "gzip"})
+        assert headers["content-encoding"] == "gzip"
+        assert codec.loads(gzip.decompress(body))["match"]
+        status, _, body = await _get(api.port, "/matches/1462642", {"If-None-Match": headers["etag"]})
+        assert (status, body) == (304, b"")
+
+        await _get(api.port, "/teams/33")
+        await _get(api.port, "/teams/nepal_33")
+        assert len(api.cache.entries) == 2
+        assert api.cache.hits == 1
+    _run(tmp_path, test)
+
+def test_refresh_picks_up_changes(tmp_path):
+    _write_outputs(tmp_path)
+
+    async def test(api):
+        _, headers, _ = await _get(api.port, "/matches/1462642")
+        codec.dump(generate_match(8), str(tmp_path / "1462642.json"))
+        os.utime(tmp_path / "1462642.json", ns=(1, 1))
+        assert await api.cache.refresh() == [str(tmp_path / "1462642.json")]
+        status, new_headers, body = await _get(api.port, "/matches/1462642", {"If-None-Match": headers["etag"]})
+        assert status == 200 and new_headers["etag"] != headers["etag"]
+        assert codec.loads(body)["match"]["cms_match_title"] == "Synthetic Match 8"
+    _run(tmp_path, test)
+
+def test_compressed_outputs_are_served_by_default(tmp_path):
+    (tmp_path / "2025").mkdir()
+    codec.dump(generate_match(7), str(tmp_path / "2025" / "1462642.json.gz"))
+    codec.dump(roster_payload(total=5, seed=33)["results"], str(tmp_path / "nepal_33.json.gz"))
+
+    async def test(api):
+        status, _, body = await _get(api.port, "/matches/1462642")
+        assert status == 200 and codec.loads(body)["match"]["cms_match_title"] == "Synthetic Match 7"
+        assert (await _get(api.port, "/teams/33"))[0] == 200
+    _run(tmp_path, test)
@@ -0,0 +1,89 @@
+import copy
+import os
+import pytest
+from src import codec
+from src.snapshot_archive import ArchiveWriter, apply_patch, diff, iter_snapshots, snapshot_at
+from src.synthetic import generate_match
+
+@pytest.mark.parametrize("old, new", [
+    ({"a": 1, "b": [1, 2]}, {"a": 2, "c": None, "b": [1, 2]}),
+    ([3, 2, 1], [5, 4, 3, 2, 1]),
+    ([1, 2, 3], [1, 2, 3, 4]),
+    ([{"x": 1}, {"x": 2}], [{"x": 0}, {"x": 1, "y": 1}, {"x": 2}]),
+    ([1, 2, 3, 4], [1, 4]),
+    ({"a": [1]}, [1]),
+])
+def test_patch_round_trip(old, new):
+    original = copy.deepcopy(old)
+    ops = codec.loads(codec.dumps_bytes(diff(old, new)))
+    assert apply_patch(old, ops) == new
+    assert old == original
+
+def test_new_over_is_one_splice():
+    match = generate_match(5)
+    earlier = {**match, "comms": match["comms"][1:]}
+    assert diff(earlier, match) == [["s", ["comms"], 0, 0, [match["comms"][0]]]]
+
+def _polls(match):
+    # One poll per over bowled, oldest first
+    return [{**match, "comms": match["comms"][overs:], "live": {**match["live"], "status": f"{overs} to go"}}
+            for overs in range(len(match["comms"]), -1, -1)]
+
+def test_archive_replays_every_poll(tmp_path):
+    polls = _polls(generate_match(5))
+    filename = str(tmp_path / "match.snapshots.gz")
+    with ArchiveWriter(filename, keyframe_every=8) as archive:
+        for number, poll in enumerate(polls):
+            assert archive.append(poll, 100 + number)
+        assert not archive.append(polls[-1], 200)
+
+    assert [document for _, document in iter_snapshots(filename)] == polls
+    assert [t for t, _ in iter_snapshots(filename, start=110, end=112)] == [110, 111, 112]
+    assert snapshot_at(filename, 117.5) == (117, polls[17])
+    assert snapshot_at(filename, 99) is None
+
+    # Carries on from the last poll when opened again
+    with ArchiveWriter(filename, keyframe_every=8) as archive:
+        assert archive.last == polls[-1]
+        archive.append(polls[0], 300)
+    assert snapshot_at(filename, 400) == (300, polls[0])
+
+def test_sliding_window_is_two_splices():
+    match = generate_match(5)
+    comms = match["comms"]
+    # Only the latest overs are kept: a new one at the front pushes the oldest off the end
+    earlier = {**match, "comms": comms[1:-1]}
+    later = {**match, "comms": comms[:-2]}
+    ops = diff(earlier, later)
+    assert ops == [["s", ["comms"], 0, 0, [comms[0]]], ["s", ["comms"], len(comms) - 2, 1, []]]
+    assert apply_patch(earlier, ops) == later
+
+@pytest.mark.parametrize("old, new", [
+    ([1, 2, 3, 4, 5], [8, 9, 1, 2, 3]),
+    ([1, 2, 3, 4, 5], [3, 4, 5, 8, 9]),
+    ([[1], [2], [3]], [[1], [3], [2]]),
+])
+def test_shifted_lists_round_trip(old, new):
+    assert apply_patch(old, codec.loads(codec.dumps_bytes(diff(old, new)))) == new
+
+@pytest.mark.parametrize("cut", [1, 10, "keyframe"])
+def test_reopening_cuts_off_a_half_written_poll(tmp_path, capsys, cut):
+    polls = _polls(generate_match(3))
+    filename = str(tmp_path / "match.snapshots.gz")
+    with ArchiveWriter(filename, keyframe_every=4) as archive:
+        for number, poll in enumerate(polls[:-1]):
+            archive.append(poll, 100 + number)
+        complete = archive._file.tell()
+        # The next keyframe's index line is written before the poll itself
+        archive.since_keyframe = 4 if cut == "keyframe" else archive.since_keyframe
+        archive.append(polls[-1], 200)
+    with open(filename, "r+b") as f:
+        f.truncate(os.path.getsize(filename) - (5 if cut == "keyframe" else cut))
+
+    with ArchiveWriter(filename, keyframe_every=4) as archive:
+        assert os.path.getsize(filename) == complete
+        assert archive.last == polls[-2]
+        archive.append(polls[-1], 300)
+    assert [document for _, document in iter_snapshots(filename)] == polls
+    assert snapshot_at(filename, 300) == (300, polls[-1])
+    assert "half written" in capsys.readouterr().out
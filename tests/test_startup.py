@@ -0,0 +1,16 @@
+import subprocess
+import sys
+import pytest
+
+# Commands that shouldn't need any of the heavy dependencies just to start
+HEAVY = ("pandas", "numpy", "playwright", "bs4", "requests")
+
+def imported_modules(*args):
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "main.py", *args], capture_output=True, text=True).stderr
+    return {line.split("|")[2].strip() for line in stderr.splitlines() if line.startswith("import time:") and "cumulative" not in line}
+
+@pytest.mark.parametrize("args", [["--help"], ["--query", "matches", "--db", "missing.db"]])
+def test_light_commands_skip_heavy_imports(args):
+    modules = imported_modules(*args)
+    assert "src.end_point_functions" in modules
+    assert not {module for module in modules if module.split(".")[0] in HEAVY}
@@ -0,0 +1,50 @@
+import pytest
+from src.match.analyser import CricketMatchAnalyzer
+from src.match.extractor import CricketDataExtractor
+from src.match.loader import iter_matches
+from src.match.records import parse_ball_event
+from src.match.schema import get_match_id, project_match
+from src.synthetic import FORMATS, generate_match, roster_payload, write_archive
+
+def test_same_seed_same_match():
+    assert generate_match(7, "odi") == generate_match(7, "odi")
+    assert generate_match(7, "odi") != generate_match(8, "odi")
+
+@pytest.mark.parametrize("format", list(FORMATS))
+def test_match_is_consistent(format):
+    match = generate_match(3, format)
+    over_limit, innings_count, _ = FORMATS[format]
+    assert len(match["innings"]) == innings_count
+
+    ball_runs = sum(sum(parse_ball_event(ball["event"])[:2]) for over in match["comms"] for ball in over["ball"])
+    assert ball_runs == sum(innings["runs"] for innings in match["innings"])
+    assert all(int(innings["overs"].split(".")[0]) <= over_limit for innings in match["innings"])
+
+    # Everything downstream reads it like a real match
+    assert project_match(match)["live"]["status"] == match["live"]["status"]
+    assert CricketMatchAnalyzer(match).get_match_summary()["match_details"]["format"] == FORMATS[format][2]
+    assert len(CricketDataExtractor(match).extract_match_timeline()) > 0
+    assert get_match_id(match) == "MATCH_3"
+
+def test_extras_are_numbered_with_the_ball_to_come():
+    match = generate_match(5, "odi")
+    checked = 0
+    for over in match["comms"]:
+        # Balls are newest first, each wide / no ball has the number of the legal ball bowled after it
+        balls = over["ball"][::-1]
+        for ball, following in zip(balls, balls[1:]):
+            if ball["event"] in ("1 wide", "1 no ball"):
+                assert ball["overs_actual"] == following["overs_actual"]
+                checked += 1
+    assert checked > 0
+
+@pytest.mark.parametrize("filename", ["matches.ndjson", "matches.json.gz"])
+def test_write_archive(tmp_path, filename):
+    path = str(tmp_path / filename)
+    write_archive(path, 3, seed=5)
+    assert [m["match"]["cms_match_title"] for m in iter_matches(path)] == [f"Synthetic Match {i}" for i in (5, 6, 7)]
+
+def test_roster_pages():
+    pages = [roster_payload(total=45, page=page) for page in (1, 2, 3)]
+    assert [len(page["results"]) for page in pages] == [20, 20, 5]
+    assert len({player["objectId"] for page in pages for player in page["results"]}) == 45